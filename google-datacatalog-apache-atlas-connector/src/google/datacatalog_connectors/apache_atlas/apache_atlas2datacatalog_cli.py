@@ -69,6 +69,18 @@ class ApacheAtlas2DataCatalogCli:
             help='Consumer Group id used to connect to '
             'EVENT topic',
             required=True)
+        event_metadata_hook_parser.add_argument(
+            '--event-batch-max-size',
+            help='Maximum events processed on each cycle',
+            type=int)
+        event_metadata_hook_parser.add_argument(
+            '--event-batch-max-wait-ms',
+            help='Maximum time waiting for new events on each cycle',
+            type=int)
+        event_metadata_hook_parser.add_argument(
+            '--event-workers',
+            help='Workers writing the events metadata to Data Catalog',
+            type=int)
         cls.__add_common_args(event_metadata_hook_parser)
         event_metadata_hook_parser.set_defaults(
             func=cls.__run_event_metadata_hook)
@@ -78,6 +90,15 @@ class ApacheAtlas2DataCatalogCli:
         sync_sub_parser = subparsers.add_parser("sync", help="Sync commands")
 
         cls.__add_common_args(sync_sub_parser)
+        sync_sub_parser.add_argument(
+            '--incremental-sync-state-file',
+            help='File that keeps the incremental sync state, when provided'
+            ' only the entities updated since the previous run are synced')
+        sync_sub_parser.add_argument(
+            '--full-sync-interval-hours',
+            help='Hours between the full syncs that clean up the deleted'
+            ' entities, when running incremental syncs, defaults to 24',
+            type=float)
         sync_sub_parser.set_defaults(func=cls.__run_synchronizer)
 
     @classmethod
@@ -99,6 +120,25 @@ class ApacheAtlas2DataCatalogCli:
                                      required=True)
         sync_sub_parser.add_argument('--atlas-entity-types',
                                      help='Apache Atlas Entity Types')
+        sync_sub_parser.add_argument(
+            '--atlas-max-workers',
+            help='Maximum concurrent requests sent to Apache Atlas',
+            type=int)
+        sync_sub_parser.add_argument(
+            '--atlas-server-side-filtering',
+            help='Filters out deleted entities and subtypes on Apache Atlas'
+            ' searches, requires Apache Atlas 1.0 or later',
+            action='store_true')
+        sync_sub_parser.add_argument(
+            '--atlas-relationship-depth',
+            help='Levels of referenced entities fetched for the updated'
+            ' entities, on incremental syncs and event hooks, defaults to 1',
+            type=int)
+        sync_sub_parser.add_argument(
+            '--prepare-workers',
+            help='Processes building the Data Catalog entries and tags,'
+            ' defaults to 1',
+            type=int)
         sync_sub_parser.add_argument(
             '--enable-monitoring',
             help='Enables monitoring metrics on the connector')
@@ -114,10 +154,16 @@ class ApacheAtlas2DataCatalogCli:
                 'host': args.atlas_host,
                 'port': args.atlas_port,
                 'user': args.atlas_user,
-                'pass': args.atlas_passsword
+                'pass': args.atlas_passsword,
+                'max_workers': args.atlas_max_workers,
+                'server_side_filtering': args.atlas_server_side_filtering,
+                'relationship_depth': args.atlas_relationship_depth,
+                'prepare_workers': args.prepare_workers
             },
             atlas_entity_types=atlas_entity_types,
-            enable_monitoring=args.enable_monitoring).run()
+            enable_monitoring=args.enable_monitoring,
+            incremental_sync_state_file=args.incremental_sync_state_file,
+            full_sync_interval_hours=args.full_sync_interval_hours).run()
 
     @classmethod
     def __run_event_metadata_hook(cls, args):
@@ -131,8 +177,15 @@ class ApacheAtlas2DataCatalogCli:
                 'port': args.atlas_port,
                 'user': args.atlas_user,
                 'pass': args.atlas_passsword,
+                'max_workers': args.atlas_max_workers,
+                'server_side_filtering': args.atlas_server_side_filtering,
+                'relationship_depth': args.atlas_relationship_depth,
+                'prepare_workers': args.prepare_workers,
                 'event_servers': args.event_servers.split(','),
                 'event_consumer_group_id': args.event_consumer_group_id,
+                'event_batch_max_size': args.event_batch_max_size,
+                'event_batch_max_wait_ms': args.event_batch_max_wait_ms,
+                'event_workers': args.event_workers,
                 'event_hook': True
             },
             atlas_entity_types=atlas_entity_types,
@@ -16,12 +16,14 @@
 
 from . import constant
 from .assembled_entry_factory import AssembledEntryFactory
+from .attribute_def_index import AttributeDefIndex
 from .datacatalog_tag_template_factory import DataCatalogTagTemplateFactory
 from .entry_relationship_mapper import EntryRelationshipMapper
 
 __all__ = (
     'constant',
     'AssembledEntryFactory',
+    'AttributeDefIndex',
     'DataCatalogTagTemplateFactory',
     'EntryRelationshipMapper',
 )
@@ -15,18 +15,39 @@
 # limitations under the License.
 
 import logging
+import math
+import multiprocessing
+from concurrent import futures
 
+from google.cloud import datacatalog
 from google.datacatalog_connectors.commons import prepare
 
 from google.datacatalog_connectors.apache_atlas.prepare import \
     datacatalog_attribute_normalizer as attr_normalizer
-from . import datacatalog_entry_factory, datacatalog_tag_factory
+from . import attribute_def_index, datacatalog_entry_factory, \
+    datacatalog_tag_factory
 
 
 class AssembledEntryFactory:
-
-    def __init__(self, project_id, location_id, entry_group_id,
-                 user_specified_system, instance_url):
+    # Planned chunks per worker process, so a slow chunk doesn't hold
+    # the others, and minimum entities per chunk, so small batches are
+    # not worth starting the processes.
+    __CHUNKS_PER_WORKER = 4
+    __MIN_CHUNK_SIZE = 100
+
+    def __init__(self,
+                 project_id,
+                 location_id,
+                 entry_group_id,
+                 user_specified_system,
+                 instance_url,
+                 max_workers=None):
+
+        self.__factory_args = (project_id, location_id, entry_group_id,
+                               user_specified_system, instance_url)
+        # Worker processes building the entries and tags,
+        # they are built by the current one by default.
+        self.__max_workers = max_workers or 1
 
         self.__datacatalog_entry_factory = datacatalog_entry_factory \
             .DataCatalogEntryFactory(
@@ -41,12 +62,13 @@ class AssembledEntryFactory:
 
     def make_assembled_entries_list(self,
                                     metadata_dict,
-                                    apache_entity_types=None):
+                                    apache_entity_types=None,
+                                    attr_def_index=None):
         entity_types_dict = metadata_dict['entity_types']
         classifications = metadata_dict['classifications']
         enum_types_dict = metadata_dict['enum_types']
 
-        assembled_entries = []
+        entities = []
         for _, entity_type_dict in entity_types_dict.items():
             entity_type_name = entity_type_dict['name']
             if (apache_entity_types and
@@ -55,30 +77,95 @@ class AssembledEntryFactory:
 
                 logging.info('===> Processing entities for type: %s...',
                              entity_type_name)
-                entities = entity_type_dict['entities']
-                if entities:
-                    for _, entity_dict in entities.items():
-                        assembled_entries.append(
-                            self.__make_assembled_entry_for_entity(
-                                entity_dict, entity_types_dict,
-                                classifications, enum_types_dict))
+                entities.extend((entity_type_dict['entities'] or {}).values())
             else:
                 logging.info(
                     '===> Ignoring entities for type: %s...,'
                     ' not in allowed list: %s', entity_type_name,
                     apache_entity_types)
 
+        chunk_size = max(
+            math.ceil(
+                len(entities) /
+                (self.__max_workers * self.__CHUNKS_PER_WORKER)),
+            self.__MIN_CHUNK_SIZE)
+        if self.__max_workers > 1 and len(entities) > chunk_size:
+            return self.__make_assembled_entries_in_processes(
+                entities, chunk_size, metadata_dict)
+
+        # Attribute definitions are resolved once per type, and not
+        # once per entity.
+        attr_def_index = attr_def_index or \
+            attribute_def_index.AttributeDefIndex(entity_types_dict,
+                                                  classifications)
+        return self._make_assembled_entries(entities, entity_types_dict,
+                                            classifications, enum_types_dict,
+                                            attr_def_index)
+
+    def _make_assembled_entries(self, entities, entity_types_dict,
+                                classifications, enum_types_dict,
+                                attr_def_index):
+        return [
+            self.__make_assembled_entry_for_entity(entity_dict,
+                                                   entity_types_dict,
+                                                   classifications,
+                                                   enum_types_dict,
+                                                   attr_def_index)
+            for entity_dict in entities
+        ]
+
+    def __make_assembled_entries_in_processes(self, entities, chunk_size,
+                                              metadata_dict):
+        # The types are shipped once per worker, without their entities.
+        types_metadata = ({
+            name: {
+                key: value
+                for key, value in entity_type_dict.items()
+                if key != 'entities'
+            } for name, entity_type_dict in
+            metadata_dict['entity_types'].items()
+        }, metadata_dict['classifications'], metadata_dict['enum_types'])
+
+        chunks = [
+            entities[i:i + chunk_size]
+            for i in range(0, len(entities), chunk_size)
+        ]
+        logging.info('===> Assembling %s entities in %s processes...',
+                     len(entities), self.__max_workers)
+
+        assembled_entries = []
+        # Spawned instead of forked, since forking copies the locks held
+        # by the Kafka consumer and gRPC threads of long running hooks.
+        with futures.ProcessPoolExecutor(
+                max_workers=self.__max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_AssembledEntryWorker.set_up,
+                initargs=(self.__factory_args, types_metadata)) as executor:
+            # Chunks are returned in order, so the entries are too.
+            for serialized_entries in executor.map(
+                    _AssembledEntryWorker.make_serialized_assembled_entries,
+                    chunks):
+                assembled_entries.extend(
+                    prepare.AssembledEntryData(
+                        entry_id, datacatalog.Entry.deserialize(entry),
+                        [datacatalog.Tag.deserialize(tag)
+                         for tag in tags])
+                    for entry_id, entry, tags in serialized_entries)
         return assembled_entries
 
     def __make_assembled_entry_for_entity(self, entity, entity_types_dict,
-                                          classifications, enum_types_dict):
+                                          classifications, enum_types_dict,
+                                          attr_def_index):
 
         entry_id, entry = self.__datacatalog_entry_factory. \
             make_entry_for_entity(entity)
 
         tags = [
             self.__datacatalog_tag_factory.make_tag_for_entity(
-                entity, entity_types_dict, enum_types_dict)
+                entity,
+                entity_types_dict,
+                enum_types_dict,
+                attr_def_index=attr_def_index)
         ]
 
         entry_classifications = entity.get('classifications')
@@ -87,14 +174,17 @@ class AssembledEntryFactory:
             for classification in entry_classifications:
                 tags.append(
                     self.__datacatalog_tag_factory.make_tag_for_classification(
-                        classification, classifications, enum_types_dict))
+                        classification,
+                        classifications,
+                        enum_types_dict,
+                        attr_def_index=attr_def_index))
         self.__make_tags_for_columns(classifications, entity, tags,
-                                     enum_types_dict)
+                                     enum_types_dict, attr_def_index)
 
         return prepare.AssembledEntryData(entry_id, entry, tags)
 
     def __make_tags_for_columns(self, classifications, entity, tags,
-                                enum_types_dict):
+                                enum_types_dict, attr_def_index):
         entity_data = entity['data']
         attributes = entity_data['attributes']
         columns = attributes.get('columns')
@@ -119,8 +209,42 @@ class AssembledEntryFactory:
                                 tags.append(
                                     self.__datacatalog_tag_factory.
                                     make_tag_for_classification(
-                                        classification, classifications,
-                                        enum_types_dict, column_name))
+                                        classification,
+                                        classifications,
+                                        enum_types_dict,
+                                        column_name,
+                                        attr_def_index=attr_def_index))
                         tags.append(
                             self.__datacatalog_tag_factory.
                             make_tag_for_column_ref(column_guid, column_name))
+
+
+class _AssembledEntryWorker:
+    """Builds assembled entries in a worker process.
+
+    The factory and the types metadata are set up once per process, by the
+    pool initializer, and the entries are returned as serialized protobufs.
+    """
+    __factory = None
+    __types_metadata = None
+
+    @classmethod
+    def set_up(cls, factory_args, types_metadata):
+        entity_types_dict, classifications, enum_types_dict = types_metadata
+        cls.__factory = AssembledEntryFactory(*factory_args)
+        cls.__types_metadata = (entity_types_dict, classifications,
+                                enum_types_dict,
+                                attribute_def_index.AttributeDefIndex(
+                                    entity_types_dict, classifications))
+
+    @classmethod
+    def make_serialized_assembled_entries(cls, entities):
+        assembled_entries = cls.__factory._make_assembled_entries(
+            entities, *cls.__types_metadata)
+        return [
+            (assembled_entry.entry_id,
+             datacatalog.Entry.serialize(assembled_entry.entry),
+             [datacatalog.Tag.serialize(tag)
+              for tag in assembled_entry.tags])
+            for assembled_entry in assembled_entries
+        ]
@@ -0,0 +1,92 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+
+class AttributeDefIndex:
+    """Apache Atlas types attribute definitions, including the ones inherited
+    from their super types, indexed by type and attribute name.
+
+    Each type is resolved on its first lookup, after its super types, so a
+    single index can be shared by the Tag Template and Tag factories on each
+    run. Super types that would close an inheritance cycle are ignored.
+    """
+
+    def __init__(self, *types_dicts):
+        self.__types_dict = {}
+        for types_dict in types_dicts:
+            self.__types_dict.update(types_dict)
+        self.__attribute_defs_by_type = {}
+        self.__super_types_by_type = {}
+        # Types being resolved, used to detect inheritance cycles.
+        self.__resolving_types = set()
+
+    def get_attribute_defs(self, type_name):
+        """Returns the type attribute definitions by name, the super types
+        ones first, so the type definitions override the inherited ones.
+
+        :param type_name: the Entity Type or Classification name.
+        """
+        attribute_defs = self.__attribute_defs_by_type.get(type_name)
+        if attribute_defs is None:
+            attribute_defs = self.__resolve_attribute_defs(type_name)
+        return attribute_defs
+
+    def get_attribute_def(self, type_name, attribute_name):
+        return self.get_attribute_defs(type_name).get(attribute_name)
+
+    def get_own_attribute_defs(self, type_name):
+        type_dict = self.__types_dict.get(type_name)
+        if not type_dict:
+            return []
+        return type_dict['data'].get('attributeDefs') or []
+
+    def get_super_types(self, type_name):
+        """Returns the type known super types, without the ones that would
+        close an inheritance cycle, so they can be walked recursively.
+
+        :param type_name: the Entity Type or Classification name.
+        """
+        self.get_attribute_defs(type_name)
+        return self.__super_types_by_type[type_name]
+
+    def __resolve_attribute_defs(self, type_name):
+        type_dict = self.__types_dict.get(type_name)
+        attribute_defs = {}
+        super_types = []
+        if type_dict:
+            self.__resolving_types.add(type_name)
+            type_data = type_dict['data']
+            # Here we handle multiple ancestors fields.
+            for super_type in type_dict.get('superTypes') or \
+                    type_data.get('superTypes') or []:
+                if super_type in self.__resolving_types:
+                    logging.warning(
+                        'Ignoring super type %s of %s,'
+                        ' it closes an inheritance cycle', super_type,
+                        type_name)
+                elif super_type in self.__types_dict:
+                    super_types.append(super_type)
+                    attribute_defs.update(self.get_attribute_defs(super_type))
+            self.__resolving_types.discard(type_name)
+
+            for attribute_def in self.get_own_attribute_defs(type_name):
+                attribute_defs[attribute_def['name']] = attribute_def
+
+        self.__super_types_by_type[type_name] = super_types
+        self.__attribute_defs_by_type[type_name] = attribute_defs
+        return attribute_defs
@@ -50,5 +50,6 @@ DATACATALOG_TARGET_PRIMITIVE_TYPES = [
 
 ATLAS_COLUMN_TYPE = 'Column'
 
+ENTITY_CREATE_EVENT = 'ENTITY_CREATE'
 ENTITY_DELETE_EVENT = 'ENTITY_DELETE'
 ENTITY_SYNC_EVENT = 'ENTITY_SYNC'
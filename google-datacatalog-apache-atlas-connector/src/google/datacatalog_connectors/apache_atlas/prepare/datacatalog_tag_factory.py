@@ -14,11 +14,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import copy
-
 from google.cloud import datacatalog
 from google.datacatalog_connectors.commons import prepare
 
+from google.datacatalog_connectors.apache_atlas.prepare import \
+    attribute_def_index
 from google.datacatalog_connectors.apache_atlas.prepare import constant
 from google.datacatalog_connectors.apache_atlas.prepare import \
     datacatalog_attribute_normalizer as attr_normalizer
@@ -31,6 +31,7 @@ class DataCatalogTagFactory(prepare.BaseTagFactory):
     __STRING_VALUE_MAX_LENGTH = 2000
 
     __IGNORED_ATTRIBUTES_LIST = ['columns']
+    __DEFAULT_ATTRIBUTE_DEF = {'typeName': constant.ATLAS_STRING_TYPE}
 
     def __init__(self, project_id, location_id, instance_url):
         self.__project_id = project_id
@@ -41,7 +42,8 @@ class DataCatalogTagFactory(prepare.BaseTagFactory):
                                     entity_classification,
                                     classifications,
                                     enum_types_dict,
-                                    column_name=None):
+                                    column_name=None,
+                                    attr_def_index=None):
         tag = datacatalog.Tag()
 
         classification_name = entity_classification['typeName']
@@ -66,8 +68,11 @@ class DataCatalogTagFactory(prepare.BaseTagFactory):
         super()._set_bool_field(tag, formatted_name, True)
 
         attributes = entity_classification.get('attributes')
-        attribute_defs = classification_data['attributeDefs']
         if attributes:
+            attr_def_index = attr_def_index or \
+                attribute_def_index.AttributeDefIndex(classifications)
+            attribute_defs = attr_def_index.get_attribute_defs(
+                classification_name)
             self.__add_fields_from_attributes(tag, attributes, attribute_defs,
                                               enum_types_dict)
 
@@ -95,7 +100,11 @@ class DataCatalogTagFactory(prepare.BaseTagFactory):
 
         return tag
 
-    def make_tag_for_entity(self, entity, entity_types_dict, enum_types_dict):
+    def make_tag_for_entity(self,
+                            entity,
+                            entity_types_dict,
+                            enum_types_dict,
+                            attr_def_index=None):
         tag = datacatalog.Tag()
 
         guid = entity['guid']
@@ -121,7 +130,9 @@ class DataCatalogTagFactory(prepare.BaseTagFactory):
         super()._set_string_field(tag, constant.INSTANCE_URL_FIELD,
                                   self.__instance_url)
 
-        attribute_defs = entity_type['data']['attributeDefs']
+        attr_def_index = attr_def_index or \
+            attribute_def_index.AttributeDefIndex(entity_types_dict)
+        attribute_defs = attr_def_index.get_attribute_defs(entity_type_name)
         self.__add_fields_from_attributes(tag, attributes, attribute_defs,
                                           enum_types_dict)
 
@@ -134,17 +145,20 @@ class DataCatalogTagFactory(prepare.BaseTagFactory):
     def __add_fields_from_attributes(cls, tag, attributes, attribute_defs,
                                      enum_types_dict):
         for name, value in attributes.items():
-            if not value:
-                value = ''
-
-            # Create a copy from value to remove
-            # fields without impacting other workloads
-            tag_value = copy.deepcopy(value)
-            if isinstance(tag_value, list):
-                for item in tag_value:
-                    cls.__set_up_verbose_attributes(item)
+            # Zero and False are valid numeric and boolean values, so only
+            # the missing and empty values are left out.
+            if value is None or \
+                    (not value and isinstance(value, (str, list, dict))):
+                continue
+
+            # Project the value instead of cleaning up a copy of it, so
+            # the related entities data is not copied only to be dropped.
+            if isinstance(value, list):
+                tag_value = [
+                    cls.__project_verbose_attributes(item) for item in value
+                ]
             else:
-                cls.__set_up_verbose_attributes(tag_value)
+                tag_value = cls.__project_verbose_attributes(value)
 
             cls.__set_tag_field(attribute_defs, enum_types_dict, name, tag,
                                 tag_value)
@@ -156,8 +170,9 @@ class DataCatalogTagFactory(prepare.BaseTagFactory):
             format_name(field_name)
 
         if formatted_name not in cls.__IGNORED_ATTRIBUTES_LIST:
-            attribute_def = cls.__find_attribute_def(attribute_defs,
-                                                     field_name)
+            # Attributes without definition are handled as strings.
+            attribute_def = attribute_defs.get(
+                field_name) or cls.__DEFAULT_ATTRIBUTE_DEF
 
             type_name = attribute_def.get('typeName')
 
@@ -180,32 +195,24 @@ class DataCatalogTagFactory(prepare.BaseTagFactory):
                 super()._set_string_field(tag, formatted_name, str(tag_value))
 
     @classmethod
-    def __find_attribute_def(cls, attribute_defs, field_name):
-        try:
-            attribute_def = next(
-                filter(
-                    lambda attribute_def: attribute_def['name'] == field_name,
-                    attribute_defs))
-        except StopIteration:
-            attribute_def = {'typeName': constant.ATLAS_STRING_TYPE}
-        return attribute_def
-
-    @classmethod
-    def __set_up_verbose_attributes(cls, value):
+    def __project_verbose_attributes(cls, value):
         # Clean attributes from Tag
-        if isinstance(value, dict):
-            value.pop('classifications', None)
-
-            data = value.get('data')
-            if data:
-                attributes = data.pop('attributes', None)
-                if attributes:
-                    name = attributes.get('name', '')
-
-                    value['name'] = name
+        if not isinstance(value, dict):
+            return value
+
+        data = value.get('data')
+        # Remove data, we are adding only the name field to the tag.
+        projected_value = {
+            key: item
+            for key, item in value.items()
+            if key != 'classifications' and not (data and key == 'data')
+        }
+
+        attributes = data.get('attributes') if data else None
+        if attributes:
+            projected_value['name'] = attributes.get('name', '')
 
-                # Remove data, we are adding only the name field to the tag.
-                value.pop('data', None)
+        return projected_value
 
     def __create_custom_fields_for_entity_type(self, tag, entity_type_name,
                                                attributes):
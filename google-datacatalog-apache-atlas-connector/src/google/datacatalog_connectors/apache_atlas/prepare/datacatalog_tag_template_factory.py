@@ -18,6 +18,8 @@ from google.cloud import datacatalog
 
 from google.datacatalog_connectors.commons import prepare
 
+from google.datacatalog_connectors.apache_atlas.prepare import \
+    attribute_def_index
 from google.datacatalog_connectors.apache_atlas.prepare import constant
 from google.datacatalog_connectors.apache_atlas.prepare import \
     datacatalog_attribute_normalizer as attr_normalizer
@@ -34,7 +36,9 @@ class DataCatalogTagTemplateFactory(prepare.BaseTagTemplateFactory):
         self.__project_id = project_id
         self.__location_id = location_id
 
-    def make_tag_templates_from_apache_atlas_metadata(self, metadata_dict):
+    def make_tag_templates_from_apache_atlas_metadata(self,
+                                                      metadata_dict,
+                                                      attr_def_index=None):
         classifications_dict = metadata_dict['classifications']
         enum_types_dict = metadata_dict['enum_types']
         entity_types_dict = metadata_dict['entity_types']
@@ -43,21 +47,26 @@ class DataCatalogTagTemplateFactory(prepare.BaseTagTemplateFactory):
 
         tag_templates.update(
             self.make_tag_templates_from_classification_metatada(
-                classifications_dict, enum_types_dict))
+                classifications_dict, enum_types_dict, attr_def_index))
         tag_templates.update(
             self.make_tag_templates_from_entity_types_metatada(
-                entity_types_dict, enum_types_dict))
+                entity_types_dict, enum_types_dict, attr_def_index))
         tag_templates.update(self.make_column_tag_template())
 
         return tag_templates
 
     def make_tag_templates_from_classification_metatada(
-            self, metadata_dict, enum_types_dict):
+            self, metadata_dict, enum_types_dict, attr_def_index=None):
+        attr_def_index = attr_def_index or \
+            attribute_def_index.AttributeDefIndex(metadata_dict)
+        # Classification name > its fields, including the inherited ones.
+        type_fields_cache = {}
         tag_templates = {}
         for _, classification in metadata_dict.items():
             tag_templates.update(
                 self.__create_classification_tag_template(
-                    classification, metadata_dict, enum_types_dict))
+                    classification, attr_def_index, enum_types_dict,
+                    type_fields_cache))
         return tag_templates
 
     def make_column_tag_template(self):
@@ -85,8 +94,14 @@ class DataCatalogTagTemplateFactory(prepare.BaseTagTemplateFactory):
             location=self.__location_id,
             tag_template=tag_template_id)
 
-    def make_tag_templates_from_entity_types_metatada(self, metadata_dict,
-                                                      enum_types_dict):
+    def make_tag_templates_from_entity_types_metatada(self,
+                                                      metadata_dict,
+                                                      enum_types_dict,
+                                                      attr_def_index=None):
+        attr_def_index = attr_def_index or \
+            attribute_def_index.AttributeDefIndex(metadata_dict)
+        # Entity Type name > its fields, including the inherited ones.
+        type_fields_cache = {}
         tag_templates = {}
         for _, entity_type in metadata_dict.items():
 
@@ -94,12 +109,13 @@ class DataCatalogTagTemplateFactory(prepare.BaseTagTemplateFactory):
             if entity_type.get('entities'):
                 tag_templates.update(
                     self.__create_entity_type_tag_template(
-                        entity_type, metadata_dict, enum_types_dict))
+                        entity_type, attr_def_index, enum_types_dict,
+                        type_fields_cache))
         return tag_templates
 
     def __create_classification_tag_template(self, classification_dict,
-                                             classifications_dict,
-                                             enum_types_dict):
+                                             attr_def_index, enum_types_dict,
+                                             type_fields_cache):
         tag_template = datacatalog.TagTemplate()
 
         classification_data = classification_dict['data']
@@ -118,18 +134,9 @@ class DataCatalogTagTemplateFactory(prepare.BaseTagTemplateFactory):
 
         tag_template.display_name = '{}'.format(name)
 
-        classification_data = classification_dict['data']
-        classification_super_types = classification_data.get('superTypes')
-        attribute_defs = classification_data['attributeDefs']
-
-        if classification_super_types:
-            self.__add_fields_from_super_types(tag_template,
-                                               classification_super_types,
-                                               classifications_dict,
-                                               enum_types_dict)
-
-        self.__add_fields_from_attribute_defs(tag_template, attribute_defs,
-                                              enum_types_dict)
+        # Includes the fields from the super types.
+        self.__add_fields_from_type(tag_template, name, attr_def_index,
+                                    enum_types_dict, type_fields_cache)
 
         self._add_primitive_type_field(tag_template, formatted_name,
                                        self.__BOOL_TYPE, formatted_name)
@@ -137,7 +144,8 @@ class DataCatalogTagTemplateFactory(prepare.BaseTagTemplateFactory):
         return {tag_template_id: tag_template}
 
     def __create_entity_type_tag_template(self, entity_type_dict,
-                                          entity_types_dict, enum_types_dict):
+                                          attr_def_index, enum_types_dict,
+                                          type_fields_cache):
         tag_template = datacatalog.TagTemplate()
 
         entity_type_data = entity_type_dict['data']
@@ -155,17 +163,9 @@ class DataCatalogTagTemplateFactory(prepare.BaseTagTemplateFactory):
 
         tag_template.display_name = 'Type - {}'.format(name)
 
-        entity_super_types = entity_type_dict.get('superTypes')
-        attribute_defs = entity_type_data['attributeDefs']
-
-        if entity_super_types:
-            self.__add_fields_from_super_types(tag_template,
-                                               entity_super_types,
-                                               entity_types_dict,
-                                               enum_types_dict)
-
-        self.__add_fields_from_attribute_defs(tag_template, attribute_defs,
-                                              enum_types_dict)
+        # Includes the fields from the super types.
+        self.__add_fields_from_type(tag_template, name, attr_def_index,
+                                    enum_types_dict, type_fields_cache)
 
         self._add_primitive_type_field(tag_template, formatted_name,
                                        self.__BOOL_TYPE, formatted_name)
@@ -182,15 +182,38 @@ class DataCatalogTagTemplateFactory(prepare.BaseTagTemplateFactory):
 
         return {tag_template_id: tag_template}
 
-    def __add_fields_from_attribute_defs(self, tag_template, attribute_defs,
-                                         enum_types_dict):
-        for attribute_def in attribute_defs:
-            name = attribute_def['name']
-            self.__set_tag_template_field(attribute_def, enum_types_dict, name,
-                                          tag_template)
-
-    def __set_tag_template_field(self, attribute_def, enum_types_dict, name,
-                                 tag_template):
+    def __add_fields_from_type(self, tag_template, type_name, attr_def_index,
+                               enum_types_dict, type_fields_cache):
+        type_fields = self.__get_type_fields(type_name, attr_def_index,
+                                             enum_types_dict,
+                                             type_fields_cache)
+        for formatted_name, field in type_fields.items():
+            tag_template.fields[formatted_name] = field
+
+    def __get_type_fields(self, type_name, attr_def_index, enum_types_dict,
+                          type_fields_cache):
+        # Each type fields are created once, after its super types ones,
+        # and reused by the templates of all the types inheriting them.
+        type_fields = type_fields_cache.get(type_name)
+        if type_fields is None:
+            type_fields = {}
+            # Here we handle multiple ancestors fields.
+            for super_type in attr_def_index.get_super_types(type_name):
+                type_fields.update(
+                    self.__get_type_fields(super_type, attr_def_index,
+                                           enum_types_dict, type_fields_cache))
+
+            for attribute_def in attr_def_index.get_own_attribute_defs(
+                    type_name):
+                formatted_name, field = self.__make_tag_template_field(
+                    attribute_def, enum_types_dict)
+                type_fields[formatted_name] = field
+
+            type_fields_cache[type_name] = type_fields
+        return type_fields
+
+    def __make_tag_template_field(self, attribute_def, enum_types_dict):
+        name = attribute_def['name']
         formatted_name = attr_normalizer.DataCatalogAttributeNormalizer.\
             format_name(name)
         type_name = attribute_def['typeName']
@@ -218,24 +241,7 @@ class DataCatalogTagTemplateFactory(prepare.BaseTagTemplateFactory):
             # String is the default type.
             field.type.primitive_type = self.__STRING_TYPE
 
-        tag_template.fields[formatted_name] = field
-
-    def __add_fields_from_super_types(self, tag_template, super_types,
-                                      types_dict, enum_types_dict):
-        for super_type in super_types:
-            type_dict = types_dict[super_type]
-
-            # Here we handle multiple ancestors fields.
-            recursive_super_types = type_dict.get('superTypes')
-            if recursive_super_types:
-                self.__add_fields_from_super_types(tag_template,
-                                                   recursive_super_types,
-                                                   types_dict, enum_types_dict)
-
-            type_data = type_dict['data']
-            self.__add_fields_from_attribute_defs(tag_template,
-                                                  type_data['attributeDefs'],
-                                                  enum_types_dict)
+        return formatted_name, field
 
     def __create_custom_fields_for_entity_type(self, tag_template,
                                                entity_type_data):
@@ -14,6 +14,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+
 from google.datacatalog_connectors.commons import prepare
 from google.datacatalog_connectors.apache_atlas.prepare import constant
 
@@ -25,9 +27,18 @@ class EntryRelationshipMapper(prepare.BaseEntryRelationshipMapper):
     __TABLE = 'table'
     __VIEW = 'view'
 
+    # Entry type > fields referencing the related entries.
+    __SOURCE_FIELDS_BY_TYPE = {
+        __TABLE: ('db_guid', 'sd_guid', 'column_guid'),
+        __VIEW: ('db_guid',)
+    }
+
     def fulfill_tag_fields(self, assembled_entries_data):
-        resolvers = (self.__resolve_table_mappings,
-                     self.__resolve_view_mappings)
+        entries_index = self.__index_assembled_entries(assembled_entries_data)
+        resolvers = (functools.partial(self.__resolve_table_mappings,
+                                       entries_index=entries_index),
+                     functools.partial(self.__resolve_view_mappings,
+                                       entries_index=entries_index))
 
         self._fulfill_tag_fields(assembled_entries_data, resolvers)
 
@@ -36,22 +47,55 @@ class EntryRelationshipMapper(prepare.BaseEntryRelationshipMapper):
         return constant.ENTITY_GUID
 
     @classmethod
-    def __resolve_table_mappings(cls, assembled_entries_data, id_name_pairs):
-        for assembled_entry_data in assembled_entries_data:
+    def __index_assembled_entries(cls, assembled_entries_data):
+        # Entry type > source field > assembled entry with only the tags
+        # containing that field, so each resolver only goes through the
+        # relevant entries and tags.
+        entries_index = {}
+        for assembled_entry_data in assembled_entries_data or []:
             entry = assembled_entry_data.entry
-            if entry.user_specified_type == cls.__TABLE:
-                cls._map_related_entry(assembled_entry_data, cls.__DB,
-                                       'db_guid', 'db_entry', id_name_pairs)
-                cls._map_related_entry(assembled_entry_data, cls.__SD,
-                                       'sd_guid', 'sd_entry', id_name_pairs)
-                cls._map_related_entry(assembled_entry_data, cls.__COLUMN,
-                                       'column_guid', 'column_entry',
-                                       id_name_pairs)
+            source_fields = cls.__SOURCE_FIELDS_BY_TYPE.get(
+                entry.user_specified_type)
+            if not source_fields:
+                continue
+
+            tags_by_source_field = {}
+            for tag in assembled_entry_data.tags or []:
+                for source_field in source_fields:
+                    if source_field in tag.fields:
+                        tags_by_source_field.setdefault(source_field,
+                                                        []).append(tag)
+
+            type_index = entries_index.setdefault(entry.user_specified_type,
+                                                  {})
+            for source_field, tags in tags_by_source_field.items():
+                type_index.setdefault(source_field, []).append(
+                    prepare.AssembledEntryData(assembled_entry_data.entry_id,
+                                               entry, tags))
+        return entries_index
 
     @classmethod
-    def __resolve_view_mappings(cls, assembled_entries_data, id_name_pairs):
-        for assembled_entry_data in assembled_entries_data:
-            entry = assembled_entry_data.entry
-            if entry.user_specified_type == cls.__VIEW:
-                cls._map_related_entry(assembled_entry_data, cls.__DB,
-                                       'db_guid', 'db_entry', id_name_pairs)
+    def __resolve_table_mappings(cls, assembled_entries_data, id_name_pairs,
+                                 entries_index):
+        table_index = entries_index.get(cls.__TABLE, {})
+        cls.__map_related_entries(table_index, cls.__DB, 'db_guid', 'db_entry',
+                                  id_name_pairs)
+        cls.__map_related_entries(table_index, cls.__SD, 'sd_guid', 'sd_entry',
+                                  id_name_pairs)
+        cls.__map_related_entries(table_index, cls.__COLUMN, 'column_guid',
+                                  'column_entry', id_name_pairs)
+
+    @classmethod
+    def __resolve_view_mappings(cls, assembled_entries_data, id_name_pairs,
+                                entries_index):
+        view_index = entries_index.get(cls.__VIEW, {})
+        cls.__map_related_entries(view_index, cls.__DB, 'db_guid', 'db_entry',
+                                  id_name_pairs)
+
+    @classmethod
+    def __map_related_entries(cls, type_index, related_asset_type,
+                              source_field_id, target_field_id, id_name_pairs):
+        for assembled_entry_data in type_index.get(source_field_id, []):
+            cls._map_related_entry(assembled_entry_data, related_asset_type,
+                                   source_field_id, target_field_id,
+                                   id_name_pairs)
@@ -14,23 +14,87 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+
 from kafka import KafkaConsumer
+from kafka import errors as kafka_errors
 
 
 class ApacheAtlasEventFacade:
     __APACHE_ATLAS_SYNC_TOPIC = 'ATLAS_ENTITIES'
+    __DEFAULT_EVENT_BATCH_MAX_SIZE = 500
+    __DEFAULT_EVENT_BATCH_MAX_WAIT_MS = 1000
+    # Kafka default, kept as the lower bound of the max poll interval.
+    __MIN_MAX_POLL_INTERVAL_MS = 300000
+    # Time budget to scrape, prepare and ingest each event of a batch.
+    __EVENT_MAX_PROCESSING_MS = 2000
 
     def __init__(self, connection_args):
         self.__connection_args = connection_args
+        self.__event_batch_max_size = \
+            connection_args.get('event_batch_max_size') or \
+            self.__DEFAULT_EVENT_BATCH_MAX_SIZE
+        self.__event_batch_max_wait_ms = \
+            connection_args.get('event_batch_max_wait_ms') or \
+            self.__DEFAULT_EVENT_BATCH_MAX_WAIT_MS
+        self.__event_consumer = None
 
     def create_event_consumer(self):
+        # A batch is only committed after it is processed, so the next
+        # poll must happen within the max poll interval, otherwise the
+        # consumer leaves the group and the commit fails.
+        max_poll_interval_ms = max(
+            self.__MIN_MAX_POLL_INTERVAL_MS, self.__event_batch_max_wait_ms +
+            self.__event_batch_max_size * self.__EVENT_MAX_PROCESSING_MS)
         consumer = KafkaConsumer(
             self.__APACHE_ATLAS_SYNC_TOPIC,
-            api_version=(0, 10),
-            consumer_timeout_ms=10000,
+            # 0.10.1 is the first version with a max poll interval
+            # separate from the session timeout.
+            api_version=(0, 10, 1),
+            max_poll_interval_ms=max_poll_interval_ms,
             session_timeout_ms=300000,
             enable_auto_commit=False,
             auto_offset_reset='earliest',
             bootstrap_servers=self.__connection_args['event_servers'],
             group_id=self.__connection_args['event_consumer_group_id'])
         return consumer
+
+    def get_event_consumer(self):
+        """Returns the event consumer shared by every poll, so the consumer
+        group is only joined once.
+        """
+        if not self.__event_consumer:
+            self.__event_consumer = self.create_event_consumer()
+        return self.__event_consumer
+
+    def poll_events(self):
+        """Returns the next batch of event messages, waiting up to the batch
+        max wait time if there are no messages available.
+        """
+        records = self.get_event_consumer().poll(
+            timeout_ms=self.__event_batch_max_wait_ms,
+            max_records=self.__event_batch_max_size)
+        return [
+            msg for partition_records in records.values()
+            for msg in partition_records
+        ]
+
+    def rewind_events(self):
+        """Moves the event consumer back to the last committed offsets, so
+        the events of a batch that failed are polled again.
+        """
+        consumer = self.__event_consumer
+        if not consumer:
+            return
+        try:
+            for partition in consumer.assignment() or []:
+                offset = consumer.committed(partition)
+                if offset is None:
+                    consumer.seek_to_beginning(partition)
+                else:
+                    consumer.seek(partition, offset)
+        except kafka_errors.KafkaError:
+            # A new consumer starts from the committed offsets as well.
+            logging.exception('Error rewinding events, closing the consumer')
+            self.__event_consumer = None
+            consumer.close(autocommit=False)
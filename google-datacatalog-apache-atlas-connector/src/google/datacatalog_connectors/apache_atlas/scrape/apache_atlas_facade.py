@@ -14,22 +14,56 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 import logging
+import math
+import time
+from concurrent import futures
 
-from atlasclient import client
+from atlasclient import client, exceptions
 
 
 class ApacheAtlasFacade:
     """Apache Atlas API communication facade."""
     __DELETED_ENTITY_STATUS = 'DELETED'
     __MAX_CHUNK_SIZE = 300
+    # Bulk fetch parameters that leave the relationship attributes and
+    # the referred entities details out of the response, since the
+    # connector only reads the entity attributes.
+    __FETCH_PARAMS = {'minExtInfo': 'true', 'ignoreRelationships': 'true'}
+    # Entity data keys read by the prepare step, the other ones are
+    # discarded at fetch time.
+    __FETCHED_ENTITY_DATA_KEYS = ('guid', 'typeName', 'status', 'attributes',
+                                  'createTime', 'updateTime')
+    __SEARCH_PAGE_SIZE = 100
+    __SEARCH_MAX_PAGE_SIZE = 1000
+    # Planned pages per worker, so a slow page doesn't hold the others.
+    __SEARCH_PAGES_PER_WORKER = 4
+    # DSL search predicates, Apache Atlas appends the query to the typeName.
+    __ACTIVE_ENTITIES_PREDICATE_TEMPLATE = \
+        "__state = 'ACTIVE' and __typeName = '{}'"
+    __UPDATED_SINCE_PREDICATE_TEMPLATE = '__modificationTimestamp >= {}'
+    # Concurrent requests sent to the Apache Atlas host.
+    __DEFAULT_MAX_WORKERS = 1
+    __REQUEST_MAX_ATTEMPTS = 3
+    __REQUEST_RETRY_DELAY_SECONDS = 1
+    # Connection errors and timeouts raised by the underlying
+    # requests library are IOError subclasses.
+    __TRANSIENT_ERRORS = (exceptions.Timeout, exceptions.RateLimitExceeded,
+                          exceptions.ServerError, exceptions.ServerUnavailable,
+                          IOError)
 
     def __init__(self, connection_args):
-        # Initialize the API client.
+        # Initialize the API client, its HTTP session is shared
+        # by every request, including the concurrent ones.
         self.__apache_atlas = client.Atlas(connection_args['host'],
                                            port=connection_args['port'],
                                            username=connection_args['user'],
                                            password=connection_args['pass'])
+        self.__max_workers = connection_args.get('max_workers') or \
+            self.__DEFAULT_MAX_WORKERS
+        self.__server_side_filtering = connection_args.get(
+            'server_side_filtering')
 
     def get_admin_metrics(self):
         metrics = []
@@ -49,42 +83,34 @@ class ApacheAtlasFacade:
             })
         return metrics
 
+    def get_server_time(self):
+        """Returns the Apache Atlas server time, in milliseconds, when the
+        admin metrics were collected. Apache Atlas may cache the metrics, so
+        it is never ahead of the server time.
+        """
+        for metric in self.__apache_atlas.admin_metrics:
+            return metric.general.get('collectionTime')
+
     def get_typedefs(self):
         return self.__apache_atlas.typedefs
 
-    def search_entities_from_entity_type(self, entity_type_name):
-        logging.info('Searching for entities from entity_type: %s',
-                     entity_type_name)
-
-        fetched_search_results = []
-        params = {'typeName': entity_type_name, 'offset': 0, 'limit': 100}
-        search_results = self.__apache_atlas.search_dsl(**params)
-
-        # Fetch lazy response
-        search_results = [
-            entity for s in search_results for entity in s.entities
-        ]
-        fetched_search_results.extend(search_results)
-
-        # Keep fetching search_results to retrieve all the pages
-        while search_results:
-            params['offset'] = params['offset'] + params['limit']
-
-            logging.debug('offset: %s, limit: %s', params['offset'],
-                          params['limit'])
-
-            search_results = self.__apache_atlas.search_dsl(**params)
-            # Fetch lazy response
-            search_results = [
-                entity for s in search_results for entity in s.entities
-            ]
-            fetched_search_results.extend(search_results)
+    def search_entities_from_entity_type(self,
+                                         entity_type_name,
+                                         entities_count=None,
+                                         updated_since=None):
+        """Searches all the entities from the given type.
 
-        # Filter out deleted results and subtypes, only return the actual type.
+        :param entity_type_name: the Entity Type name.
+        :param entities_count: the Entity Type active entities count, from
+         the admin metrics, used to fetch the search pages concurrently.
+        :param updated_since: if provided, only the entities updated at or
+         after this timestamp, in milliseconds, are returned.
+        """
         fetched_search_results = [
-            result for result in fetched_search_results
-            if result._data['status'] != self.__DELETED_ENTITY_STATUS and
-            result._data['typeName'] == entity_type_name
+            result for search_results in
+            self.search_entities_batches_from_entity_type(
+                entity_type_name, entities_count, updated_since)
+            for result in search_results
         ]
 
         logging.info('Returned: %s entities from Search',
@@ -92,21 +118,75 @@ class ApacheAtlasFacade:
 
         return fetched_search_results
 
+    def search_entities_batches_from_entity_type(self,
+                                                 entity_type_name,
+                                                 entities_count=None,
+                                                 updated_since=None):
+        """Searches all the entities from the given type, yielding them as
+        each search page arrives, so the pages don't need to be kept in
+        memory.
+
+        :param entity_type_name: the Entity Type name.
+        :param entities_count: the Entity Type active entities count, from
+         the admin metrics, used to fetch the search pages concurrently.
+        :param updated_since: if provided, only the entities updated at or
+         after this timestamp, in milliseconds, are returned.
+        """
+        logging.info('Searching for entities from entity_type: %s',
+                     entity_type_name)
+
+        query = self.__make_search_query(entity_type_name, updated_since)
+
+        limit = self.__SEARCH_PAGE_SIZE
+        offset = 0
+        # The entities count covers all the entities of the type, it is
+        # not used to plan the pages of the updated entities searches.
+        if entities_count and not updated_since and self.__max_workers > 1:
+            limit = self.__get_search_page_size(entities_count)
+            offsets = list(range(0, entities_count, limit))
+            with futures.ThreadPoolExecutor(
+                    max_workers=self.__max_workers) as executor:
+                for search_results in executor.map(
+                        functools.partial(self.__search_entities_page,
+                                          entity_type_name,
+                                          limit=limit,
+                                          query=query), offsets):
+                    yield self.__filter_search_results(search_results,
+                                                       entity_type_name)
+            offset = offsets[-1]
+        else:
+            search_results = self.__search_entities_page(
+                entity_type_name, offset, limit, query)
+            yield self.__filter_search_results(search_results,
+                                               entity_type_name)
+
+        # Keep fetching search_results to retrieve all the pages, it also
+        # covers entities created after the entities count was collected.
+        while search_results:
+            offset = offset + limit
+            search_results = self.__search_entities_page(
+                entity_type_name, offset, limit, query)
+            yield self.__filter_search_results(search_results,
+                                               entity_type_name)
+
     def fetch_entities(self, guids):
         logging.info('Retreiving all entries from guids: %s', guids)
         entities_dict = {}
 
         # We chunk the limit because of the request size limit
-        for chunked_guids in self.__chunk_list(guids):
-            bulk_collection = self.__apache_atlas.entity_bulk(
-                guid=chunked_guids)
-            for collection in bulk_collection:
-                entities = collection.entities()
-                for fetched_entity in entities:
-                    guid = fetched_entity.guid
-                    entity_data = fetched_entity._data
-                    logging.debug(entity_data)
-                    entities_dict[guid] = {'guid': guid, 'data': entity_data}
+        chunks = list(self.__chunk_list(guids))
+        if self.__max_workers > 1 and len(chunks) > 1:
+            with futures.ThreadPoolExecutor(
+                    max_workers=self.__max_workers) as executor:
+                chunks_entities = executor.map(self.__fetch_entities_chunk,
+                                               chunks)
+                # Results are merged as they are returned, so the
+                # chunks are still processed in order.
+                self.__add_fetched_entities(entities_dict, chunks_entities)
+        else:
+            self.__add_fetched_entities(
+                entities_dict,
+                (self.__fetch_entities_chunk(chunk) for chunk in chunks))
         logging.info('Returned: %s entities from Fetch', len(entities_dict))
         return entities_dict
 
@@ -123,6 +203,114 @@ class ApacheAtlasFacade:
         except:  # noqa: E722
             logging.exception('Error fetching entity classifications')
 
+    @classmethod
+    def __filter_search_results(cls, search_results, entity_type_name):
+        # Filter out deleted results and subtypes, only return the actual type.
+        return [
+            result for result in search_results
+            if result._data['status'] != cls.__DELETED_ENTITY_STATUS and
+            result._data['typeName'] == entity_type_name
+        ]
+
+    def __make_search_query(self, entity_type_name, updated_since=None):
+        predicates = []
+        # Deleted entities and subtypes are also filtered out on
+        # the client side, in case the server ignores the query.
+        if self.__server_side_filtering:
+            predicates.append(
+                self.__ACTIVE_ENTITIES_PREDICATE_TEMPLATE.format(
+                    entity_type_name))
+        if updated_since:
+            predicates.append(
+                self.__UPDATED_SINCE_PREDICATE_TEMPLATE.format(
+                    int(updated_since)))
+
+        if predicates:
+            return 'where {}'.format(' and '.join(predicates))
+
+    def __search_entities_page(self,
+                               entity_type_name,
+                               offset,
+                               limit,
+                               query=None):
+        logging.debug('offset: %s, limit: %s', offset, limit)
+
+        params = {
+            'typeName': entity_type_name,
+            'offset': offset,
+            'limit': limit
+        }
+        if query:
+            params['query'] = query
+
+        def search_page():
+            search_results = self.__apache_atlas.search_dsl(**params)
+            # Fetch lazy response
+            return [entity for s in search_results for entity in s.entities]
+
+        return self.__run_with_retries(search_page)
+
+    def __fetch_entities_chunk(self, guids):
+
+        def fetch_chunk():
+            bulk_collection = self.__apache_atlas.entity_bulk(
+                guid=guids, **self.__FETCH_PARAMS)
+            # Fetch lazy response
+            return [
+                entity for collection in bulk_collection
+                for entity in collection.entities()
+            ]
+
+        return self.__run_with_retries(fetch_chunk)
+
+    @classmethod
+    def __run_with_retries(cls, request):
+        for attempt in range(1, cls.__REQUEST_MAX_ATTEMPTS + 1):
+            try:
+                return request()
+            except cls.__TRANSIENT_ERRORS:
+                if attempt == cls.__REQUEST_MAX_ATTEMPTS:
+                    raise
+                logging.warning(
+                    'Error requesting Apache Atlas, attempt %s, retrying...',
+                    attempt)
+                time.sleep(cls.__REQUEST_RETRY_DELAY_SECONDS * attempt)
+
+    def __get_search_page_size(self, entities_count):
+        # Larger types get larger pages, so they need less round trips.
+        page_size = math.ceil(
+            entities_count /
+            (self.__max_workers * self.__SEARCH_PAGES_PER_WORKER))
+        return min(max(page_size, self.__SEARCH_PAGE_SIZE),
+                   self.__SEARCH_MAX_PAGE_SIZE)
+
+    @classmethod
+    def __add_fetched_entities(cls, entities_dict, chunks_entities):
+        for entities in chunks_entities:
+            for fetched_entity in entities:
+                guid = fetched_entity.guid
+                entity_data = fetched_entity._data
+                logging.debug(entity_data)
+                # Bulk responses carry the entity classifications,
+                # including the propagated ones, so they don't need
+                # to be fetched entity by entity.
+                classification_list = \
+                    cls.__remove_duplicates_classification_list(
+                        entity_data.get('classifications') or [], guid)
+                entities_dict[guid] = {
+                    'guid': guid,
+                    'data': cls.__project_entity_data(entity_data),
+                    'classifications': classification_list
+                }
+
+    @classmethod
+    def __project_entity_data(cls, entity_data):
+        return {
+            key: entity_data[key]
+            for key in cls.__FETCHED_ENTITY_DATA_KEYS
+            if key in entity_data
+        }
+
     @classmethod
     def __remove_duplicates_classification_list(cls, classification_list,
                                                 entity_guid):
@@ -23,6 +23,10 @@ class MetadataEnricher:
     def enrich_entity_classifications(self, fetched_entities_dict,
                                       searched_entries):
         for key, fetched_entity in fetched_entities_dict.items():
+            # Classifications are usually filled by the bulk fetch.
+            if 'classifications' in fetched_entity:
+                continue
+
             classification_names = searched_entries.get(key, {}).get(
                 'data', {}).get('classificationNames', [])
 
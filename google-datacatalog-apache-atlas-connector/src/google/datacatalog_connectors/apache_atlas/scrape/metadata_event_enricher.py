@@ -18,16 +18,23 @@ import logging
 
 
 class MetadataEventEnricher:
+    # Relationship levels fetched from the enriched entities,
+    # 1 only fetches the entities they directly refer to.
+    __DEFAULT_RELATIONSHIP_DEPTH = 1
 
-    def __init__(self, apache_atlas_facade):
+    def __init__(self, apache_atlas_facade, relationship_depth=None):
         self.__apache_atlas_facade = apache_atlas_facade
+        self.__relationship_depth = relationship_depth or \
+            self.__DEFAULT_RELATIONSHIP_DEPTH
 
     def enrich_entities_attributes_and_classifications(self, guids):
         entities_dict = self.__apache_atlas_facade.fetch_entities(guids)
         for guid in guids:
             fetched_entity_dict = entities_dict.get(guid)
 
-            if fetched_entity_dict:
+            # Classifications are usually filled by the bulk fetch.
+            if fetched_entity_dict and \
+                    'classifications' not in fetched_entity_dict:
                 fetched_entity_dict[
                     'classifications'] = self.__apache_atlas_facade.\
                     fetch_entity_classifications(guid)
@@ -41,38 +48,60 @@ class MetadataEventEnricher:
         self.__enrich_event_relationships(entities, entity_types_dict)
 
     def __enrich_event_relationships(self, entities, entity_types_dict):
-        for guid, entity in entities.items():
-            data = entity['data']
-            attributes = data['attributes']
+        # The missing relationships of all the entities are fetched in
+        # a single bulk request, and the next level only looks into the
+        # entities fetched by the previous one.
+        frontier_entities = entities
+        requested_guids = set()
+        for _ in range(self.__relationship_depth):
+            missing_guids = self.__get_missing_relationships_guids(
+                frontier_entities, entity_types_dict, requested_guids)
+            if not missing_guids:
+                break
 
-            for key, attribute in attributes.items():
-                if isinstance(attribute, list):
-                    for item in attribute:
-                        self.__enrich_relationship_dict(
-                            item, entity_types_dict)
-                else:
-                    self.__enrich_relationship_dict(attribute,
-                                                    entity_types_dict)
+            requested_guids.update(missing_guids)
+            entities_dict = \
+                self.enrich_entities_attributes_and_classifications(
+                    list(missing_guids))
 
-    def __enrich_relationship_dict(self, attribute_dict, entity_types_dict):
-        if isinstance(attribute_dict, dict):
-            type_name = attribute_dict.get('typeName')
-            guid = attribute_dict.get('guid')
-            data = attribute_dict.get('data')
-            # Verify if the attribute implements an entity type
-            # and if the attribute data is not fetched.
-            if type_name and guid and not data:
-                entity_type = entity_types_dict.get(type_name)
-                if entity_type:
-                    relationship_entities = entity_type['entities']
-                    fetched_entity = relationship_entities.get(guid)
-                    if not fetched_entity:
-                        entities_dict = \
-                            self.\
-                            enrich_entities_attributes_and_classifications(
-                                [guid])
-                        if entities_dict:
-                            fetched_entity_dict = entities_dict.get(guid)
-                            if fetched_entity_dict:
-                                relationship_entities[
-                                    guid] = fetched_entity_dict
+            frontier_entities = {}
+            for guid, type_name in missing_guids.items():
+                fetched_entity_dict = entities_dict.get(guid)
+                if fetched_entity_dict:
+                    entity_types_dict[type_name]['entities'][
+                        guid] = fetched_entity_dict
+                    frontier_entities[guid] = fetched_entity_dict
+
+    @classmethod
+    def __get_missing_relationships_guids(cls, entities, entity_types_dict,
+                                          requested_guids):
+        # Missing guid > type name, in the order they are referenced.
+        missing_guids = {}
+        for entity in entities.values():
+            attributes = entity['data'].get('attributes') or {}
+
+            for attribute in attributes.values():
+                items = attribute if isinstance(attribute, list) \
+                    else [attribute]
+                for item in items:
+                    if cls.__is_missing_relationship(item, entity_types_dict):
+                        guid = item['guid']
+                        if guid not in requested_guids:
+                            missing_guids[guid] = item['typeName']
+        return missing_guids
+
+    @classmethod
+    def __is_missing_relationship(cls, attribute_dict, entity_types_dict):
+        if not isinstance(attribute_dict, dict):
+            return False
+
+        type_name = attribute_dict.get('typeName')
+        guid = attribute_dict.get('guid')
+        data = attribute_dict.get('data')
+        # Verify if the attribute implements an entity type
+        # and if the attribute data is not fetched.
+        if not (type_name and guid and not data):
+            return False
+
+        entity_type = entity_types_dict.get(type_name)
+        return bool(entity_type) and guid not in entity_type['entities']
@@ -16,6 +16,7 @@
 
 import json
 import logging
+import time
 
 from google.datacatalog_connectors.apache_atlas.scrape import \
     apache_atlas_event_facade
@@ -30,13 +31,23 @@ from google.datacatalog_connectors.apache_atlas.prepare import constant
 
 
 class MetadataEventScraper(metadata_scraper.MetadataScraper):
+    # Apache Atlas doesn't send typedef changes to the entities topic, so
+    # the cached typedefs are refreshed when the events refer to types,
+    # attributes or enum values they don't know, and after this interval.
+    __TYPEDEFS_CACHE_TTL_SECONDS = 600
 
     def __init__(self, connection_args):
         super().__init__(connection_args)
         self.__apache_atlas_event_facade = apache_atlas_event_facade.\
             ApacheAtlasEventFacade(connection_args)
         self.__metadata_event_enricher = metadata_event_enricher.\
-            MetadataEventEnricher(self._apache_atlas_facade)
+            MetadataEventEnricher(
+                self._apache_atlas_facade,
+                relationship_depth=connection_args.get('relationship_depth'))
+        self.__typedefs_cache = None
+        self.__typedefs_cache_time = None
+        # Typedef name > version, for the cached typedefs.
+        self.__typedef_versions = {}
 
     def get_metadata(self, **kwargs):
         entity_events = None
@@ -44,6 +55,10 @@ class MetadataEventScraper(metadata_scraper.MetadataScraper):
             entity_events = kwargs.get('entity_events')
         return self.__scrape_entity_events(entity_events)
 
+    def rewind_events(self):
+        """Makes the events polled since the last commit available again."""
+        self.__apache_atlas_event_facade.rewind_events()
+
     def __scrape_entity_events(self, entity_events=None):
         entity_events, event_consumer = self.__retrieve_entity_events(
             entity_events)
@@ -54,25 +69,13 @@ class MetadataEventScraper(metadata_scraper.MetadataScraper):
             self._log_scrape_start(
                 'Scraping Metadata for {} entity events...'.format(
                     len(entity_events)))
-            classifications_dict = {}
-            entity_types_dict = {}
-            enum_types_dict = {}
-
-            self._log_scrape_start('Scraping admin metrics...')
-            admin_metrics = self._apache_atlas_facade.get_admin_metrics()
-            logging.info(admin_metrics)
-            self._log_single_object_scrape_result(admin_metrics)
+            classifications_dict, enum_types_dict, entity_type_defs = \
+                self.__get_typedefs(entity_events)
 
-            self._log_scrape_start('Scraping typedefs...')
-            for typedef in self._apache_atlas_facade.get_typedefs():
-                self._scrape_classification_types(classifications_dict,
-                                                  typedef)
-
-                self._scrape_enum_types(enum_types_dict, typedef)
-
-                self.__scrape_entity_types_for_events(entity_events,
-                                                      entity_types_dict,
-                                                      typedef)
+            entity_types_dict = {}
+            self.__scrape_entity_types_for_events(entity_events,
+                                                  entity_types_dict,
+                                                  entity_type_defs)
 
             metadata_enricher.MetadataEnricher.enrich_entity_relationships(
                 entity_types_dict)
@@ -103,30 +106,169 @@ class MetadataEventScraper(metadata_scraper.MetadataScraper):
             entity_events = []
 
             event_consumer = self.__apache_atlas_event_facade.\
-                create_event_consumer()
+                get_event_consumer()
 
-            for msg in event_consumer:
+            for msg in self.__apache_atlas_event_facade.poll_events():
                 if msg:
                     logging.info("Event %s:%s:%s: key=%s ", msg.topic,
                                  msg.partition, msg.offset, msg.key)
                     entity_event = json.loads(msg.value)
                     entity_events.append(entity_event['message'])
-            return entity_events, event_consumer
+            return self.__coalesce_entity_events(entity_events), \
+                event_consumer
+
+    @classmethod
+    def __coalesce_entity_events(cls, entity_events):
+        """Keeps a single event for each entity, so the entities are
+        fetched and ingested only once per batch. The latest event wins,
+        a create followed by a delete cancels out, and events received
+        after a delete are ignored.
+        """
+        coalesced_events = {}
+        created_guids = set()
+        deleted_guids = set()
+        for entity_event in entity_events:
+            guid = entity_event['entity']['guid']
+            operation_type = entity_event['operationType']
+            if guid in deleted_guids:
+                continue
+
+            if operation_type == constant.ENTITY_CREATE_EVENT and \
+                    guid not in coalesced_events:
+                created_guids.add(guid)
+            # Removed and added back, so the events keep the order
+            # of the latest event of each entity.
+            coalesced_events.pop(guid, None)
+
+            if operation_type == constant.ENTITY_DELETE_EVENT:
+                deleted_guids.add(guid)
+                if guid in created_guids:
+                    continue
+
+            coalesced_events[guid] = entity_event
+
+        if len(coalesced_events) < len(entity_events):
+            logging.info('%s entity events coalesced into %s',
+                         len(entity_events), len(coalesced_events))
+        return list(coalesced_events.values())
+
+    def __get_typedefs(self, entity_events):
+        if self.__typedefs_cache is None or \
+                self.__is_typedefs_cache_expired() or \
+                self.__has_unknown_types(entity_events):
+            self.__refresh_typedefs_cache()
+        else:
+            logging.info('Using cached typedefs...')
+
+        classifications_dict, enum_types_dict, entity_type_defs = \
+            self.__typedefs_cache
+        return dict(classifications_dict), dict(enum_types_dict), \
+            entity_type_defs
+
+    def __is_typedefs_cache_expired(self):
+        return time.time() - self.__typedefs_cache_time >= \
+            self.__TYPEDEFS_CACHE_TTL_SECONDS
+
+    def __has_unknown_types(self, entity_events):
+        classifications_dict, enum_types_dict, entity_type_defs = \
+            self.__typedefs_cache
+        for entity_event in entity_events:
+            entity = entity_event['entity']
+            if entity['typeName'] not in entity_type_defs:
+                return True
+            for classification_name in entity.get('classificationNames') or []:
+                if classification_name not in classifications_dict:
+                    return True
+            if self.__has_unknown_attributes(entity, entity_type_defs,
+                                             enum_types_dict):
+                return True
+        return False
+
+    @classmethod
+    def __has_unknown_attributes(cls, entity, entity_type_defs,
+                                 enum_types_dict):
+        """Typedefs changed in place, such as a new attribute or enum value,
+        keep their names, so they are detected by the entity attributes the
+        cached typedefs don't define.
+        """
+        attribute_defs = cls.__get_attribute_defs(entity['typeName'],
+                                                  entity_type_defs)
+        for name, value in (entity.get('attributes') or {}).items():
+            attribute_def = attribute_defs.get(name)
+            if not attribute_def:
+                return True
+            enum_type = enum_types_dict.get(attribute_def.get('typeName'))
+            if enum_type and value is not None and value not in [
+                    element_def.get('value') for element_def in
+                    enum_type['data'].get('elementDefs') or []
+            ]:
+                return True
+        return False
+
+    @classmethod
+    def __get_attribute_defs(cls, type_name, entity_type_defs):
+        attribute_defs = {}
+        entity_type_def = entity_type_defs.get(type_name)
+        if not entity_type_def:
+            return attribute_defs
+
+        for super_type in entity_type_def['superTypes'] or []:
+            attribute_defs.update(
+                cls.__get_attribute_defs(super_type, entity_type_defs))
+        data = entity_type_def['data']
+        for attribute_def in (data.get('attributeDefs') or []) + \
+                (data.get('relationshipAttributeDefs') or []):
+            attribute_defs[attribute_def['name']] = attribute_def
+        return attribute_defs
+
+    def __refresh_typedefs_cache(self):
+        classifications_dict = {}
+        enum_types_dict = {}
+        entity_type_defs = {}
+
+        self._log_scrape_start('Scraping admin metrics...')
+        admin_metrics = self._apache_atlas_facade.get_admin_metrics()
+        logging.info(admin_metrics)
+        self._log_single_object_scrape_result(admin_metrics)
+
+        self._log_scrape_start('Scraping typedefs...')
+        for typedef in self._apache_atlas_facade.get_typedefs():
+            self._scrape_classification_types(classifications_dict, typedef)
+
+            self._scrape_enum_types(enum_types_dict, typedef)
+
+            for entity_type in typedef.entityDefs:
+                entity_type_defs[entity_type.name] = {
+                    'name': entity_type.name,
+                    'data': entity_type._data,
+                    'superTypes': entity_type.superTypes
+                }
+
+        typedef_versions = {
+            name: type_dict['data'].get('version')
+            for types_dict in (classifications_dict, enum_types_dict,
+                               entity_type_defs)
+            for name, type_dict in types_dict.items()
+        }
+        if self.__typedefs_cache is not None:
+            changed_typedefs = sorted(
+                name for name, version in typedef_versions.items()
+                if self.__typedef_versions.get(name) != version)
+            logging.info('Added or changed typedefs: %s', changed_typedefs)
+
+        self.__typedefs_cache = \
+            classifications_dict, enum_types_dict, entity_type_defs
+        self.__typedefs_cache_time = time.time()
+        self.__typedef_versions = typedef_versions
 
     def __scrape_entity_types_for_events(self, entity_events,
-                                         entity_types_dict, typedef):
+                                         entity_types_dict, entity_type_defs):
         types_event_dict = self.__create_types_event_dict(entity_events)
 
         self._log_scrape_start('Scraping EntityTypes...')
-        for entity_type in typedef.entityDefs:
-            entity_type_name = entity_type.name
-
-            entity_type_dict = {
-                'name': entity_type_name,
-                'data': entity_type._data,
-                'superTypes': entity_type.superTypes,
-                'entities': {}
-            }
+        events_entities = {}
+        for entity_type_name, entity_type_def in entity_type_defs.items():
+            entity_type_dict = dict(entity_type_def, entities={})
 
             # Enrich entity info for the event type
             if entity_type_name in types_event_dict.keys():
@@ -136,14 +278,17 @@ class MetadataEventScraper(metadata_scraper.MetadataScraper):
                     enrich_entities_attributes_and_classifications(
                         event_guids)
 
-                self.__metadata_event_enricher.\
-                    enrich_entity_types_relationships(
-                        entities, entity_types_dict)
-
                 entity_type_dict['entities'] = entities
+                events_entities.update(entities)
 
             entity_types_dict[entity_type_name] = entity_type_dict
 
+        # Relationships are enriched once every entity type is in place,
+        # so the entities referenced by all the events are fetched together.
+        if events_entities:
+            self.__metadata_event_enricher.enrich_entity_types_relationships(
+                events_entities, entity_types_dict)
+
     @classmethod
     def __create_types_event_dict(cls, entity_events):
         types_event_dict = {}
@@ -15,19 +15,36 @@
 # limitations under the License.
 
 import logging
+import re
+from concurrent import futures
 
 from google.datacatalog_connectors.apache_atlas import scrape
 
 
 class MetadataScraper:
+    # Matches the type names inside composite types, such as array<Column>.
+    __TYPE_NAME_REGEX_PATTERN = r'[\w.]+'
+    # GUIDs sent to each fetch_entities call while the search is running.
+    __FETCH_BATCH_SIZE = 1200
 
     def __init__(self, connection_args):
         self._apache_atlas_facade = scrape.apache_atlas_facade.\
             ApacheAtlasFacade(connection_args)
         self.__metadata_enricher = scrape.metadata_enricher.\
             MetadataEnricher(self._apache_atlas_facade)
+        self.__metadata_event_enricher = scrape.metadata_event_enricher.\
+            MetadataEventEnricher(
+                self._apache_atlas_facade,
+                relationship_depth=connection_args.get('relationship_depth'))
 
     def get_metadata(self, **kwargs):
+        entity_types = None
+        updated_since = None
+        if kwargs:
+            entity_types = kwargs.get('entity_types')
+            # Entity Type name > updateTime watermark, in milliseconds.
+            updated_since = kwargs.get('updated_since')
+
         self._log_scrape_start('Scraping all Metadata...')
         classifications_dict = {}
         entity_types_dict = {}
@@ -37,6 +54,7 @@ class MetadataScraper:
         admin_metrics = self._apache_atlas_facade.get_admin_metrics()
         logging.info(admin_metrics)
         self._log_single_object_scrape_result(admin_metrics)
+        entities_count = self._get_entities_count(admin_metrics)
 
         self._log_scrape_start('Scraping typedefs...')
         for typedef in self._apache_atlas_facade.get_typedefs():
@@ -44,7 +62,11 @@ class MetadataScraper:
 
             self._scrape_enum_types(enum_types_dict, typedef)
 
-            self._scrape_entity_types(entity_types_dict, typedef)
+            self._scrape_entity_types(entity_types_dict, typedef, entity_types,
+                                      entities_count, updated_since)
+
+        if updated_since:
+            self.__fetch_updated_entities_relationships(entity_types_dict)
 
         self.__metadata_enricher.enrich_entity_relationships(entity_types_dict)
 
@@ -54,8 +76,24 @@ class MetadataScraper:
             'entity_types': entity_types_dict
         }, None
 
-    def _scrape_entity_types(self, entity_types_dict, typedef):
+    def get_server_time(self):
+        """Returns the Apache Atlas server time, in milliseconds."""
+        return self._apache_atlas_facade.get_server_time()
+
+    def _scrape_entity_types(self,
+                             entity_types_dict,
+                             typedef,
+                             entity_types=None,
+                             entities_count=None,
+                             updated_since=None):
         self._log_scrape_start('Scraping EntityTypes...')
+        scraped_entity_types = None
+        if entity_types:
+            scraped_entity_types = self.__get_entity_types_to_scrape(
+                typedef.entityDefs, entity_types)
+            logging.info('Scraping entities for types: %s',
+                         sorted(scraped_entity_types))
+
         for entity_type in typedef.entityDefs:
             entity_type_name = entity_type.name
 
@@ -66,11 +104,62 @@ class MetadataScraper:
                 'entities': {}
             }
 
-            entities = self.__scrape_entity_type(entity_type)
-            entity_type_dict['entities'] = entities
+            # The Entity Type is kept even if its entities are not scraped,
+            # since its definition is used to create Tag Templates.
+            if scraped_entity_types is None or \
+                    entity_type_name in scraped_entity_types:
+                entities = self.__scrape_entity_type(
+                    entity_type, (entities_count or {}).get(entity_type_name),
+                    (updated_since or {}).get(entity_type_name))
+                entity_type_dict['entities'] = entities
 
             entity_types_dict[entity_type_name] = entity_type_dict
 
+    @classmethod
+    def __get_entity_types_to_scrape(cls, entity_defs, entity_types):
+        """Returns the allowed Entity Types plus the Entity Types they
+        reference in their attributes, including the inherited ones, which
+        are required to enrich the allowed entities relationships.
+        """
+        entity_defs_dict = {
+            entity_type.name: entity_type for entity_type in entity_defs
+        }
+
+        scraped_entity_types = set()
+        for entity_type_name in entity_types:
+            entity_type = entity_defs_dict.get(entity_type_name)
+            if not entity_type:
+                continue
+            scraped_entity_types.add(entity_type_name)
+
+            for attribute_def in cls.__get_attribute_defs(
+                    entity_type, entity_defs_dict, set()):
+                for type_name in re.findall(cls.__TYPE_NAME_REGEX_PATTERN,
+                                            attribute_def.get('typeName', '')):
+                    if type_name in entity_defs_dict:
+                        scraped_entity_types.add(type_name)
+
+        return scraped_entity_types
+
+    @classmethod
+    def __get_attribute_defs(cls, entity_type, entity_defs_dict,
+                             visited_entity_types):
+        visited_entity_types.add(entity_type.name)
+        data = entity_type._data
+        attribute_defs = [
+            *(data.get('attributeDefs') or []),
+            *(data.get('relationshipAttributeDefs') or [])
+        ]
+
+        for super_type_name in entity_type.superTypes or []:
+            super_type = entity_defs_dict.get(super_type_name)
+            if super_type and super_type_name not in visited_entity_types:
+                attribute_defs.extend(
+                    cls.__get_attribute_defs(super_type, entity_defs_dict,
+                                             visited_entity_types))
+
+        return attribute_defs
+
     def _scrape_classification_types(self, classifications_dict, typedef):
         self._log_scrape_start('Scraping Classifications/Templates...')
         for classification_type in typedef.classificationDefs:
@@ -95,27 +184,67 @@ class MetadataScraper:
                 'data': enum_data
             }
 
-    def __scrape_entity_type(self, entity_type):
+    def __fetch_updated_entities_relationships(self, entity_types_dict):
+        # Only the updated entities are scraped, so the entities they
+        # reference are fetched to fill their relationships.
+        updated_entities = {
+            guid: entity for entity_type_dict in entity_types_dict.values()
+            for guid, entity in entity_type_dict['entities'].items()
+        }
+        if updated_entities:
+            self.__metadata_event_enricher.enrich_entity_types_relationships(
+                updated_entities, entity_types_dict)
+
+    def __scrape_entity_type(self,
+                             entity_type,
+                             entities_count=None,
+                             updated_since=None):
         searched_entries = {}
         entity_type_name = entity_type.name
 
         logging.info('=> Entity Type: %s', entity_type_name)
         logging.debug(entity_type._data)
 
-        search_results = self._apache_atlas_facade.\
-            search_entities_from_entity_type(entity_type_name)
-
-        guids = []
-        for entity in search_results:
-            # Collecting guids and storing entity to enricher data later on.
-            guid = entity.guid
-            guids.append(guid)
-            searched_entries[guid] = {'guid': guid, 'data': entity._data}
+        search_batches = self._apache_atlas_facade.\
+            search_entities_batches_from_entity_type(entity_type_name,
+                                                     entities_count,
+                                                     updated_since)
 
         fetched_entities_dict = {}
-        if guids:
-            fetched_entities_dict = self._apache_atlas_facade.fetch_entities(
-                guids)
+        # Entities are fetched in background while the next search
+        # pages are retrieved.
+        with futures.ThreadPoolExecutor(max_workers=1) as executor:
+            fetch_results = []
+            guids = []
+            for search_results in search_batches:
+                for entity in search_results:
+                    # Collecting guids and storing the entity classification
+                    # names to enrich data later on.
+                    guid = entity.guid
+                    guids.append(guid)
+                    searched_entries[guid] = {
+                        'guid': guid,
+                        'data': {
+                            'classificationNames':
+                                entity._data.get('classificationNames', [])
+                        }
+                    }
+
+                if len(guids) >= self.__FETCH_BATCH_SIZE:
+                    fetch_results.append(
+                        executor.submit(
+                            self._apache_atlas_facade.fetch_entities, guids))
+                    guids = []
+
+            if guids:
+                fetch_results.append(
+                    executor.submit(self._apache_atlas_facade.fetch_entities,
+                                    guids))
+
+            for fetch_result in fetch_results:
+                fetched_entities_dict.update(fetch_result.result())
+
+        if fetched_entities_dict:
             self.__metadata_enricher.enrich_entity_classifications(
                 fetched_entities_dict, searched_entries)
 
@@ -123,6 +252,13 @@ class MetadataScraper:
         logging.info('')
         return fetched_entities_dict
 
+    @classmethod
+    def _get_entities_count(cls, admin_metrics):
+        entities_count = {}
+        for metric in admin_metrics or []:
+            entities_count.update(metric.get('entityActive') or {})
+        return entities_count
+
     @classmethod
     def _log_scrape_start(cls, message, *args):
         logging.info('')
@@ -14,10 +14,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import logging
-from time import sleep
+import time
+import zlib
+from concurrent import futures
 
 from google.cloud import datacatalog
+from kafka import errors as kafka_errors
 from google.datacatalog_connectors.commons import \
     datacatalog_facade
 
@@ -28,8 +32,16 @@ from google.datacatalog_connectors.apache_atlas.sync import \
 
 
 class MetadataEventSynchronizer(metadata_synchronizer.MetadataSynchronizer):
-    __EVENT_POLL_SLEEP_TIME_SECONDS = 5
     __STRING_TYPE = datacatalog.FieldType.PrimitiveType.STRING
+    # GUIDs OR-combined in each delete or column events search.
+    __SEARCH_MAX_GUIDS = 50
+    __COLUMN_GUID_FIELD = 'column_guid'
+    # Least recently used keys are evicted beyond this size, the search
+    # fallback resolves them when needed.
+    __INDEX_MAX_SIZE = 100000
+    __DELETE_ENTRIES_MAX_WORKERS = 10
+    __RETRY_MIN_DELAY_SECONDS = 1
+    __RETRY_MAX_DELAY_SECONDS = 300
 
     def __init__(self,
                  datacatalog_project_id,
@@ -46,14 +58,35 @@ class MetadataEventSynchronizer(metadata_synchronizer.MetadataSynchronizer):
 
         self.__datacatalog_facade = datacatalog_facade.DataCatalogFacade(
             self._project_id)
+        # Tag Templates already created by previous event cycles.
+        self.__created_tag_template_ids = set()
+        self.__event_workers = atlas_connection_args.get('event_workers') or 1
+        # Entity guid > entry name, for the entries ingested by the hook.
+        self.__entry_names_by_guid = collections.OrderedDict()
+        # Column guid > table guid, for the tables ingested by the hook.
+        self.__table_guids_by_column_guid = collections.OrderedDict()
 
     def run(self):
         logging.info(
             '===> Event hook execution, will keep polling for new events...')
+        # The event consumer poll waits for new events,
+        # so each cycle starts as soon as they arrive.
+        retry_delay = self.__RETRY_MIN_DELAY_SECONDS
         while True:
-            self.__run()
-            logging.info('===> Sleeping...')
-            sleep(self.__EVENT_POLL_SLEEP_TIME_SECONDS)
+            try:
+                self.__run()
+                retry_delay = self.__RETRY_MIN_DELAY_SECONDS
+            except Exception:
+                # The batch offsets are only committed once it is ingested,
+                # so the consumer is rewound and the batch is polled again.
+                logging.exception(
+                    'Error processing events, retrying in %s seconds',
+                    retry_delay)
+                self._metadata_scraper.rewind_events()
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2,
+                                  self.__RETRY_MAX_DELAY_SECONDS)
+            self._after_run()
 
     def __run(self):
         """Coordinates a full scrape > prepare > ingest process."""
@@ -62,15 +95,59 @@ class MetadataEventSynchronizer(metadata_synchronizer.MetadataSynchronizer):
         metadata_dict, event_consumer = self._metadata_scraper.get_metadata()
         self.__process_column_events(metadata_dict)
         self._log_metadata(metadata_dict)
-        tag_templates_dict = self._make_tag_templates_dict(metadata_dict)
+        attr_def_index = self._make_attribute_def_index(metadata_dict)
+        tag_templates_dict = self._make_tag_templates_dict(
+            metadata_dict, attr_def_index)
         assembled_entries = self._make_assembled_entries(
-            metadata_dict, self._atlas_entity_types)
+            metadata_dict, self._atlas_entity_types, attr_def_index)
         logging.info('==== DONE ========================================')
         logging.info('')
         self._sync_assembled_entries(assembled_entries, tag_templates_dict)
+        # Tag Templates are only created when there are entries to ingest.
+        if assembled_entries:
+            self.__created_tag_template_ids.update(tag_templates_dict)
+            self.__index_assembled_entries(assembled_entries)
         self.__process_delete_events(metadata_dict)
         self.__ack_event_consumer(event_consumer)
-        self._after_run()
+
+    def _ingest_metadata(self, tag_templates_dict, assembled_entries):
+        if self.__event_workers <= 1 or len(assembled_entries) <= 1:
+            super()._ingest_metadata(tag_templates_dict, assembled_entries)
+            return
+
+        # Tag Templates are created before the workers write the Tags.
+        super()._ingest_metadata(tag_templates_dict, [])
+
+        # Events are coalesced by guid, so each entry is written by
+        # a single worker, and the batches are processed in order.
+        workers_entries = [[] for _ in range(self.__event_workers)]
+        for assembled_entry in assembled_entries:
+            worker = zlib.crc32(assembled_entry.entry_id.encode(
+                'utf-8')) % self.__event_workers
+            workers_entries[worker].append(assembled_entry)
+
+        ingest_metadata = super()._ingest_metadata
+        with futures.ThreadPoolExecutor(
+                max_workers=self.__event_workers) as executor:
+            results = [
+                executor.submit(ingest_metadata, {}, entries)
+                for entries in workers_entries
+                if entries
+            ]
+            # Errors are raised, so the events offsets are not committed.
+            for result in results:
+                result.result()
+
+    def _make_tag_templates_dict(self, metadata_dict, attr_def_index=None):
+        tag_templates_dict = super()._make_tag_templates_dict(
+            metadata_dict, attr_def_index)
+        # Template ids contain the typedef version, so changed
+        # typedefs still have their new templates created.
+        return {
+            tag_template_id: tag_template
+            for tag_template_id, tag_template in tag_templates_dict.items()
+            if tag_template_id not in self.__created_tag_template_ids
+        }
 
     def __process_column_events(self, metadata_dict):
         # Apache Atlas column changes events does not contain tables
@@ -94,33 +171,76 @@ class MetadataEventSynchronizer(metadata_synchronizer.MetadataSynchronizer):
         logging.info('')
         logging.info('===> Processing delete events...')
 
-        entity_events = metadata_dict.get('entity_events')
+        entity_events = metadata_dict.get('entity_events') or []
+        deleted_guids = [
+            entity_event['entity']['guid']
+            for entity_event in entity_events
+            if entity_event['operationType'] == constant.ENTITY_DELETE_EVENT
+        ]
 
-        if entity_events:
-            for entity_event in entity_events:
-                operation_type = entity_event['operationType']
-                if operation_type == constant.ENTITY_DELETE_EVENT:
-                    entity = entity_event['entity']
-                    guid = entity['guid']
+        entries_resource_names = set()
+        not_indexed_guids = []
+        for guid in deleted_guids:
+            self.__table_guids_by_column_guid.pop(guid, None)
+            entry_name = self.__entry_names_by_guid.pop(guid, None)
+            if entry_name:
+                entries_resource_names.add(entry_name)
+            else:
+                not_indexed_guids.append(guid)
 
-                    entries_resource_names = self.\
-                        __get_resource_names_for_delete_events(guid)
+        entries_resource_names.update(
+            self.__get_resource_names_for_delete_events(not_indexed_guids))
 
-                    for entries_resource_name in entries_resource_names:
-                        self.__datacatalog_facade.\
-                            delete_entry(entries_resource_name)
+        with futures.ThreadPoolExecutor(
+                max_workers=self.__DELETE_ENTRIES_MAX_WORKERS) as executor:
+            list(
+                executor.map(self.__datacatalog_facade.delete_entry,
+                             sorted(entries_resource_names)))
         logging.info('==== DONE ========================================')
         logging.info('')
 
-    def __get_resource_names_for_delete_events(self, guid):
-        query_template = 'system={} tag:instance_url:{}' \
-                         ' tag:guid:{}'
-        query = query_template.format(self._SPECIFIED_SYSTEM,
-                                      self._instance_url, guid)
-        entries_resource_names = self.__datacatalog_facade. \
-            search_catalog_relative_resource_name(query)
+    def __get_resource_names_for_delete_events(self, guids):
+        entries_resource_names = []
+        for guids_query in self.__make_guids_queries('guid', guids):
+            query_template = 'system={} tag:instance_url:{} ({})'
+            query = query_template.format(self._SPECIFIED_SYSTEM,
+                                          self._instance_url, guids_query)
+            entries_resource_names.extend(
+                self.__datacatalog_facade.
+                search_catalog_relative_resource_name(query))
         return entries_resource_names
 
+    @classmethod
+    def __make_guids_queries(cls, tag_field, guids):
+        for i in range(0, len(guids), cls.__SEARCH_MAX_GUIDS):
+            yield ' OR '.join('tag:{}:{}'.format(tag_field, guid)
+                              for guid in guids[i:i + cls.__SEARCH_MAX_GUIDS])
+
+    def __index_assembled_entries(self, assembled_entries):
+        for assembled_entry in assembled_entries:
+            guid = None
+            column_guids = []
+            for tag in assembled_entry.tags:
+                if self.__COLUMN_GUID_FIELD in tag.fields:
+                    column_guids.append(
+                        tag.fields[self.__COLUMN_GUID_FIELD].string_value)
+                # Column Tags reference the column guids instead.
+                elif not tag.column and constant.ENTITY_GUID in tag.fields:
+                    guid = tag.fields[constant.ENTITY_GUID].string_value
+                    self.__put_index_value(self.__entry_names_by_guid, guid,
+                                           assembled_entry.entry.name)
+            if guid:
+                for column_guid in column_guids:
+                    self.__put_index_value(self.__table_guids_by_column_guid,
+                                           column_guid, guid)
+
+    @classmethod
+    def __put_index_value(cls, index, key, value):
+        index[key] = value
+        index.move_to_end(key)
+        if len(index) > cls.__INDEX_MAX_SIZE:
+            index.popitem(last=False)
+
     def __merge_metadata_dict(self, metadata_dict, metadata_dict_table):
         target_table_type = metadata_dict['entity_types'].get('Table')
         source_table_type = metadata_dict_table['entity_types'].get('Table')
@@ -128,31 +248,38 @@ class MetadataEventSynchronizer(metadata_synchronizer.MetadataSynchronizer):
             target_table_type['entities'].update(source_table_type['entities'])
 
     def __get_table_entities_for_column_events(self, metadata_dict):
-        entity_events = metadata_dict.get('entity_events')
-
-        if entity_events:
-            for entity_event in entity_events:
-                entity = entity_event['entity']
-                operation_type = entity_event['operationType']
-
-                guid = entity['guid']
-                type_name = entity['typeName']
+        entity_events = metadata_dict.get('entity_events') or []
+        # We don't scrape metadata for delete events
+        column_guids = [
+            entity_event['entity']['guid']
+            for entity_event in entity_events
+            if entity_event['entity']['typeName'] == constant.ATLAS_COLUMN_TYPE
+            and entity_event['operationType'] != constant.ENTITY_DELETE_EVENT
+        ]
 
-                # We don't scrape metadata for delete events
-                if type_name == constant.ATLAS_COLUMN_TYPE and \
-                        operation_type != constant.ENTITY_DELETE_EVENT:
-                    column_guid = guid
+        table_guids = []
+        not_indexed_column_guids = []
+        for column_guid in column_guids:
+            table_guid = self.__table_guids_by_column_guid.get(column_guid)
+            if table_guid:
+                self.__table_guids_by_column_guid.move_to_end(column_guid)
+                table_guids.append(table_guid)
+            else:
+                not_indexed_column_guids.append(column_guid)
 
-                    query_template = 'system={} tag:instance_url:{}' \
-                                     ' type=table tag:column_guid:{}'
-                    query = query_template.format(self._SPECIFIED_SYSTEM,
-                                                  self._instance_url,
-                                                  column_guid)
+        for guids_query in self.__make_guids_queries(self.__COLUMN_GUID_FIELD,
+                                                     not_indexed_column_guids):
+            query_template = 'system={} tag:instance_url:{} type=table ({})'
+            query = query_template.format(self._SPECIFIED_SYSTEM,
+                                          self._instance_url, guids_query)
+            table_guids.extend(
+                self.__datacatalog_facade.
+                get_tag_field_values_for_search_results(
+                    query, 'apache_atlas_entity_type_table', 'guid',
+                    self.__STRING_TYPE))
 
-                    return self.__datacatalog_facade.\
-                        get_tag_field_values_for_search_results(
-                            query, 'apache_atlas_entity_type_table', 'guid',
-                            self.__STRING_TYPE)
+        # Each table is refreshed once, even if many columns changed.
+        return list(dict.fromkeys(table_guids))
 
     @classmethod
     def __create_table_events(cls, table_guids):
@@ -170,8 +297,14 @@ class MetadataEventSynchronizer(metadata_synchronizer.MetadataSynchronizer):
 
     @classmethod
     def __ack_event_consumer(cls, event_consumer):
-        # If it's a successful ingestion we ACK
-        # the messages by closing the consumer.
-        if event_consumer:
+        # If it's a successful ingestion we ACK the messages, the
+        # consumer is kept open for the next cycles.
+        if not event_consumer:
+            return
+        try:
             event_consumer.commit()
-            event_consumer.close()
+        except kafka_errors.CommitFailedError as e:
+            # The consumer left the group while processing the batch, it
+            # rejoins on the next poll and the uncommitted events are
+            # consumed again, so the hook keeps running.
+            logging.warning('Events were processed but not committed: %s', e)
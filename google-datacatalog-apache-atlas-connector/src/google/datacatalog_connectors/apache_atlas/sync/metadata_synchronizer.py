@@ -14,7 +14,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
+import os
+import time
 import uuid
 
 from google.datacatalog_connectors.commons import cleanup, ingest
@@ -27,17 +30,26 @@ from google.datacatalog_connectors.apache_atlas import prepare, scrape
 class MetadataSynchronizer:
     _ENTRY_GROUP_ID = 'apache_atlas'
     _SPECIFIED_SYSTEM = 'apache_atlas'
+    __DEFAULT_FULL_SYNC_INTERVAL_HOURS = 24
+    # Subtracted from the scrape start time, so the next incremental sync
+    # also covers the updates the search index didn't return yet.
+    __WATERMARK_OVERLAP_MS = 5 * 60 * 1000
 
     def __init__(self,
                  datacatalog_project_id,
                  datacatalog_location_id,
                  atlas_connection_args,
                  atlas_entity_types=None,
-                 enable_monitoring=None):
+                 enable_monitoring=None,
+                 incremental_sync_state_file=None,
+                 full_sync_interval_hours=None):
         self._project_id = datacatalog_project_id
         self._location_id = datacatalog_location_id
         self._atlas_connection_args = atlas_connection_args
         self._atlas_entity_types = atlas_entity_types
+        self.__incremental_sync_state_file = incremental_sync_state_file
+        self.__full_sync_interval_hours = full_sync_interval_hours or \
+            self.__DEFAULT_FULL_SYNC_INTERVAL_HOURS
 
         event_hook = atlas_connection_args.get('event_hook')
 
@@ -56,7 +68,8 @@ class MetadataSynchronizer:
             location_id=datacatalog_location_id,
             entry_group_id=self._ENTRY_GROUP_ID,
             user_specified_system=self._SPECIFIED_SYSTEM,
-            instance_url=self._instance_url)
+            instance_url=self._instance_url,
+            max_workers=atlas_connection_args.get('prepare_workers'))
 
         self._task_id = uuid.uuid4().hex[:8]
         self._metrics_processor = metrics_processor.MetricsProcessor(
@@ -68,20 +81,109 @@ class MetadataSynchronizer:
         return atlas_connection_args['host']
 
     def run(self):
-        """Coordinates a full scrape > prepare > ingest process."""
+        """Coordinates a full scrape > prepare > ingest process.
+
+        When an incremental sync state file is provided, only the entities
+        updated since the previous run are synchronized, and a full sync,
+        which also deletes the obsolete entries, is executed at every full
+        sync interval.
+        """
+        sync_state = self.__load_sync_state()
+        updated_since = self.__get_updated_since(sync_state)
+        # Captured before scraping, so the entities updated while the
+        # scrape runs are scraped again by the next run.
+        watermark = self.__get_watermark()
+
         logging.info('')
-        logging.info('===> Scraping Apache Atlas metadata...')
-        metadata_dict, _ = self._metadata_scraper.get_metadata()
+        if updated_since:
+            logging.info('===> Scraping Apache Atlas updated metadata...')
+            metadata_dict, _ = self._metadata_scraper.get_metadata(
+                entity_types=self._atlas_entity_types,
+                updated_since=updated_since)
+        else:
+            logging.info('===> Scraping Apache Atlas metadata...')
+            metadata_dict, _ = self._metadata_scraper.get_metadata(
+                entity_types=self._atlas_entity_types)
         self._log_metadata(metadata_dict)
-        tag_templates_dict = self._make_tag_templates_dict(metadata_dict)
+        attr_def_index = self._make_attribute_def_index(metadata_dict)
+        tag_templates_dict = self._make_tag_templates_dict(
+            metadata_dict, attr_def_index)
         assembled_entries = self._make_assembled_entries(
-            metadata_dict, self._atlas_entity_types)
+            metadata_dict, self._atlas_entity_types, attr_def_index)
         logging.info('==== DONE ========================================')
         logging.info('')
-        self._clean_up_obsolete_metadata(assembled_entries)
+        # Deleted entities are not returned by the incremental
+        # scrape, so they are only cleaned up on full syncs.
+        if not updated_since:
+            self._clean_up_obsolete_metadata(assembled_entries)
         self._sync_assembled_entries(assembled_entries, tag_templates_dict)
+        self.__save_sync_state(sync_state, metadata_dict, watermark,
+                               not updated_since)
         self._after_run()
 
+    def __load_sync_state(self):
+        if not self.__incremental_sync_state_file or \
+                not os.path.exists(self.__incremental_sync_state_file):
+            return {}
+
+        try:
+            with open(self.__incremental_sync_state_file) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            logging.exception('Error loading the sync state file: %s',
+                              self.__incremental_sync_state_file)
+            return {}
+
+    def __get_updated_since(self, sync_state):
+        last_full_sync_time = sync_state.get('last_full_sync_time')
+        if not last_full_sync_time:
+            return
+
+        full_sync_interval_seconds = self.__full_sync_interval_hours * 3600
+        if time.time() - last_full_sync_time >= full_sync_interval_seconds:
+            logging.info('Full sync interval reached, running a full sync...')
+            return
+
+        return sync_state.get('watermarks')
+
+    def __get_watermark(self):
+        if not self.__incremental_sync_state_file:
+            return
+
+        server_time = self._metadata_scraper.get_server_time()
+        if server_time is None:
+            logging.info('Apache Atlas server time not available,'
+                         ' using the local time as the watermark')
+            server_time = int(time.time() * 1000)
+        return server_time - self.__WATERMARK_OVERLAP_MS
+
+    def __save_sync_state(self, sync_state, metadata_dict, watermark,
+                          full_sync):
+        if not self.__incremental_sync_state_file:
+            return
+
+        # Every scraped Entity Type was up to date at the watermark, the
+        # entities returned by the scrape are not used for it since they
+        # may shift across the search pages while it runs.
+        watermarks = dict(sync_state.get('watermarks') or {})
+        for entity_type_name in metadata_dict['entity_types']:
+            watermarks[entity_type_name] = watermark
+
+        new_sync_state = {
+            'last_full_sync_time':
+                time.time()
+                if full_sync else sync_state.get('last_full_sync_time'),
+            'watermarks':
+                watermarks
+        }
+
+        # Written to a temporary file first, so an interrupted
+        # run doesn't leave a partial state behind.
+        temp_file = '{}.tmp'.format(self.__incremental_sync_state_file)
+        with open(temp_file, 'w') as file:
+            json.dump(new_sync_state, file)
+        os.replace(temp_file, self.__incremental_sync_state_file)
+
     def _sync_assembled_entries(self, assembled_entries, tag_templates_dict):
         self._log_entries(assembled_entries)
         if assembled_entries:
@@ -110,15 +212,24 @@ class MetadataSynchronizer:
     def _after_run(self):
         self._metrics_processor.process_elapsed_time_metric()
 
-    def _make_tag_templates_dict(self, metadata_dict):
+    @classmethod
+    def _make_attribute_def_index(cls, metadata_dict):
+        # Shared by the Tag Template and Tag factories.
+        return prepare.AttributeDefIndex(metadata_dict['entity_types'],
+                                         metadata_dict['classifications'])
+
+    def _make_tag_templates_dict(self, metadata_dict, attr_def_index=None):
         return self._tag_template_factory.\
             make_tag_templates_from_apache_atlas_metadata(
-                metadata_dict)
+                metadata_dict, attr_def_index)
 
-    def _make_assembled_entries(self, metadata_dict, atlas_entity_types=None):
+    def _make_assembled_entries(self,
+                                metadata_dict,
+                                atlas_entity_types=None,
+                                attr_def_index=None):
         assembled_entries = self._assembled_entry_factory.\
             make_assembled_entries_list(
-                metadata_dict, atlas_entity_types)
+                metadata_dict, atlas_entity_types, attr_def_index)
 
         return assembled_entries
 
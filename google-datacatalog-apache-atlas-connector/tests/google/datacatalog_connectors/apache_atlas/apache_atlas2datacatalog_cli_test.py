@@ -56,11 +56,17 @@ class ApacheAtlas2DataCatalogCliTest(unittest.TestCase):
                 'host': 'my-host',
                 'port': 'my-port',
                 'user': 'my-user',
-                'pass': 'my-pass'
+                'pass': 'my-pass',
+                'max_workers': None,
+                'server_side_filtering': False,
+                'relationship_depth': None,
+                'prepare_workers': None
             },
             datacatalog_location_id='us-central1',
             datacatalog_project_id='dc-project_id',
-            enable_monitoring=None)
+            enable_monitoring=None,
+            incremental_sync_state_file=None,
+            full_sync_interval_hours=None)
 
         synchonizer = mock_metadata_synchonizer.return_value
         synchonizer.run.assert_called_once()
@@ -82,15 +88,36 @@ class ApacheAtlas2DataCatalogCliTest(unittest.TestCase):
                 'host': 'my-host',
                 'port': 'my-port',
                 'user': 'my-user',
-                'pass': 'my-pass'
+                'pass': 'my-pass',
+                'max_workers': None,
+                'server_side_filtering': False,
+                'relationship_depth': None,
+                'prepare_workers': None
             },
             datacatalog_location_id='us-central1',
             datacatalog_project_id='dc-project_id',
-            enable_monitoring=None)
+            enable_monitoring=None,
+            incremental_sync_state_file=None,
+            full_sync_interval_hours=None)
 
         synchonizer = mock_metadata_synchonizer.return_value
         synchonizer.run.assert_called_once()
 
+    @mock.patch('google.datacatalog_connectors.apache_atlas.sync'
+                '.MetadataSynchronizer')
+    def test_run_with_max_workers_should_call_synchronizer(
+            self, mock_metadata_synchonizer):
+        apache_atlas2datacatalog_cli.ApacheAtlas2DataCatalogCli.run([
+            'sync', '--datacatalog-project-id', 'dc-project_id',
+            '--atlas-host', 'my-host', '--atlas-port', 'my-port',
+            '--atlas-user', 'my-user', '--atlas-passsword', 'my-pass',
+            '--atlas-max-workers', '4'
+        ])
+
+        atlas_connection_args = mock_metadata_synchonizer.call_args[1][
+            'atlas_connection_args']
+        self.assertEqual(4, atlas_connection_args['max_workers'])
+
     @mock.patch('google.datacatalog_connectors.apache_atlas.sync'
                 '.MetadataEventSynchronizer')
     def test_run_should_call_event_synchronizer(self,
@@ -120,8 +147,15 @@ class ApacheAtlas2DataCatalogCliTest(unittest.TestCase):
                 'port': 'my-port',
                 'user': 'my-user',
                 'pass': 'my-pass',
+                'max_workers': None,
+                'server_side_filtering': False,
+                'relationship_depth': None,
+                'prepare_workers': None,
                 'event_servers': ['my-host:port'],
                 'event_consumer_group_id': 'my_consumer_group',
+                'event_batch_max_size': None,
+                'event_batch_max_wait_ms': None,
+                'event_workers': None,
                 'event_hook': True
             },
             datacatalog_location_id='us-central1',
@@ -159,6 +159,36 @@ class AssembledEntryFactoryTest(unittest.TestCase):
 
         self.assertEqual(0, len(assembled_entries))
 
+    def test_make_assembled_entries_list_workers_should_return_same_entries(
+            self):
+        tables_metadata = utils.Utils.convert_json_to_object(
+            self.__MODULE_PATH, 'tables_metadata.json')
+        for classification_name in ('Business Glossary', 'Dimension', 'ETL',
+                                    'Fact', 'Log Data', 'Metric'):
+            tables_metadata['classifications'][classification_name] = {
+                'data': {
+                    'version': 1,
+                    'attributeDefs': []
+                }
+            }
+
+        factory_args = ('project-id', 'location-id', 'entry_group_id',
+                        'user_system', 'https://test.server.com')
+        with mock.patch.object(prepare.AssembledEntryFactory,
+                               '_AssembledEntryFactory__MIN_CHUNK_SIZE', 1):
+            expected_entries = prepare.AssembledEntryFactory(
+                *factory_args).make_assembled_entries_list(tables_metadata)
+            assembled_entries = prepare.AssembledEntryFactory(
+                *factory_args,
+                max_workers=2).make_assembled_entries_list(tables_metadata)
+
+        self.assertEqual(8, len(assembled_entries))
+        for assembled_entry, expected_entry in zip(assembled_entries,
+                                                   expected_entries):
+            self.assertEqual(expected_entry.entry_id, assembled_entry.entry_id)
+            self.assertEqual(expected_entry.entry, assembled_entry.entry)
+            self.assertEqual(expected_entry.tags, assembled_entry.tags)
+
     @classmethod
     def __mock_make_entry(cls, entity):
         entry = datacatalog.Entry()
@@ -167,14 +197,14 @@ class AssembledEntryFactoryTest(unittest.TestCase):
         return entry_id, entry
 
     @classmethod
-    def __mock_make_tag(cls, entity, *_):
+    def __mock_make_tag(cls, entity, *_, **__):
         tag = datacatalog.Tag()
         tag.template = 'fake_template/entity_type/{}'.format(
             entity['data']['typeName'])
         return tag
 
     @classmethod
-    def __mock_make_tag_classification(cls, classification, *args):
+    def __mock_make_tag_classification(cls, classification, *args, **_):
         tag = datacatalog.Tag()
 
         template = 'fake_template/{}'.format(classification['typeName'])
@@ -0,0 +1,129 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from google.datacatalog_connectors.apache_atlas.prepare import \
+    attribute_def_index
+
+
+class AttributeDefIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        entity_types_dict = {
+            'Referenceable': {
+                'data': {
+                    'attributeDefs': [{
+                        'name': 'qualifiedName',
+                        'typeName': 'string'
+                    }]
+                },
+                'superTypes': []
+            },
+            'Asset': {
+                'data': {
+                    'attributeDefs': [{
+                        'name': 'name',
+                        'typeName': 'string'
+                    }, {
+                        'name': 'sizeBytes',
+                        'typeName': 'string'
+                    }]
+                },
+                'superTypes': ['Referenceable']
+            },
+            'Table': {
+                'data': {
+                    'attributeDefs': [{
+                        'name': 'sizeBytes',
+                        'typeName': 'double'
+                    }]
+                },
+                'superTypes': ['Asset', 'Unknown']
+            }
+        }
+        classifications_dict = {
+            'Confidentiality': {
+                'data': {
+                    'attributeDefs': [{
+                        'name': 'level',
+                        'typeName': 'int'
+                    }],
+                    'superTypes': []
+                }
+            },
+            'PII': {
+                'data': {
+                    'attributeDefs': [],
+                    'superTypes': ['Confidentiality']
+                }
+            }
+        }
+
+        self.__index = attribute_def_index.AttributeDefIndex(
+            entity_types_dict, classifications_dict)
+
+    def test_get_attribute_defs_should_include_super_types_defs(self):
+        attribute_defs = self.__index.get_attribute_defs('Table')
+
+        self.assertEqual(['qualifiedName', 'name', 'sizeBytes'],
+                         list(attribute_defs))
+        self.assertEqual('double', attribute_defs['sizeBytes']['typeName'])
+
+    def test_get_attribute_defs_should_resolve_each_type_once(self):
+        self.assertIs(self.__index.get_attribute_defs('Asset'),
+                      self.__index.get_attribute_defs('Asset'))
+
+    def test_get_attribute_def_classification_should_include_super_types(self):
+        self.assertEqual({
+            'name': 'level',
+            'typeName': 'int'
+        }, self.__index.get_attribute_def('PII', 'level'))
+
+    def test_get_attribute_def_unknown_should_return_none(self):
+        self.assertIsNone(self.__index.get_attribute_def('Table', 'owner'))
+        self.assertIsNone(self.__index.get_attribute_def('Unknown', 'name'))
+
+    def test_get_super_types_should_return_known_super_types(self):
+        self.assertEqual(['Asset'], self.__index.get_super_types('Table'))
+        self.assertEqual(['Confidentiality'],
+                         self.__index.get_super_types('PII'))
+
+    def test_get_attribute_defs_inheritance_cycle_should_ignore_it(self):
+        index = attribute_def_index.AttributeDefIndex({
+            'A': {
+                'data': {
+                    'attributeDefs': [{
+                        'name': 'a',
+                        'typeName': 'string'
+                    }]
+                },
+                'superTypes': ['B']
+            },
+            'B': {
+                'data': {
+                    'attributeDefs': [{
+                        'name': 'b',
+                        'typeName': 'string'
+                    }]
+                },
+                'superTypes': ['A']
+            }
+        })
+
+        self.assertEqual(['b', 'a'], list(index.get_attribute_defs('A')))
+        self.assertEqual(['B'], index.get_super_types('A'))
+        self.assertEqual([], index.get_super_types('B'))
@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import unittest
 
 from google.datacatalog_connectors.apache_atlas.prepare import \
@@ -188,6 +189,106 @@ class DataCatalogTagFactoryTest(unittest.TestCase):
             " \'typeName\': \'StorageDesc\', \'name\': \'\'}",
             tag.fields['sd'].string_value)
 
+    def test_make_tag_for_table_entity_should_not_change_entity(self):
+        entity = self.__create_table_entity_dict()
+        original_entity = copy.deepcopy(entity)
+
+        entity_types_dict = {
+            'Table': {
+                'data': {
+                    'version': 1,
+                    'attributeDefs': []
+                }
+            }
+        }
+
+        self.__factory.make_tag_for_entity(entity, entity_types_dict, {})
+
+        self.assertEqual(original_entity, entity)
+
+    def test_make_tag_for_entity_should_set_inherited_fields_types(self):
+        entity = {
+            'guid': '73bd400b-3698-4b74-a1aa-06f694c8e156',
+            'data': {
+                'typeName': 'DB',
+                'attributes': {
+                    'sizeBytes': 560000003
+                }
+            }
+        }
+
+        entity_types_dict = {
+            'DB': {
+                'data': {
+                    'version': 1,
+                    'attributeDefs': []
+                },
+                'superTypes': ['Asset']
+            },
+            'Asset': {
+                'data': {
+                    'version':
+                        1,
+                    'attributeDefs': [{
+                        'name': 'sizeBytes',
+                        'typeName': 'double'
+                    }]
+                },
+                'superTypes': []
+            }
+        }
+
+        tag = self.__factory.make_tag_for_entity(entity, entity_types_dict, {})
+
+        self.assertEqual(560000003, tag.fields['sizebytes'].double_value)
+
+    def test_make_tag_for_entity_should_keep_zero_inherited_numeric_fields(
+            self):
+        entity = {
+            'guid': '73bd400b-3698-4b74-a1aa-06f694c8e156',
+            'data': {
+                'typeName': 'DB',
+                'attributes': {
+                    'sizeBytes': 0,
+                    'tablesCount': 0,
+                    'replicas': None
+                }
+            }
+        }
+
+        entity_types_dict = {
+            'DB': {
+                'data': {
+                    'version': 1,
+                    'attributeDefs': []
+                },
+                'superTypes': ['Asset']
+            },
+            'Asset': {
+                'data': {
+                    'version':
+                        1,
+                    'attributeDefs': [{
+                        'name': 'sizeBytes',
+                        'typeName': 'double'
+                    }, {
+                        'name': 'tablesCount',
+                        'typeName': 'int'
+                    }, {
+                        'name': 'replicas',
+                        'typeName': 'int'
+                    }]
+                },
+                'superTypes': []
+            }
+        }
+
+        tag = self.__factory.make_tag_for_entity(entity, entity_types_dict, {})
+
+        self.assertEqual(0, tag.fields['sizebytes'].double_value)
+        self.assertEqual(0, tag.fields['tablescount'].double_value)
+        self.assertNotIn('replicas', tag.fields)
+
     def test_make_tag_for_view_entity_should_set_all_available_fields(self):
         entity = self.__create_view_entity_dict()
 
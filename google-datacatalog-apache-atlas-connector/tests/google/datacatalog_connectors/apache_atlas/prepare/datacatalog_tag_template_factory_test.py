@@ -438,6 +438,50 @@ class DataCatalogTagTemplateFactoryTest(unittest.TestCase):
             'retention',
             tag_template_entity_type_table.fields['retention'].display_name)
 
+    def test_make_tag_templates_from_diamond_entity_types_should_return(self):
+
+        def make_entity_type(name, attribute_name, super_types):
+            return {
+                'name': name,
+                'data': {
+                    'version':
+                        1,
+                    'name':
+                        name,
+                    'attributeDefs': [{
+                        'name': attribute_name,
+                        'typeName': 'string'
+                    }]
+                },
+                'superTypes': super_types,
+                'entities': {
+                    '1': {}
+                }
+            }
+
+        metadata_dict = {
+            'Referenceable':
+                make_entity_type('Referenceable', 'qualifiedName', []),
+            'Asset':
+                make_entity_type('Asset', 'owner', ['Referenceable']),
+            'DataSet':
+                make_entity_type('DataSet', 'schema', ['Referenceable']),
+            'Table':
+                make_entity_type('Table', 'tableType', ['Asset', 'DataSet'])
+        }
+
+        tag_templates = self.__factory.\
+            make_tag_templates_from_entity_types_metatada(
+                metadata_dict, {})
+
+        table_fields = tag_templates['apache_atlas_entity_type_table_1'].fields
+        for field_name in ('qualifiedname', 'owner', 'schema', 'tabletype'):
+            self.assertEqual(self.__STRING_TYPE,
+                             table_fields[field_name].type.primitive_type)
+        self.assertNotIn(
+            'owner',
+            tag_templates['apache_atlas_entity_type_dataset_1'].fields)
+
     def test_make_tag_templates_from_view_entity_type_should_return(self):
         metadata_dict = {
             'View': {
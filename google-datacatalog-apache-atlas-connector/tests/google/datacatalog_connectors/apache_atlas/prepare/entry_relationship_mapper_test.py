@@ -97,6 +97,42 @@ class EntryRelationshipMapperTest(unittest.TestCase):
             '{}'.format(db_entry.name),
             view_tag.fields['db_entry'].string_value)
 
+    def test_fulfill_tag_fields_should_resolve_each_column_tag(self):
+        column_entries = [
+            self.__make_fake_entry('test_column_{}'.format(i), 'column')
+            for i in range(3)
+        ]
+        column_assembled_entries = [
+            commons_prepare.AssembledEntryData(
+                column_entry.name, column_entry, [
+                    self.__make_fake_tag(
+                        string_fields=(('guid', column_entry.name[13:]),))
+                ]) for column_entry in column_entries
+        ]
+
+        table_id = 'test_table'
+        table_entry = self.__make_fake_entry(table_id, 'table')
+        table_tag = self.__make_fake_tag(string_fields=(('guid', table_id),))
+        column_tags = [
+            self.__make_fake_tag(string_fields=(('column_guid',
+                                                 'test_column_{}'.format(i)),))
+            for i in range(4)
+        ]
+        table_assembled_entry = commons_prepare.AssembledEntryData(
+            table_id, table_entry, [table_tag, *column_tags])
+
+        prepare.EntryRelationshipMapper().fulfill_tag_fields(
+            [*column_assembled_entries, table_assembled_entry])
+
+        for column_tag, column_entry in zip(column_tags, column_entries):
+            self.assertEqual(
+                'https://console.cloud.google.com/datacatalog/'
+                '{}'.format(column_entry.name),
+                column_tag.fields['column_entry'].string_value)
+        # The last column has no entry.
+        self.assertNotIn('column_entry', column_tags[3].fields)
+        self.assertNotIn('db_entry', table_tag.fields)
+
     @classmethod
     def __make_fake_entry(cls, entry_id, entry_type):
         entry = datacatalog.Entry()
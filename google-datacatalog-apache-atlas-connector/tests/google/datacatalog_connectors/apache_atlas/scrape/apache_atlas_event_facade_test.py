@@ -17,6 +17,8 @@
 import unittest
 from unittest.mock import patch
 
+from kafka import errors as kafka_errors
+
 from google.datacatalog_connectors.apache_atlas import scrape
 
 
@@ -44,10 +46,77 @@ class ApacheAtlasEventFacadeTestCase(unittest.TestCase):
         self.assertEqual(kafka_consumer.return_value, returned_consumer)
 
         kafka_consumer.assert_called_once_with('ATLAS_ENTITIES',
-                                               api_version=(0, 10),
+                                               api_version=(0, 10, 1),
                                                auto_offset_reset='earliest',
                                                bootstrap_servers='my_host',
-                                               consumer_timeout_ms=10000,
                                                enable_auto_commit=False,
                                                group_id='my_consumer_group',
+                                               max_poll_interval_ms=1001000,
                                                session_timeout_ms=300000)
+
+    @patch('google.datacatalog_connectors.apache_atlas.scrape.'
+           'apache_atlas_event_facade.KafkaConsumer')
+    def test_create_event_consumer_small_batches_should_keep_default_interval(
+            self, kafka_consumer):
+        self.__atlas_event_facade = scrape.ApacheAtlasEventFacade({
+            'event_servers': 'my_host',
+            'event_consumer_group_id': 'my_consumer_group',
+            'event_batch_max_size': 10
+        })
+
+        self.__atlas_event_facade.create_event_consumer()
+
+        self.assertEqual(300000,
+                         kafka_consumer.call_args[1]['max_poll_interval_ms'])
+
+    @patch('google.datacatalog_connectors.apache_atlas.scrape.'
+           'apache_atlas_event_facade.KafkaConsumer')
+    def test_poll_events_should_reuse_event_consumer(self, kafka_consumer):
+        self.__atlas_event_facade = scrape.ApacheAtlasEventFacade({
+            'event_servers': 'my_host',
+            'event_consumer_group_id': 'my_consumer_group',
+            'event_batch_max_size': 100
+        })
+
+        consumer = kafka_consumer.return_value
+        consumer.poll.side_effect = [{
+            'partition_0': ['msg_1', 'msg_2'],
+            'partition_1': ['msg_3']
+        }, {}]
+
+        self.assertEqual(['msg_1', 'msg_2', 'msg_3'],
+                         self.__atlas_event_facade.poll_events())
+        self.assertEqual([], self.__atlas_event_facade.poll_events())
+
+        kafka_consumer.assert_called_once()
+        consumer.poll.assert_called_with(timeout_ms=1000, max_records=100)
+
+    @patch('google.datacatalog_connectors.apache_atlas.scrape.'
+           'apache_atlas_event_facade.KafkaConsumer')
+    def test_rewind_events_should_seek_committed_offsets(self, kafka_consumer):
+        consumer = kafka_consumer.return_value
+        consumer.poll.return_value = {}
+        consumer.assignment.return_value = ['partition_0', 'partition_1']
+        consumer.committed.side_effect = [195, None]
+
+        self.__atlas_event_facade.poll_events()
+        self.__atlas_event_facade.rewind_events()
+
+        consumer.seek.assert_called_once_with('partition_0', 195)
+        consumer.seek_to_beginning.assert_called_once_with('partition_1')
+
+    @patch('google.datacatalog_connectors.apache_atlas.scrape.'
+           'apache_atlas_event_facade.KafkaConsumer')
+    def test_rewind_events_error_should_close_event_consumer(
+            self, kafka_consumer):
+        consumer = kafka_consumer.return_value
+        consumer.poll.return_value = {}
+        consumer.assignment.return_value = ['partition_0']
+        consumer.committed.side_effect = kafka_errors.KafkaTimeoutError()
+
+        self.__atlas_event_facade.poll_events()
+        self.__atlas_event_facade.rewind_events()
+        self.__atlas_event_facade.poll_events()
+
+        consumer.close.assert_called_once_with(autocommit=False)
+        self.assertEqual(2, kafka_consumer.call_count)
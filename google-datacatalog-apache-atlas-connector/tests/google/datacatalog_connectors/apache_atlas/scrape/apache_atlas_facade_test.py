@@ -17,6 +17,7 @@
 import unittest
 from unittest.mock import patch
 
+from atlasclient import exceptions
 from google.datacatalog_connectors.commons_test import utils
 
 from google.datacatalog_connectors.apache_atlas import scrape
@@ -77,6 +78,13 @@ class ApacheAtlasFacadeTestCase(unittest.TestCase):
                              response['entityDeleted'])
         self.assertDictEqual(metric.general, response['generalMetrics'])
 
+    def test_get_server_time_should_return_metrics_collection_time(self):
+        metric = utils.MockedObject()
+        metric.general = {'collectionTime': 1590773837477}
+        self.__atlas_client.admin_metrics = [metric]
+
+        self.assertEqual(1590773837477, self.__atlas_facade.get_server_time())
+
     def test_get_typedefs(self):
         self.__atlas_client.typedefs = True
 
@@ -240,6 +248,116 @@ class ApacheAtlasFacadeTestCase(unittest.TestCase):
 
         self.assertEqual(0, len(response))
 
+    @patch('atlasclient.client.Atlas')
+    def test_search_entities_with_entities_count_should_fetch_planned_pages(
+            self, atlas_client):
+        atlas_facade = scrape.ApacheAtlasFacade({
+            'host': 'my_host',
+            'port': 'my_port',
+            'user': 'my_user',
+            'pass': 'my_pass',
+            'max_workers': 4
+        })
+
+        # 320 entities exist, but the admin metrics reported 250.
+        def search_dsl(typeName, offset, limit):
+            search_result = utils.MockedObject()
+            search_result.entities = []
+            for i in range(offset, min(offset + limit, 320)):
+                table = utils.MockedObject()
+                table._data = {
+                    'typeName': typeName,
+                    'guid': 'guid_{}'.format(i),
+                    'status': 'ACTIVE'
+                }
+                search_result.entities.append(table)
+            return [search_result]
+
+        atlas_client.return_value.search_dsl.side_effect = search_dsl
+
+        response = atlas_facade.search_entities_from_entity_type('Table', 250)
+
+        self.assertEqual(320, len(response))
+        self.assertEqual(320,
+                         len({result._data['guid'] for result in response}))
+        offsets = sorted(
+            call[1]['offset']
+            for call in atlas_client.return_value.search_dsl.call_args_list)
+        # 3 planned pages, plus the pages fetched by the guard.
+        self.assertEqual([0, 100, 200, 300, 400], offsets)
+
+    def test_search_entities_batches_should_yield_filtered_pages(self):
+        search_results = []
+        for status in ['ACTIVE', 'DELETED']:
+            search_result = utils.MockedObject()
+            table = utils.MockedObject()
+            table._data = {'typeName': 'Table', 'status': status}
+            search_result.entities = [table]
+            search_results.append([search_result])
+
+        self.__atlas_client.search_dsl.side_effect = [*search_results, []]
+
+        batches = self.__atlas_facade.\
+            search_entities_batches_from_entity_type('Table')
+
+        self.assertEqual(1, len(next(batches)))
+        self.assertEqual(1, self.__atlas_client.search_dsl.call_count)
+        self.assertEqual([[], []], list(batches))
+        self.assertEqual(3, self.__atlas_client.search_dsl.call_count)
+
+    @patch('atlasclient.client.Atlas')
+    def test_search_entities_server_side_filtering_should_send_query(
+            self, atlas_client):
+        atlas_facade = scrape.ApacheAtlasFacade({
+            'host': 'my_host',
+            'port': 'my_port',
+            'user': 'my_user',
+            'pass': 'my_pass',
+            'server_side_filtering': True
+        })
+
+        search_result = utils.MockedObject()
+        table = utils.MockedObject()
+        table._data = {'typeName': 'Table', 'status': 'ACTIVE'}
+        search_result.entities = [table]
+
+        atlas_client.return_value.search_dsl.side_effect = [[search_result],
+                                                            []]
+
+        response = atlas_facade.search_entities_from_entity_type('Table')
+
+        self.assertEqual(1, len(response))
+        atlas_client.return_value.search_dsl.assert_called_with(
+            typeName='Table',
+            offset=100,
+            limit=100,
+            query="where __state = 'ACTIVE' and __typeName = 'Table'")
+
+    @patch('atlasclient.client.Atlas')
+    def test_search_entities_updated_since_should_send_query(
+            self, atlas_client):
+        atlas_facade = scrape.ApacheAtlasFacade({
+            'host': 'my_host',
+            'port': 'my_port',
+            'user': 'my_user',
+            'pass': 'my_pass',
+            'max_workers': 4,
+            'server_side_filtering': True
+        })
+
+        atlas_client.return_value.search_dsl.return_value = []
+
+        atlas_facade.search_entities_from_entity_type('Table', 1000,
+                                                      1589983850688)
+
+        # The entities count is not used to plan the updated entities pages.
+        atlas_client.return_value.search_dsl.assert_called_once_with(
+            typeName='Table',
+            offset=0,
+            limit=100,
+            query="where __state = 'ACTIVE' and __typeName = 'Table'"
+            ' and __modificationTimestamp >= 1589983850688')
+
     def test_search_entities_no_return_should_return_empty(self):
         self.__atlas_client.search_dsl.return_value = []
 
@@ -331,7 +449,107 @@ class ApacheAtlasFacadeTestCase(unittest.TestCase):
 
         self.assertEqual(1, len(response))
         self.assertEqual(table_1.guid, response[guid]['guid'])
-        self.assertDictEqual(table_1._data, response[guid]['data'])
+        self.assertDictEqual(
+            {
+                'guid': guid,
+                'typeName': 'Table',
+                'status': 'ACTIVE',
+                'attributes': table_1._data['attributes'],
+                'createTime': 1589983835765,
+                'updateTime': 1589983850688
+            }, response[guid]['data'])
+        self.assertEqual([], response[guid]['classifications'])
+        self.__atlas_client.entity_bulk.assert_called_once_with(
+            guid=[guid], minExtInfo='true', ignoreRelationships='true')
+
+    def test_fetch_entities_should_return_deduplicated_classifications(self):
+        table_1 = utils.MockedObject()
+        guid = '30cfc9fc-aec4-4017-b649-f1f92351a727'
+        table_1.guid = guid
+        table_1._data = {
+            'typeName':
+                'Table',
+            'attributes': {},
+            'guid':
+                guid,
+            'classifications': [{
+                'typeName': 'ETL',
+                'entityGuid': 'e73656c9-da05-4db7-9b88-e3669c1a98eb',
+                'propagate': True
+            }, {
+                'typeName': 'ETL',
+                'entityGuid': guid,
+                'propagate': True
+            }]
+        }
+
+        collection_item = utils.MockedObject()
+        collection_item.entities = lambda: [table_1]
+        self.__atlas_client.entity_bulk.return_value = [collection_item]
+
+        response = self.__atlas_facade.fetch_entities([guid])
+
+        classifications = response[guid]['classifications']
+        self.assertEqual(1, len(classifications))
+        self.assertEqual(guid, classifications[0]['entityGuid'])
+        self.__atlas_client.entity_guid.assert_not_called()
+
+    @patch('atlasclient.client.Atlas')
+    def test_fetch_entities_concurrently_should_merge_chunks(
+            self, atlas_client):
+        atlas_facade = scrape.ApacheAtlasFacade({
+            'host': 'my_host',
+            'port': 'my_port',
+            'user': 'my_user',
+            'pass': 'my_pass',
+            'max_workers': 4
+        })
+
+        def entity_bulk(guid, **params):
+            collection_item = utils.MockedObject()
+            entities = []
+            for entity_guid in guid:
+                entity = utils.MockedObject()
+                entity.guid = entity_guid
+                entity._data = {'guid': entity_guid, 'attributes': {}}
+                entities.append(entity)
+            collection_item.entities = lambda: entities
+            return [collection_item]
+
+        atlas_client.return_value.entity_bulk.side_effect = entity_bulk
+
+        guids = ['guid_{}'.format(i) for i in range(1000)]
+        response = atlas_facade.fetch_entities(guids)
+
+        self.assertEqual(1000, len(response))
+        self.assertEqual(4, atlas_client.return_value.entity_bulk.call_count)
+
+    @patch('time.sleep', lambda *args: None)
+    def test_fetch_entities_transient_error_should_retry(self):
+        table_1 = utils.MockedObject()
+        table_1.guid = 'guid_1'
+        table_1._data = {'guid': 'guid_1', 'attributes': {}}
+
+        collection_item = utils.MockedObject()
+        collection_item.entities = lambda: [table_1]
+
+        self.__atlas_client.entity_bulk.side_effect = [
+            exceptions.ServerUnavailable(), [collection_item]
+        ]
+
+        response = self.__atlas_facade.fetch_entities(['guid_1'])
+
+        self.assertEqual(1, len(response))
+        self.assertEqual(2, self.__atlas_client.entity_bulk.call_count)
+
+    @patch('time.sleep', lambda *args: None)
+    def test_fetch_entities_persistent_error_should_raise(self):
+        self.__atlas_client.entity_bulk.side_effect = \
+            exceptions.ServerUnavailable()
+
+        self.assertRaises(exceptions.ServerUnavailable,
+                          self.__atlas_facade.fetch_entities, ['guid_1'])
+        self.assertEqual(3, self.__atlas_client.entity_bulk.call_count)
 
     def test_fetch_entity_classifications_should_return(self):
         returned_entity = utils.MockedObject()
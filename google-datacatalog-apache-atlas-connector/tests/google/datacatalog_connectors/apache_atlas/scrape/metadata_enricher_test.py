@@ -120,3 +120,35 @@ class MetadataEnricherTest(unittest.TestCase):
             fetched_entities_dict['c0ebcb5e-21f8-424d-bf11-f39bb943ae2c']
             ['classifications'])
         self.assertEqual(entity_classifications, classifications)
+
+    def test_enrich_entity_classifications_bulk_fetched_should_not_fetch(self):
+        entity_classifications = [{
+            'typeName': 'PII',
+            'entityGuid': 'c0ebcb5e-21f8-424d-bf11-f39bb943ae2c',
+            'propagate': True
+        }]
+        fetched_entities_dict = {
+            'c0ebcb5e-21f8-424d-bf11-f39bb943ae2c': {
+                'guid': 'c0ebcb5e-21f8-424d-bf11-f39bb943ae2c',
+                'data': {},
+                'classifications': entity_classifications
+            }
+        }
+        searched_entries = {
+            'c0ebcb5e-21f8-424d-bf11-f39bb943ae2c': {
+                'guid': 'c0ebcb5e-21f8-424d-bf11-f39bb943ae2c',
+                'data': {
+                    'classificationNames': ['PII']
+                }
+            }
+        }
+
+        self.__enricher.enrich_entity_classifications(fetched_entities_dict,
+                                                      searched_entries)
+
+        self.__apache_atlas_facade.fetch_entity_classifications.\
+            assert_not_called()
+        self.assertEqual(
+            entity_classifications,
+            fetched_entities_dict['c0ebcb5e-21f8-424d-bf11-f39bb943ae2c']
+            ['classifications'])
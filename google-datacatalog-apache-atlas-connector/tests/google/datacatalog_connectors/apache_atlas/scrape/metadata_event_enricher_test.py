@@ -156,3 +156,86 @@ class MetadataEventEnricherTest(unittest.TestCase):
             enrich_entities_attributes_and_classifications(guids)
 
         self.assertDictEqual(expected_entities, returned_entities)
+
+    def test_enrich_entity_types_relationships_should_fetch_by_level(self):
+        event_enricher = metadata_event_enricher.MetadataEventEnricher(
+            self.__apache_atlas_facade, relationship_depth=2)
+
+        entity_types_dict = {
+            'DB': {
+                'entities': {}
+            },
+            'Column': {
+                'entities': {}
+            },
+            'StorageDesc': {
+                'entities': {}
+            }
+        }
+
+        fetched_entities = {
+            'db_1': {
+                'guid': 'db_1',
+                'data': {
+                    'attributes': {}
+                },
+                'classifications': []
+            },
+            'column_1': {
+                'guid': 'column_1',
+                'data': {
+                    'attributes': {
+                        'sd': {
+                            'guid': 'sd_1',
+                            'typeName': 'StorageDesc'
+                        }
+                    }
+                },
+                'classifications': []
+            },
+            'sd_1': {
+                'guid': 'sd_1',
+                'data': {
+                    'attributes': {
+                        'column': {
+                            'guid': 'column_1',
+                            'typeName': 'Column'
+                        }
+                    }
+                },
+                'classifications': []
+            }
+        }
+
+        self.__apache_atlas_facade.fetch_entities.side_effect = \
+            lambda guids: {guid: fetched_entities[guid] for guid in guids}
+
+        entities = {
+            'table_1': {
+                'data': {
+                    'attributes': {
+                        'db': {
+                            'guid': 'db_1',
+                            'typeName': 'DB'
+                        },
+                        'columns': [{
+                            'guid': 'column_1',
+                            'typeName': 'Column'
+                        }, {
+                            'guid': 'column_1',
+                            'typeName': 'Column'
+                        }]
+                    }
+                }
+            }
+        }
+
+        event_enricher.enrich_entity_types_relationships(
+            entities, entity_types_dict)
+
+        self.__apache_atlas_facade.fetch_entities.assert_has_calls(
+            [mock.call(['db_1', 'column_1']),
+             mock.call(['sd_1'])])
+        self.assertEqual(2,
+                         self.__apache_atlas_facade.fetch_entities.call_count)
+        self.assertIn('sd_1', entity_types_dict['StorageDesc']['entities'])
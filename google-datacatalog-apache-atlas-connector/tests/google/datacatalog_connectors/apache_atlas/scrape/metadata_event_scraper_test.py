@@ -108,11 +108,104 @@ class MetadataEventScraperTest(unittest.TestCase):
             0, self.__apache_atlas_facade.search_entities_from_entity_type.
             call_count)
 
+    @mock.patch(
+        '{}.metadata_enricher.MetadataEnricher.enrich_entity_relationships'.
+        format(__SCRAPE_PACKAGE))
+    def test_scrape_events_should_use_cached_typedefs(
+            self, enrich_entity_relationships):
+        metadata = self.__create_scrape_event_scenario(
+            'add_classification_events')
+        entity_events = metadata['entity_events']
+
+        self.__scrape.get_metadata(entity_events=entity_events)
+
+        self.__apache_atlas_facade.get_typedefs.assert_called_once()
+        self.__apache_atlas_facade.get_admin_metrics.assert_called_once()
+
+        # An event with an unknown type refreshes the cached typedefs.
+        new_type_event = json.loads(json.dumps(entity_events[0]))
+        new_type_event['entity']['typeName'] = 'new_type'
+        self.__scrape.get_metadata(entity_events=[new_type_event])
+
+        self.assertEqual(2, self.__apache_atlas_facade.get_typedefs.call_count)
+
+    @mock.patch(
+        '{}.metadata_enricher.MetadataEnricher.enrich_entity_relationships'.
+        format(__SCRAPE_PACKAGE))
+    def test_scrape_events_new_attribute_should_refresh_cached_typedefs(
+            self, enrich_entity_relationships):
+        metadata = self.__create_scrape_event_scenario(
+            'add_classification_events')
+        entity_event = metadata['entity_events'][0]
+        entity_event['entity']['attributes']['precision'] = 10
+
+        # The Column type gains the precision attribute in Apache Atlas.
+        typedef = self.__apache_atlas_facade.get_typedefs.return_value[0]
+        column_type = next(entity_type for entity_type in typedef.entityDefs
+                           if entity_type.name == 'Column')
+        column_type._data = dict(column_type._data)
+        column_type._data['attributeDefs'] = \
+            column_type._data['attributeDefs'] + [{
+                'name': 'precision',
+                'typeName': 'int'
+            }]
+
+        self.__scrape.get_metadata(entity_events=[entity_event])
+        self.assertEqual(2, self.__apache_atlas_facade.get_typedefs.call_count)
+
+        # The refreshed typedefs know the new attribute.
+        self.__scrape.get_metadata(entity_events=[entity_event])
+        self.assertEqual(2, self.__apache_atlas_facade.get_typedefs.call_count)
+
+    @mock.patch(
+        '{}.metadata_enricher.MetadataEnricher.enrich_entity_relationships'.
+        format(__SCRAPE_PACKAGE))
+    def test_scrape_events_should_coalesce_events_by_guid(
+            self, enrich_entity_relationships):
+        self.__create_scrape_event_scenario('add_classification_events')
+
+        event_msgs = []
+        for offset, (guid, operation_type) in enumerate([
+            ('guid_1', 'ENTITY_CREATE'),
+            ('guid_2', 'ENTITY_UPDATE'),
+            ('guid_1', 'ENTITY_UPDATE'),
+            ('guid_3', 'ENTITY_DELETE'),
+            ('guid_2', 'CLASSIFICATION_ADD'),
+            ('guid_1', 'ENTITY_DELETE'),
+            ('guid_3', 'ENTITY_UPDATE'),
+        ]):
+            event_msg = utils.MockedObject()
+            event_msg.topic = 'ATLAS_ENTITIES'
+            event_msg.partition = 0
+            event_msg.offset = offset
+            event_msg.key = None
+            event_msg.value = json.dumps({
+                'message': {
+                    'entity': {
+                        'guid': guid,
+                        'typeName': 'Table'
+                    },
+                    'operationType': operation_type
+                }
+            }).encode('utf-8')
+            event_msgs.append(event_msg)
+        self.__apache_atlas_event_facade.poll_events.return_value = \
+            event_msgs
+
+        metadata, _ = self.__scrape.get_metadata()
+
+        # guid_1 is created and deleted, guid_3 updates after the delete
+        # are ignored and guid_2 keeps its latest event.
+        self.assertEqual(
+            [('guid_3', 'ENTITY_DELETE'), ('guid_2', 'CLASSIFICATION_ADD')],
+            [(entity_event['entity']['guid'], entity_event['operationType'])
+             for entity_event in metadata['entity_events']])
+
     def __create_scrape_event_scenario(self, event_name):
         # Step 1 - Set up event message
         event_msgs = self.__make_delete_classification_events_object(
             event_name)
-        self.__apache_atlas_event_facade.create_event_consumer.return_value =\
+        self.__apache_atlas_event_facade.poll_events.return_value = \
             event_msgs
         # Step 2 - create the lazy object returned by Apache Atlas facade
         typedef = utils.MockedObject()
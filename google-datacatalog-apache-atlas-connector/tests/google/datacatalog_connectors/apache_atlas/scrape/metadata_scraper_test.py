@@ -72,7 +72,8 @@ class MetadataScraperTest(unittest.TestCase):
         # Step 5 - create the return for search results
         search_results = self.__make_search_results_object()
         self.__apache_atlas_facade.\
-            search_entities_from_entity_type.return_value = search_results
+            search_entities_batches_from_entity_type.return_value = \
+            [search_results]
 
         # Step 6 - create the return for fetched entities
         fetched_entities_dict = \
@@ -106,11 +107,152 @@ class MetadataScraperTest(unittest.TestCase):
         self.__apache_atlas_facade.get_typedefs.assert_called_once()
         self.assertEqual(
             types_count, self.__apache_atlas_facade.
-            search_entities_from_entity_type.call_count)
+            search_entities_batches_from_entity_type.call_count)
         self.assertEqual(types_count,
                          self.__apache_atlas_facade.fetch_entities.call_count)
         self.assertEqual(types_count, enrich_entity_classifications.call_count)
 
+    @mock.patch(
+        '{}.metadata_enricher.MetadataEnricher.enrich_entity_relationships'.
+        format(__SCRAPE_PACKAGE))
+    @mock.patch(
+        '{}.metadata_enricher.MetadataEnricher.enrich_entity_classifications'.
+        format(__SCRAPE_PACKAGE))
+    def test_scrape_entity_types_should_scrape_allowed_and_related_types(
+            self, enrich_entity_classifications, enrich_entity_relationships):
+        typedef = utils.MockedObject()
+        self.__apache_atlas_facade.get_typedefs.return_value = [typedef]
+        typedef.classificationDefs = self.__make_classification_object()
+        typedef.enumDefs = self.__make_enum_types_object()
+        typedef.entityDefs = self.__make_entity_type_object()
+
+        self.__apache_atlas_facade.\
+            search_entities_batches_from_entity_type.return_value = \
+            [self.__make_search_results_object()]
+        self.__apache_atlas_facade.fetch_entities.return_value = \
+            utils.Utils.convert_json_to_object(self.__MODULE_PATH,
+                                               'fetched_entities_dict.json')
+
+        metadata, _ = self.__scrape.get_metadata(entity_types=['Table'])
+
+        # Every Entity Type is kept for the Tag Templates creation.
+        self.assertEqual(51, len(metadata['entity_types']))
+        self.assertFalse(metadata['entity_types']['hive_column']['entities'])
+
+        searched_types = sorted(
+            call[0][0] for call in self.__apache_atlas_facade.
+            search_entities_batches_from_entity_type.call_args_list)
+        # Column, DB and StorageDesc are referenced by Table attributes,
+        # AtlasServer by the ones inherited from Referenceable.
+        self.assertEqual(
+            ['AtlasServer', 'Column', 'DB', 'StorageDesc', 'Table'],
+            searched_types)
+        self.assertEqual(5,
+                         self.__apache_atlas_facade.fetch_entities.call_count)
+
+    @mock.patch(
+        '{}.metadata_enricher.MetadataEnricher.enrich_entity_relationships'.
+        format(__SCRAPE_PACKAGE))
+    @mock.patch(
+        '{}.metadata_enricher.MetadataEnricher.enrich_entity_classifications'.
+        format(__SCRAPE_PACKAGE))
+    def test_scrape_entity_type_should_fetch_entities_while_searching(
+            self, enrich_entity_classifications, enrich_entity_relationships):
+        typedef = utils.MockedObject()
+        self.__apache_atlas_facade.get_typedefs.return_value = [typedef]
+        typedef.classificationDefs = []
+        typedef.enumDefs = []
+        entity_type = utils.MockedObject()
+        entity_type.name = 'Table'
+        entity_type.superTypes = []
+        entity_type._data = {}
+        typedef.entityDefs = [entity_type]
+
+        def make_search_results(start, end):
+            search_results = []
+            for i in range(start, end):
+                search_result = utils.MockedObject()
+                search_result.guid = 'guid_{}'.format(i)
+                search_result._data = {'classificationNames': []}
+                search_results.append(search_result)
+            return search_results
+
+        self.__apache_atlas_facade.\
+            search_entities_batches_from_entity_type.return_value = [
+                make_search_results(0, 700),
+                make_search_results(700, 1400),
+                make_search_results(1400, 1500)
+            ]
+        self.__apache_atlas_facade.fetch_entities.side_effect = \
+            lambda guids: {guid: {'guid': guid, 'data': {}} for guid in guids}
+
+        metadata, _ = self.__scrape.get_metadata()
+
+        self.assertEqual(1500,
+                         len(metadata['entity_types']['Table']['entities']))
+        fetch_calls = self.__apache_atlas_facade.fetch_entities.call_args_list
+        self.assertEqual(2, len(fetch_calls))
+        self.assertEqual(1400, len(fetch_calls[0][0][0]))
+        self.assertEqual(100, len(fetch_calls[1][0][0]))
+
+    def test_scrape_updated_entities_should_fetch_related_entities(self):
+        typedef = utils.MockedObject()
+        self.__apache_atlas_facade.get_typedefs.return_value = [typedef]
+        typedef.classificationDefs = []
+        typedef.enumDefs = []
+        entity_types = []
+        for entity_type_name in ['Table', 'DB']:
+            entity_type = utils.MockedObject()
+            entity_type.name = entity_type_name
+            entity_type.superTypes = []
+            entity_type._data = {}
+            entity_types.append(entity_type)
+        typedef.entityDefs = entity_types
+
+        table = utils.MockedObject()
+        table.guid = 'table_guid'
+        table._data = {'classificationNames': []}
+
+        self.__apache_atlas_facade.\
+            search_entities_batches_from_entity_type.side_effect = \
+            lambda entity_type_name, *args: \
+            [[table]] if entity_type_name == 'Table' else [[]]
+
+        fetched_entities = {
+            'table_guid': {
+                'guid': 'table_guid',
+                'data': {
+                    'attributes': {
+                        'db': {
+                            'guid': 'db_guid',
+                            'typeName': 'DB'
+                        }
+                    }
+                },
+                'classifications': []
+            },
+            'db_guid': {
+                'guid': 'db_guid',
+                'data': {
+                    'attributes': {}
+                },
+                'classifications': []
+            }
+        }
+        self.__apache_atlas_facade.fetch_entities.side_effect = \
+            lambda guids: {guid: fetched_entities[guid] for guid in guids}
+
+        metadata, _ = self.__scrape.get_metadata(
+            updated_since={'Table': 1589983850688})
+
+        self.__apache_atlas_facade.search_entities_batches_from_entity_type.\
+            assert_any_call('Table', None, 1589983850688)
+        # The unchanged DB referenced by the updated Table is fetched.
+        self.assertIn('db_guid', metadata['entity_types']['DB']['entities'])
+        table_db = metadata['entity_types']['Table']['entities']['table_guid'][
+            'data']['attributes']['db']
+        self.assertEqual({'attributes': {}}, table_db['data'])
+
     def __make_classification_object(self):
         classifications = \
             utils.Utils.convert_json_to_object(self.__MODULE_PATH,
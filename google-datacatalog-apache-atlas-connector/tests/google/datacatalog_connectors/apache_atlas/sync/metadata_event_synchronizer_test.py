@@ -19,6 +19,7 @@ import unittest
 from unittest import mock
 
 from google.datacatalog_connectors.commons_test import utils
+from kafka import errors as kafka_errors
 
 from google.datacatalog_connectors.apache_atlas import sync
 
@@ -63,9 +64,10 @@ class MetadataEventSynchronizerTest(unittest.TestCase):
         self.assertIsNotNone(
             attrs['_MetadataEventSynchronizer__datacatalog_facade'])
 
-    @mock.patch('{}.sleep'.format(_EVENT_SYNC_MODULE),
-                side_effect=InterruptedError)
-    def test_run_no_metadata_should_succeed(self, mock_sleep, mock_mapper,
+    @mock.patch(
+        '{}.MetadataEventSynchronizer._after_run'.format(_EVENT_SYNC_MODULE),
+        side_effect=InterruptedError)
+    def test_run_no_metadata_should_succeed(self, mock_after_run, mock_mapper,
                                             mock_cleaner, mock_ingestor):
         scraper = self.__synchronizer.__dict__['_metadata_scraper']
 
@@ -80,7 +82,7 @@ class MetadataEventSynchronizerTest(unittest.TestCase):
         # We force an InterruptedError to stop the event_consumer poll loop
         with self.assertRaises(InterruptedError):
             self.__synchronizer.run()
-            mock_sleep.assert_called_once()
+            mock_after_run.assert_called_once()
             scraper.get_metadata.assert_called_once()
 
             mapper = mock_mapper.return_value
@@ -93,11 +95,63 @@ class MetadataEventSynchronizerTest(unittest.TestCase):
             ingestor.ingest_metadata.assert_called_once()
 
             event_consumer.commit.assert_called_once()
-            event_consumer.close.assert_called_once()
+            event_consumer.close.assert_not_called()
 
-    @mock.patch('{}.sleep'.format(_EVENT_SYNC_MODULE),
-                side_effect=InterruptedError)
-    def test_run_metadata_should_succeed(self, mock_sleep, mock_mapper,
+    @mock.patch(
+        '{}.MetadataEventSynchronizer._after_run'.format(_EVENT_SYNC_MODULE),
+        side_effect=InterruptedError)
+    def test_run_commit_failed_should_keep_running(self, mock_after_run, *_):
+        scraper = self.__synchronizer.__dict__['_metadata_scraper']
+
+        event_consumer = mock.MagicMock()
+        event_consumer.commit.side_effect = kafka_errors.CommitFailedError()
+
+        scraper.get_metadata.return_value = {
+            'classifications': {},
+            'entity_types': {},
+            'enum_types': {},
+            'entity_events': {}
+        }, event_consumer
+        # The commit error is handled, so the loop is only stopped
+        # by the InterruptedError raised after the cycle.
+        with self.assertRaises(InterruptedError):
+            self.__synchronizer.run()
+
+        event_consumer.commit.assert_called_once()
+        mock_after_run.assert_called_once()
+
+    @mock.patch('{}.time.sleep'.format(_EVENT_SYNC_MODULE))
+    @mock.patch(
+        '{}.MetadataEventSynchronizer._after_run'.format(_EVENT_SYNC_MODULE),
+        side_effect=[None, InterruptedError])
+    def test_run_error_should_rewind_and_retry_events(self, mock_after_run,
+                                                      mock_sleep, *_):
+        scraper = self.__synchronizer.__dict__['_metadata_scraper']
+
+        event_consumer = mock.MagicMock()
+        scraper.get_metadata.side_effect = [
+            ConnectionError('Apache Atlas unavailable'),
+            ({
+                'classifications': {},
+                'entity_types': {},
+                'enum_types': {},
+                'entity_events': {}
+            }, event_consumer)
+        ]
+
+        with self.assertRaises(InterruptedError):
+            self.__synchronizer.run()
+
+        # The failed batch is not committed, but polled again.
+        scraper.rewind_events.assert_called_once()
+        mock_sleep.assert_called_once_with(1)
+        self.assertEqual(2, scraper.get_metadata.call_count)
+        event_consumer.commit.assert_called_once()
+
+    @mock.patch(
+        '{}.MetadataEventSynchronizer._after_run'.format(_EVENT_SYNC_MODULE),
+        side_effect=InterruptedError)
+    def test_run_metadata_should_succeed(self, mock_after_run, mock_mapper,
                                          mock_cleaner, mock_ingestor):
         scraper = self.__synchronizer.__dict__['_metadata_scraper']
 
@@ -119,7 +173,7 @@ class MetadataEventSynchronizerTest(unittest.TestCase):
 
         with self.assertRaises(InterruptedError):
             self.__synchronizer.run()
-            mock_sleep.assert_called_once()
+            mock_after_run.assert_called_once()
             scraper.get_metadata.assert_called_once()
 
             mapper = mock_mapper.return_value
@@ -132,13 +186,107 @@ class MetadataEventSynchronizerTest(unittest.TestCase):
             ingestor.ingest_metadata.assert_called_once()
 
             event_consumer.commit.assert_called_once()
-            event_consumer.close.assert_called_once()
+            event_consumer.close.assert_not_called()
+
+    @mock.patch(
+        '{}.MetadataEventSynchronizer._after_run'.format(_EVENT_SYNC_MODULE),
+        side_effect=[None, InterruptedError])
+    def test_run_should_not_create_tag_templates_twice(self, mock_after_run,
+                                                       mock_mapper,
+                                                       mock_cleaner,
+                                                       mock_ingestor):
+        scraper = self.__synchronizer.__dict__['_metadata_scraper']
+        assembled_entry_factory = self.__synchronizer.__dict__[
+            '_assembled_entry_factory']
+
+        entity_types_dict = utils.Utils.convert_json_to_object(
+            self.__MODULE_PATH, 'entity_types_metadata_for_tag_templates.json')
+
+        classifications_dict = utils.Utils.convert_json_to_object(
+            self.__MODULE_PATH,
+            'classifications_metadata_for_tag_templates.json')
+
+        scraper.get_metadata.return_value = {
+            'classifications': classifications_dict,
+            'entity_types': entity_types_dict,
+            'enum_types': {},
+            'entity_events': []
+        }, None
+        assembled_entry_factory.make_assembled_entries_list.return_value = [
+            mock.MagicMock()
+        ]
+
+        with self.assertRaises(InterruptedError):
+            self.__synchronizer.run()
+
+        ingestor = mock_ingestor.return_value
+        ingest_calls = ingestor.ingest_metadata.call_args_list
+        self.assertEqual(2, len(ingest_calls))
+        self.assertTrue(ingest_calls[0][0][1])
+        self.assertEqual({}, ingest_calls[1][0][1])
+
+    @mock.patch('{}.prepare.AssembledEntryFactory'.format(_SYNC_MODULE))
+    @mock.patch('{}.scrape.MetadataEventScraper'.format(_EVENT_SYNC_MODULE))
+    @mock.patch('google.datacatalog_connectors.commons.'
+                'datacatalog_facade.DataCatalogFacade')
+    @mock.patch(
+        '{}.MetadataEventSynchronizer._after_run'.format(_EVENT_SYNC_MODULE),
+        side_effect=InterruptedError)
+    def test_run_with_event_workers_should_split_entries(
+            self, mock_after_run, mock_datacatalog_facade, mock_event_scraper,
+            mock_assembled_entry_factory, mock_mapper, mock_cleaner,
+            mock_ingestor):
+        synchronizer = sync.MetadataEventSynchronizer(
+            'test-project', 'test-location', {
+                'host': 'my_host',
+                'port': 'my_port',
+                'user': 'my_user',
+                'pass': 'my_pass',
+                'event_servers': 'my_host:port',
+                'event_consumer_group_id': 'my_consumer_group',
+                'event_hook': True,
+                'event_workers': 3
+            })
+
+        scraper = mock_event_scraper.return_value
+        event_consumer = mock.MagicMock()
+        scraper.get_metadata.return_value = {
+            'classifications': {},
+            'entity_types': {},
+            'enum_types': {},
+            'entity_events': []
+        }, event_consumer
+
+        assembled_entries = []
+        for i in range(10):
+            assembled_entry = mock.MagicMock()
+            assembled_entry.entry_id = 'entry_{}'.format(i)
+            assembled_entries.append(assembled_entry)
+        mock_assembled_entry_factory.return_value.\
+            make_assembled_entries_list.return_value = assembled_entries
+
+        with self.assertRaises(InterruptedError):
+            synchronizer.run()
+
+        ingestor = mock_ingestor.return_value
+        ingest_calls = ingestor.ingest_metadata.call_args_list
+        # The first call only creates the Tag Templates.
+        self.assertEqual([], ingest_calls[0][0][0])
+        self.assertTrue(ingest_calls[0][0][1])
+        self.assertLessEqual(len(ingest_calls), 4)
+        ingested_entries = [
+            assembled_entry for ingest_call in ingest_calls[1:]
+            for assembled_entry in ingest_call[0][0]
+        ]
+        self.assertCountEqual(assembled_entries, ingested_entries)
+        event_consumer.commit.assert_called_once()
 
     @mock.patch('{}.scrape.MetadataEnricher'.format(_EVENT_SYNC_MODULE))
-    @mock.patch('{}.sleep'.format(_EVENT_SYNC_MODULE),
-                side_effect=InterruptedError)
+    @mock.patch(
+        '{}.MetadataEventSynchronizer._after_run'.format(_EVENT_SYNC_MODULE),
+        side_effect=InterruptedError)
     def test_run_metadata_columns_events_should_succeed(
-            self, mock_sleep, mock_metadata_enricher, mock_mapper,
+            self, mock_after_run, mock_metadata_enricher, mock_mapper,
             mock_cleaner, mock_ingestor):
         scraper = self.__synchronizer.__dict__['_metadata_scraper']
 
@@ -174,7 +322,7 @@ class MetadataEventSynchronizerTest(unittest.TestCase):
 
         with self.assertRaises(InterruptedError):
             self.__synchronizer.run()
-            mock_sleep.assert_called_once()
+            mock_after_run.assert_called_once()
             scraper.get_metadata.assert_called_once()
 
             mapper = mock_mapper.return_value
@@ -190,12 +338,13 @@ class MetadataEventSynchronizerTest(unittest.TestCase):
                 enrich_entity_relationships.assert_called_once()
 
             event_consumer.commit.assert_called_once()
-            event_consumer.close.assert_called_once()
+            event_consumer.close.assert_not_called()
 
     @mock.patch('{}.scrape.MetadataEnricher'.format(_EVENT_SYNC_MODULE))
-    @mock.patch('{}.sleep'.format(_EVENT_SYNC_MODULE),
-                side_effect=InterruptedError)
-    def test_run_metadata_delete_events_should_succeed(self, mock_sleep,
+    @mock.patch(
+        '{}.MetadataEventSynchronizer._after_run'.format(_EVENT_SYNC_MODULE),
+        side_effect=InterruptedError)
+    def test_run_metadata_delete_events_should_succeed(self, mock_after_run,
                                                        mock_metadata_enricher,
                                                        mock_mapper,
                                                        mock_cleaner,
@@ -248,7 +397,7 @@ class MetadataEventSynchronizerTest(unittest.TestCase):
 
         with self.assertRaises(InterruptedError):
             self.__synchronizer.run()
-            mock_sleep.assert_called_once()
+            mock_after_run.assert_called_once()
             scraper.get_metadata.assert_called_once()
 
             mapper = mock_mapper.return_value
@@ -264,6 +413,118 @@ class MetadataEventSynchronizerTest(unittest.TestCase):
                 enrich_entity_relationships.assert_called_once()
 
             event_consumer.commit.assert_called_once()
-            event_consumer.close.assert_called_once()
+            event_consumer.close.assert_not_called()
 
             self.assertEqual(2, datacatalog_facade.delete_entry.call_count)
+
+    def test_process_delete_events_should_batch_entries_resolution(self, *_):
+        datacatalog_facade = self.__synchronizer.__dict__[
+            '_MetadataEventSynchronizer__datacatalog_facade']
+        datacatalog_facade.search_catalog_relative_resource_name.\
+            return_value = ['entry_2']
+
+        assembled_entry = utils.MockedObject()
+        assembled_entry.entry = utils.MockedObject()
+        assembled_entry.entry.name = 'entry_1'
+        guid_field = utils.MockedObject()
+        guid_field.string_value = 'guid_1'
+        tag = utils.MockedObject()
+        tag.column = ''
+        tag.fields = {'guid': guid_field}
+        assembled_entry.tags = [tag]
+
+        self.__synchronizer.\
+            _MetadataEventSynchronizer__index_assembled_entries(
+                [assembled_entry])
+        self.__synchronizer._MetadataEventSynchronizer__process_delete_events({
+            'entity_events': [{
+                'entity': {
+                    'guid': guid
+                },
+                'operationType': 'ENTITY_DELETE'
+            } for guid in ('guid_1', 'guid_2', 'guid_3')]
+        })
+
+        datacatalog_facade.search_catalog_relative_resource_name.\
+            assert_called_once_with(
+                'system=apache_atlas tag:instance_url:my_host'
+                ' (tag:guid:guid_2 OR tag:guid:guid_3)')
+        datacatalog_facade.delete_entry.assert_has_calls(
+            [mock.call('entry_1'), mock.call('entry_2')], any_order=True)
+        self.assertEqual(2, datacatalog_facade.delete_entry.call_count)
+
+    @mock.patch.object(sync.MetadataEventSynchronizer,
+                       '_MetadataEventSynchronizer__INDEX_MAX_SIZE', 2)
+    def test_index_assembled_entries_should_evict_least_recently_used(
+            self, *_):
+        assembled_entries = []
+        for index in range(1, 4):
+            assembled_entry = utils.MockedObject()
+            assembled_entry.entry = utils.MockedObject()
+            assembled_entry.entry.name = 'entry_{}'.format(index)
+            guid_field = utils.MockedObject()
+            guid_field.string_value = 'guid_{}'.format(index)
+            tag = utils.MockedObject()
+            tag.column = ''
+            tag.fields = {'guid': guid_field}
+            assembled_entry.tags = [tag]
+            assembled_entries.append(assembled_entry)
+
+        self.__synchronizer.\
+            _MetadataEventSynchronizer__index_assembled_entries(
+                assembled_entries[:2])
+        # Indexing guid_1 again makes guid_2 the least recently used.
+        self.__synchronizer.\
+            _MetadataEventSynchronizer__index_assembled_entries(
+                [assembled_entries[0], assembled_entries[2]])
+
+        entry_names_by_guid = self.__synchronizer.__dict__[
+            '_MetadataEventSynchronizer__entry_names_by_guid']
+        self.assertEqual({
+            'guid_1': 'entry_1',
+            'guid_3': 'entry_3'
+        }, dict(entry_names_by_guid))
+
+    def test_get_table_entities_for_column_events_should_batch_resolution(
+            self, *_):
+        datacatalog_facade = self.__synchronizer.__dict__[
+            '_MetadataEventSynchronizer__datacatalog_facade']
+        datacatalog_facade.get_tag_field_values_for_search_results.\
+            return_value = ['table_2', 'table_1']
+
+        assembled_entry = utils.MockedObject()
+        assembled_entry.entry = utils.MockedObject()
+        assembled_entry.entry.name = 'entry_1'
+        guid_field = utils.MockedObject()
+        guid_field.string_value = 'table_1'
+        tag = utils.MockedObject()
+        tag.column = ''
+        tag.fields = {'guid': guid_field}
+        column_guid_field = utils.MockedObject()
+        column_guid_field.string_value = 'column_1'
+        column_tag = utils.MockedObject()
+        column_tag.column = 'column_1_name'
+        column_tag.fields = {'column_guid': column_guid_field}
+        assembled_entry.tags = [tag, column_tag]
+
+        self.__synchronizer.\
+            _MetadataEventSynchronizer__index_assembled_entries(
+                [assembled_entry])
+        table_guids = self.__synchronizer.\
+            _MetadataEventSynchronizer__get_table_entities_for_column_events(
+                {
+                    'entity_events': [{
+                        'entity': {
+                            'guid': guid,
+                            'typeName': 'Column'
+                        },
+                        'operationType': 'ENTITY_UPDATE'
+                    } for guid in ('column_1', 'column_2', 'column_3')]
+                })
+
+        self.assertEqual(['table_1', 'table_2'], table_guids)
+        datacatalog_facade.get_tag_field_values_for_search_results.\
+            assert_called_once_with(
+                'system=apache_atlas tag:instance_url:my_host type=table'
+                ' (tag:column_guid:column_2 OR tag:column_guid:column_3)',
+                'apache_atlas_entity_type_table', 'guid', mock.ANY)
@@ -14,7 +14,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
+import tempfile
+import time
 import unittest
 from unittest import mock
 
@@ -105,3 +108,124 @@ class MetadataSynchronizerTest(unittest.TestCase):
 
         ingestor = mock_ingestor.return_value
         ingestor.ingest_metadata.assert_called_once()
+
+    @mock.patch(_SYNC_MODULE + '.prepare.DataCatalogTagTemplateFactory')
+    @mock.patch('{}.prepare.AssembledEntryFactory'.format(_SYNC_MODULE))
+    @mock.patch('{}.scrape.MetadataScraper'.format(_SYNC_MODULE))
+    def test_run_without_sync_state_should_run_full_sync_and_save_state(
+            self, mock_scraper, mock_assembled_entry_factory,
+            mock_tag_template_factory, mock_mapper, mock_cleaner,
+            mock_ingestor):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_file = os.path.join(temp_dir, 'sync_state.json')
+            synchronizer = sync.MetadataSynchronizer(
+                'test-project',
+                'test-location', {
+                    'host': 'my_host',
+                    'port': 'my_port',
+                    'user': 'my_user',
+                    'pass': 'my_pass',
+                },
+                incremental_sync_state_file=state_file)
+
+            scraper = mock_scraper.return_value
+            scraper.get_server_time.return_value = 1589990000000
+            scraper.get_metadata.return_value = {
+                'classifications': {},
+                'entity_types': {
+                    'Table': {
+                        'entities': {
+                            'guid_1': {
+                                'data': {
+                                    'updateTime': 1589983850688
+                                }
+                            },
+                            'guid_2': {
+                                'data': {
+                                    'updateTime': 1589983860688
+                                }
+                            }
+                        }
+                    },
+                    'DB': {
+                        'entities': {}
+                    }
+                },
+                'enum_types': {}
+            }, None
+
+            synchronizer.run()
+
+            scraper.get_metadata.assert_called_once_with(entity_types=None)
+            cleaner = mock_cleaner.return_value
+            cleaner.delete_obsolete_metadata.assert_called_once()
+
+            with open(state_file) as file:
+                sync_state = json.load(file)
+
+        # The server time before the scrape, minus the overlap, is kept
+        # instead of the scraped entities updateTime.
+        self.assertEqual({
+            'Table': 1589989700000,
+            'DB': 1589989700000
+        }, sync_state['watermarks'])
+        self.assertIsNotNone(sync_state['last_full_sync_time'])
+
+    @mock.patch('{}.prepare.AssembledEntryFactory'.format(_SYNC_MODULE))
+    @mock.patch('{}.scrape.MetadataScraper'.format(_SYNC_MODULE))
+    def test_run_with_recent_full_sync_should_scrape_updated_entities(
+            self, mock_scraper, mock_assembled_entry_factory, mock_mapper,
+            mock_cleaner, mock_ingestor):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_file = os.path.join(temp_dir, 'sync_state.json')
+            last_full_sync_time = time.time() - 3600
+            with open(state_file, 'w') as file:
+                json.dump(
+                    {
+                        'last_full_sync_time': last_full_sync_time,
+                        'watermarks': {
+                            'Table': 1589983860688
+                        }
+                    }, file)
+
+            synchronizer = sync.MetadataSynchronizer(
+                'test-project',
+                'test-location', {
+                    'host': 'my_host',
+                    'port': 'my_port',
+                    'user': 'my_user',
+                    'pass': 'my_pass',
+                },
+                incremental_sync_state_file=state_file,
+                full_sync_interval_hours=24)
+
+            scraper = mock_scraper.return_value
+            scraper.get_server_time.return_value = None
+            scraper.get_metadata.return_value = {
+                'classifications': {},
+                'entity_types': {
+                    'Table': {
+                        'entities': {}
+                    }
+                },
+                'enum_types': {}
+            }, None
+
+            run_time = int(time.time() * 1000)
+            synchronizer.run()
+
+            scraper.get_metadata.assert_called_once_with(
+                entity_types=None, updated_since={'Table': 1589983860688})
+            cleaner = mock_cleaner.return_value
+            cleaner.delete_obsolete_metadata.assert_not_called()
+            ingestor = mock_ingestor.return_value
+            ingestor.ingest_metadata.assert_called_once()
+
+            with open(state_file) as file:
+                sync_state = json.load(file)
+
+        self.assertEqual(last_full_sync_time,
+                         sync_state['last_full_sync_time'])
+        # The local time is used when the server time is not available.
+        self.assertLessEqual(run_time - 300000,
+                             sync_state['watermarks']['Table'])
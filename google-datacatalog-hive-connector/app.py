@@ -17,8 +17,12 @@
 import base64
 import json
 import os
+import signal
+import sys
 
+from google.datacatalog_connectors.hive import entities
 from google.datacatalog_connectors.hive.sync import datacatalog_synchronizer
+from google.datacatalog_connectors.hive.sync import sync_event_queue
 from flask import jsonify, make_response, request, Flask
 
 import google.cloud.logging
@@ -34,6 +38,46 @@ client.setup_logging()
 app = Flask(__name__)
 
 
+def synchronize(sync_event):
+    datacatalog_synchronizer.DataCatalogSynchronizer(
+        project_id=os.environ['HIVE2DC_DATACATALOG_PROJECT_ID'],
+        location_id=os.environ['HIVE2DC_DATACATALOG_LOCATION_ID'],
+        hive_metastore_db_host=os.environ['HIVE2DC_HIVE_METASTORE_DB_HOST'],
+        metadata_sync_event=sync_event,
+        cascade_drop_database=get_bool_env(
+            'HIVE2DC_CASCADE_DROP_DATABASE')).run()
+
+
+def get_bool_env(name):
+    return os.environ.get(name, '').strip().lower() in ('true', '1', 'yes')
+
+
+# Sync events are processed by background workers, so the Pub/Sub
+# push request is acknowledged as soon as the event is persisted.
+event_queue = sync_event_queue.SyncEventQueue(
+    synchronize,
+    max_size=int(os.environ.get('HIVE2DC_QUEUE_MAX_SIZE', 100)),
+    workers_count=int(os.environ.get('HIVE2DC_QUEUE_WORKERS', 1)),
+    events_dir=os.environ.get('HIVE2DC_QUEUE_EVENTS_DIR'))
+event_queue.start()
+
+previous_sigterm_handler = signal.getsignal(signal.SIGTERM)
+
+
+def drain_event_queue(signum, frame):
+    # Cloud Run sends SIGTERM before stopping the instance, the events
+    # that are not processed in time are recovered by the next one.
+    event_queue.stop(
+        timeout=int(os.environ.get('HIVE2DC_QUEUE_DRAIN_TIMEOUT', 8)))
+    if callable(previous_sigterm_handler):
+        previous_sigterm_handler(signum, frame)
+    else:
+        sys.exit(0)
+
+
+signal.signal(signal.SIGTERM, drain_event_queue)
+
+
 @app.route('/', methods=['POST', 'GET'])
 def run():
 
@@ -45,18 +89,22 @@ def run():
         data = message['data']
         sync_event = json.loads(base64.b64decode(data).decode('utf-8'))
 
-        datacatalog_synchronizer.DataCatalogSynchronizer(
-            project_id=os.environ['HIVE2DC_DATACATALOG_PROJECT_ID'],
-            location_id=os.environ['HIVE2DC_DATACATALOG_LOCATION_ID'],
-            hive_metastore_db_host=os.
-            environ['HIVE2DC_HIVE_METASTORE_DB_HOST'],
-            metadata_sync_event=sync_event).run()
+        if sync_event.get('event') not in entities.SyncEvent.__members__:
+            response = {'message': 'Unsupported event', 'code': 'INVALID'}
+            return make_response(jsonify(response), 400)
 
-        response = {'message': 'Synchronized', 'code': 'SUCCESS'}
-        return make_response(jsonify(response), 200)
+        event_queue.put(sync_event)
+
+        response = {'message': 'Queued', 'code': 'SUCCESS'}
+        return make_response(jsonify(response), 202)
     elif request.method == 'GET':
         return 'use POST method with a message event BODY'
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return make_response(jsonify(event_queue.get_metrics()), 200)
+
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=int(os.environ.get('PORT', 8080)))
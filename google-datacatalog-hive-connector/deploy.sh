@@ -14,4 +14,4 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-gcloud builds submit --config=cloudbuild.hook.yaml --substitutions=_SERVICE_NAME="hive-sync",TAG_NAME="v0.1.1",_ENV_PROJECT_ID="HIVE2DC_DATACATALOG_PROJECT_ID=${HIVE2DC_DATACATALOG_PROJECT_ID}",_ENV_LOCATION_ID="HIVE2DC_DATACATALOG_LOCATION_ID=${HIVE2DC_DATACATALOG_LOCATION_ID}",_ENV_METASTORE_DB_HOST="HIVE2DC_HIVE_METASTORE_DB_HOST=${HIVE2DC_HIVE_METASTORE_DB_HOST}"
\ No newline at end of file
+gcloud builds submit --config=cloudbuild.hook.yaml --substitutions=_SERVICE_NAME="hive-sync",TAG_NAME="v0.1.1",_ENV_PROJECT_ID="HIVE2DC_DATACATALOG_PROJECT_ID=${HIVE2DC_DATACATALOG_PROJECT_ID}",_ENV_LOCATION_ID="HIVE2DC_DATACATALOG_LOCATION_ID=${HIVE2DC_DATACATALOG_LOCATION_ID}",_ENV_METASTORE_DB_HOST="HIVE2DC_HIVE_METASTORE_DB_HOST=${HIVE2DC_HIVE_METASTORE_DB_HOST}",_EVENTS_BUCKET="${HIVE2DC_QUEUE_EVENTS_BUCKET}"
\ No newline at end of file
@@ -24,3 +24,5 @@ class SyncEvent(enum.Enum):
     CREATE_DATABASE = 4
     DROP_DATABASE = 5
     MANUAL_DATABASE_SYNC = 6
+    ADD_PARTITION = 7
+    DROP_PARTITION = 8
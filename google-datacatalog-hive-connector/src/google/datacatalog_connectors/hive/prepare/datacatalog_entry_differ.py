@@ -0,0 +1,66 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+
+class DataCatalogEntryDiffer:
+    # Entry fields managed by the connector that can be
+    # sent in an update_entry field mask.
+    __UPDATABLE_FIELDS = [
+        'display_name', 'description', 'linked_resource',
+        'source_system_timestamps', 'schema'
+    ]
+
+    @classmethod
+    def make_update_mask(cls, old_entry, new_entry):
+        """Compares two versions of the same Entry and returns the
+        field mask paths required to turn the old one into the new one.
+
+        Returns None when the entries do not refer to the same Data Catalog
+        Entry, e.g. a renamed table, since a partial update is not possible
+        in that case.
+        """
+        if old_entry.name != new_entry.name:
+            return None
+
+        update_mask = [
+            field for field in cls.__UPDATABLE_FIELDS
+            if getattr(old_entry, field) != getattr(new_entry, field)
+        ]
+
+        if 'schema' in update_mask:
+            cls.__log_column_changes(new_entry.name, old_entry.schema,
+                                     new_entry.schema)
+
+        return update_mask
+
+    @classmethod
+    def __log_column_changes(cls, entry_name, old_schema, new_schema):
+        old_columns = {column.column: column for column in old_schema.columns}
+        new_columns = {column.column: column for column in new_schema.columns}
+
+        added = [name for name in new_columns if name not in old_columns]
+        removed = [name for name in old_columns if name not in new_columns]
+        changed = [
+            name for name, column in new_columns.items()
+            if name in old_columns and old_columns[name] != column
+        ]
+
+        logging.info('Entry %s columns: %s added, %s removed, %s changed',
+                     entry_name, len(added), len(removed), len(changed))
+        logging.debug('Added: %s, removed: %s, changed: %s', added, removed,
+                      changed)
@@ -22,6 +22,8 @@ from google.datacatalog_connectors.commons.prepare import base_entry_factory
 
 class DataCatalogEntryFactory(base_entry_factory.BaseEntryFactory):
     __ENTRY_ID_INVALID_CHARS_REGEX_PATTERN = r'[^a-zA-Z0-9_]+'
+    # Hashed Entry IDs keep their first 56 chars (64 - 8 hash chars).
+    __HASHED_ENTRY_ID_PREFIX_LENGTH = 56
 
     def __init__(self, project_id, location_id, metadata_host_server,
                  entry_group_id):
@@ -57,9 +59,16 @@ class DataCatalogEntryFactory(base_entry_factory.BaseEntryFactory):
 
         return entry_id, entry
 
+    def make_entry_name_for_table(self, database_name, table_name):
+        entry_id = self.__make_entry_id_for_table(database_name, table_name)
+
+        return datacatalog.DataCatalogClient.entry_path(
+            self.__project_id, self.__location_id, self.__entry_group_id,
+            entry_id)
+
     def make_entry_for_table(self, table_metadata, database_name):
         entry_id = self.__make_entry_id_for_table(database_name,
-                                                  table_metadata)
+                                                  table_metadata.name)
 
         entry = datacatalog.Entry()
 
@@ -107,7 +116,16 @@ class DataCatalogEntryFactory(base_entry_factory.BaseEntryFactory):
 
         return entry_id, entry
 
-    def __make_entry_id_for_table(self, database_name, table_metadata):
+    @classmethod
+    def make_entry_id_prefix_for_tables(cls, database_entry_id):
+        """Returns the prefix shared by the Entry IDs of all tables
+        that belong to the database represented by database_entry_id.
+        Databases named alike, e.g. hr and hr_, may share it as well.
+        """
+        return '{}__'.format(
+            database_entry_id)[:cls.__HASHED_ENTRY_ID_PREFIX_LENGTH]
+
+    def __make_entry_id_for_table(self, database_name, table_name):
         # We normalize and hash first the database_name.
         normalized_database_name = self._format_id_with_hashing(
             database_name.lower(),
@@ -115,7 +133,7 @@ class DataCatalogEntryFactory(base_entry_factory.BaseEntryFactory):
 
         # Next we do the same for the table name.
         normalized_table_name = self._format_id_with_hashing(
-            table_metadata.name.lower(),
+            table_name.lower(),
             regex_pattern=self.__ENTRY_ID_INVALID_CHARS_REGEX_PATTERN)
 
         entry_id = '{}__{}'.format(normalized_database_name,
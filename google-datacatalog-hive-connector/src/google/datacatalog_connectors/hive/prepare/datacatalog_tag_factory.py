@@ -0,0 +1,43 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime, timezone
+
+from google.cloud import datacatalog
+from google.datacatalog_connectors.commons import prepare
+
+
+class DataCatalogTagFactory(prepare.BaseTagFactory):
+
+    @classmethod
+    def make_tag_for_partitions(cls, tag_template, partition_stats):
+        """Makes a Tag from the table partition_stats, which hold the table
+        totals, so the same stats always produce the same Tag.
+        """
+        tag = datacatalog.Tag()
+        tag.template = tag_template.name
+
+        cls._set_double_field(tag, 'partition_count',
+                              partition_stats['partition_count'])
+
+        create_time = partition_stats.get('latest_partition_create_time')
+        # Tables without partitions have no latest create time.
+        if create_time:
+            cls._set_timestamp_field(
+                tag, 'latest_partition_create_time',
+                datetime.fromtimestamp(create_time, timezone.utc))
+
+        return tag
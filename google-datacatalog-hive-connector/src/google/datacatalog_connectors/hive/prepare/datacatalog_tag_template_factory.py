@@ -0,0 +1,47 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.cloud import datacatalog
+from google.datacatalog_connectors.commons import prepare
+
+
+class DataCatalogTagTemplateFactory(prepare.BaseTagTemplateFactory):
+    PARTITIONS_TAG_TEMPLATE_ID = 'hive_table_partitions'
+
+    __DOUBLE_TYPE = datacatalog.FieldType.PrimitiveType.DOUBLE
+    __TIMESTAMP_TYPE = datacatalog.FieldType.PrimitiveType.TIMESTAMP
+
+    def __init__(self, project_id, location_id):
+        self.__project_id = project_id
+        self.__location_id = location_id
+
+    def make_tag_template_for_partitions(self):
+        tag_template = datacatalog.TagTemplate()
+
+        tag_template.name = datacatalog.DataCatalogClient.tag_template_path(
+            self.__project_id, self.__location_id,
+            self.PARTITIONS_TAG_TEMPLATE_ID)
+
+        tag_template.display_name = 'Hive Table Partitions'
+
+        self._add_primitive_type_field(tag_template, 'partition_count',
+                                       self.__DOUBLE_TYPE, 'Partition count')
+        self._add_primitive_type_field(tag_template,
+                                       'latest_partition_create_time',
+                                       self.__TIMESTAMP_TYPE,
+                                       'Latest partition create time')
+
+        return self.PARTITIONS_TAG_TEMPLATE_ID, tag_template
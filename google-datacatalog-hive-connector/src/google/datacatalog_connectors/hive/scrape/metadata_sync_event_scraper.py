@@ -48,6 +48,12 @@ class MetadataSyncEventScraper:
             return cls.__build_metadata_entities_for_drop_database_event(
                 message)
 
+        if event in [
+                sync_event.SyncEvent.ADD_PARTITION.name,
+                sync_event.SyncEvent.DROP_PARTITION.name
+        ]:
+            return cls.__build_metadata_entities_for_partition_event(message)
+
     @classmethod
     def __build_metadata_entities_for_create_table_event(cls, message):
         database, table = cls.__build_common_metadata_fields(message['table'])
@@ -78,6 +84,32 @@ class MetadataSyncEventScraper:
         database.tables = []
         return {'databases': [database]}
 
+    @classmethod
+    def __build_metadata_entities_for_partition_event(cls, message):
+        # Partition events carry the table partition statistics
+        # instead of the partitions themselves.
+        database = entities.Database()
+        database.id = None
+        database.name = message['dbName']
+        table = entities.Table()
+        table.id = None
+        table.name = message['tableName']
+        database.tables = [table]
+
+        return {
+            'databases': [database],
+            'partitions_stats': [{
+                'database_name':
+                    database.name,
+                'table_name':
+                    table.name,
+                'partition_count':
+                    message['partitionCount'],
+                'latest_partition_create_time':
+                    message.get('latestPartitionCreateTime')
+            }]
+        }
+
     @classmethod
     def __build_metadata_entities_for_update_table_event(cls, message):
         new_table = message['newTable']
@@ -94,7 +126,35 @@ class MetadataSyncEventScraper:
 
         tables = [table]
         database.tables = tables
-        return {'databases': [database]}
+
+        metadata = {'databases': [database]}
+
+        # The previous table state allows the synchronizer to update
+        # only the Entry fields that were actually changed.
+        old_table = message.get('oldTable')
+        if old_table:
+            metadata['old_databases'] = [
+                cls.__build_metadata_entities_for_old_table(old_table)
+            ]
+
+        return metadata
+
+    @classmethod
+    def __build_metadata_entities_for_old_table(cls, old_table):
+        database, table = cls.__build_common_metadata_fields(old_table)
+        parameters_message = old_table.get('parameters') or {}
+
+        table.table_params = []
+        last_modified_time = parameters_message.get('last_modified_time')
+        if last_modified_time:
+            table_param = entities.TableParams()
+            table_param.id = 1
+            table_param.param_key = 'last_modified_time'
+            table_param.param_value = last_modified_time
+            table.table_params.append(table_param)
+
+        database.tables = [table]
+        return database
 
     @classmethod
     def __build_common_metadata_fields(cls, table_message):
@@ -17,7 +17,11 @@
 import logging
 import json
 import uuid
+from concurrent import futures
 
+from google.api_core import exceptions
+from google.cloud import datacatalog
+from google.datacatalog_connectors.commons import datacatalog_facade
 from google.datacatalog_connectors.commons.cleanup \
     import datacatalog_metadata_cleaner
 from google.datacatalog_connectors.commons.ingest \
@@ -27,7 +31,10 @@ from google.datacatalog_connectors.commons.monitoring \
 from google.datacatalog_connectors.hive import entities
 from google.datacatalog_connectors.hive import scrape
 from google.datacatalog_connectors.hive.prepare import \
-    assembled_entry_factory
+    assembled_entry_factory, datacatalog_entry_differ, \
+    datacatalog_entry_factory, datacatalog_tag_factory, \
+    datacatalog_tag_template_factory
+from google.datacatalog_connectors.hive.sync import hive_datacatalog_facade
 
 
 class DataCatalogSynchronizer:
@@ -36,6 +43,12 @@ class DataCatalogSynchronizer:
         entities.SyncEvent.DROP_DATABASE, entities.SyncEvent.DROP_TABLE
     ]
 
+    __PARTITION_EVENTS = [
+        entities.SyncEvent.ADD_PARTITION, entities.SyncEvent.DROP_PARTITION
+    ]
+
+    __DELETE_ENTRIES_MAX_WORKERS = 10
+
     def __init__(self,
                  project_id,
                  location_id,
@@ -45,7 +58,8 @@ class DataCatalogSynchronizer:
                  hive_metastore_db_name=None,
                  hive_metastore_db_type=None,
                  metadata_sync_event=None,
-                 enable_monitoring=None):
+                 enable_monitoring=None,
+                 cascade_drop_database=None):
         self.__entry_group_id = 'hive'
         self.__project_id = project_id
         self.__location_id = location_id
@@ -55,6 +69,7 @@ class DataCatalogSynchronizer:
         self.__hive_metastore_db_name = hive_metastore_db_name
         self.__hive_metastore_db_type = hive_metastore_db_type
         self.__metadata_sync_event = metadata_sync_event
+        self.__cascade_drop_database = cascade_drop_database
         self.__task_id = uuid.uuid4().hex[:8]
         self.__metrics_processor = metrics_processor.MetricsProcessor(
             project_id, location_id, self.__entry_group_id, enable_monitoring,
@@ -85,6 +100,19 @@ class DataCatalogSynchronizer:
 
         logging.info('\n--> {}'.format(sync_event))
 
+        if sync_event in self.__PARTITION_EVENTS:
+            # Partition events only refresh the table partitions Tag,
+            # the Entries are left untouched.
+            logging.info('\n==============Ingest metadata===============')
+            self.__ingest_partitions_stats(
+                host_name, databases_metadata['partitions_stats'])
+
+            logging.info(
+                '\n==============End hive-to-datacatalog===============')
+            self.__after_run()
+
+            return self.__task_id
+
         logging.info('\n{}'.format(len(databases_metadata['databases'])) +
                      ' databases ready to be ingested...')
 
@@ -122,9 +150,19 @@ class DataCatalogSynchronizer:
 
         # Ingest.
         logging.info('\nStarting to ingest custom metadata...')
-        if sync_event not in self.__CLEAN_UP_EVENTS:
+        old_databases = databases_metadata.get('old_databases')
+        if sync_event == entities.SyncEvent.ALTER_TABLE and old_databases:
+            old_prepared_entries = factory.make_entries_from_database_metadata(
+                {'databases': old_databases})
+            self.__ingest_altered_tables(prepared_entries,
+                                         old_prepared_entries)
+        elif sync_event not in self.__CLEAN_UP_EVENTS:
             self.__ingest_created_or_updated(prepared_entries)
         elif sync_event == entities.SyncEvent.DROP_DATABASE:
+            if self.__cascade_drop_database:
+                self.__cleanup_deleted_databases_tables(
+                    host_name, databases_metadata['databases'],
+                    prepared_entries)
             self.__cleanup_deleted_databases(cleaner, prepared_entries)
         elif sync_event == entities.SyncEvent.DROP_TABLE:
             self.__cleanup_deleted_tables(cleaner, prepared_entries)
@@ -140,6 +178,87 @@ class DataCatalogSynchronizer:
         for database_entry, table_related_entries in prepared_entries:
             ingestor.ingest_metadata([database_entry, *table_related_entries])
 
+    def __ingest_altered_tables(self, prepared_entries, old_prepared_entries):
+        old_tables_entries = {
+            table_entry.entry.name: table_entry
+            for _, table_related_entries in old_prepared_entries
+            for table_entry in table_related_entries
+        }
+
+        facade = hive_datacatalog_facade.HiveDataCatalogFacade(
+            self.__project_id)
+        for database_entry, table_related_entries in prepared_entries:
+            # Tables that can't be updated through a field mask go
+            # through the regular upsert, along with their database.
+            upsert_tables_entries = [
+                table_entry for table_entry in table_related_entries
+                if not self.__update_altered_table(
+                    facade, table_entry,
+                    old_tables_entries.get(table_entry.entry.name))
+            ]
+            self.__ingest_created_or_updated([(database_entry,
+                                               upsert_tables_entries)])
+
+    @classmethod
+    def __update_altered_table(cls, facade, table_entry, old_table_entry):
+        """Updates the table Entry fields changed by the event.
+
+        :return: False if the table requires the regular upsert.
+        """
+        if not old_table_entry:
+            # Renamed or unknown table.
+            return False
+
+        update_mask = datacatalog_entry_differ.DataCatalogEntryDiffer.\
+            make_update_mask(old_table_entry.entry, table_entry.entry)
+        if not update_mask:
+            # The event does not tell whether the catalog Entry is
+            # up-to-date, it may be stale or not ingested yet.
+            return False
+
+        try:
+            facade.update_entry_fields(table_entry.entry, update_mask)
+            facade.upsert_tags(table_entry.entry, table_entry.tags)
+            return True
+        except exceptions.GoogleAPICallError as e:
+            logging.info('\nEntry not updated, ingesting: %s',
+                         table_entry.entry.name)
+            logging.debug(str(e))
+            return False
+
+    def __ingest_partitions_stats(self, host_name, partitions_stats):
+        facade = datacatalog_facade.DataCatalogFacade(self.__project_id)
+
+        tag_template_id, tag_template = \
+            datacatalog_tag_template_factory.DataCatalogTagTemplateFactory(
+                self.__project_id, self.__location_id).\
+            make_tag_template_for_partitions()
+        try:
+            facade.create_tag_template(self.__location_id, tag_template_id,
+                                       tag_template)
+        except exceptions.AlreadyExists:
+            logging.info('Tag Template already exists: %s', tag_template_id)
+
+        entry_factory = datacatalog_entry_factory.DataCatalogEntryFactory(
+            self.__project_id, self.__location_id, host_name,
+            self.__entry_group_id)
+        for partition_stats in partitions_stats:
+            entry_name = entry_factory.make_entry_name_for_table(
+                partition_stats['database_name'],
+                partition_stats['table_name'])
+            # The stats hold the table totals, so the Tag is overwritten
+            # and redelivered events can't make it drift.
+            tag = datacatalog_tag_factory.DataCatalogTagFactory.\
+                make_tag_for_partitions(tag_template, partition_stats)
+            try:
+                facade.upsert_tags(datacatalog.Entry(name=entry_name), [tag])
+                logging.info('\nPartitions Tag ingested: %s', entry_name)
+            except (exceptions.NotFound, exceptions.PermissionDenied):
+                # The table Entry may not have been ingested yet, its
+                # partitions are picked up by the next partition event.
+                logging.info('\nEntry not found, skipping partitions: %s',
+                             entry_name)
+
     def __after_run(self):
         self.__metrics_processor.process_elapsed_time_metric()
 
@@ -166,6 +285,54 @@ class DataCatalogSynchronizer:
             except:  # noqa: E722
                 logging.info('Exception deleting Entries')
 
+    def __cleanup_deleted_databases_tables(self, host_name, databases,
+                                           prepared_entries):
+        # Table Entry IDs start with their database Entry ID, so a single
+        # search retrieves the candidate Entries. Storage locations are not
+        # used, since external tables may be stored anywhere.
+        facade = hive_datacatalog_facade.HiveDataCatalogFacade(
+            self.__project_id)
+        tables_entries_name = facade.search_catalog_relative_resource_name(
+            'system={} type=table'.format(self.__entry_group_id))
+
+        entry_factory = datacatalog_entry_factory.DataCatalogEntryFactory(
+            self.__project_id, self.__location_id, host_name,
+            self.__entry_group_id)
+        entry_group_path = '/entryGroups/{}/entries/'.format(
+            self.__entry_group_id)
+        entries_name_pending_deletion = []
+        for database, (database_entry, _) in zip(databases, prepared_entries):
+            entry_id_prefix = datacatalog_entry_factory.\
+                DataCatalogEntryFactory.make_entry_id_prefix_for_tables(
+                    database_entry.entry_id)
+            entries_name_pending_deletion.extend(
+                entry_name for entry_name in tables_entries_name
+                if entry_group_path in entry_name and
+                entry_name.split(entry_group_path)[-1].startswith(
+                    entry_id_prefix) and self.__is_database_table_entry(
+                        facade, entry_factory, database.name, entry_name))
+
+        with futures.ThreadPoolExecutor(
+                max_workers=self.__DELETE_ENTRIES_MAX_WORKERS) as executor:
+            deleted_entries = sum(
+                executor.map(facade.delete_entry,
+                             entries_name_pending_deletion))
+
+        logging.info('\nTables deleted: {}'.format(deleted_entries))
+
+    @classmethod
+    def __is_database_table_entry(cls, facade, entry_factory, database_name,
+                                  entry_name):
+        # Databases named alike share the Entry ID prefix, so the Entry
+        # name is rebuilt from the database and table names to confirm it.
+        try:
+            entry = facade.get_entry(entry_name)
+        except exceptions.GoogleAPICallError:
+            logging.info('Entry not found, skipping it: %s', entry_name)
+            return False
+        return entry_name == entry_factory.make_entry_name_for_table(
+            database_name, entry.display_name)
+
     @classmethod
     def __cleanup_deleted_databases(cls, cleaner, prepared_entries):
         for database_entry, _ in prepared_entries:
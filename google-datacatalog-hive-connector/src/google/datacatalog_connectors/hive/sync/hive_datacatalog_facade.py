@@ -0,0 +1,62 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from google.api_core import exceptions
+from google.cloud import datacatalog
+from google.datacatalog_connectors.commons import datacatalog_facade
+from google.protobuf import field_mask_pb2
+
+
+class HiveDataCatalogFacade(datacatalog_facade.DataCatalogFacade):
+    """Extends the commons DataCatalogFacade with the operations required
+    by the Hive Metastore sync events.
+    """
+
+    def __init__(self, project_id):
+        super().__init__(project_id)
+        self.__datacatalog = datacatalog.DataCatalogClient()
+
+    def update_entry_fields(self, entry, field_paths):
+        """Updates only the given fields of an Entry.
+
+        :param entry: An Entry object.
+        :param field_paths: The names of the Entry fields to be updated.
+        :return: The updated Entry.
+        """
+        updated_entry = self.__datacatalog.update_entry(
+            entry=entry,
+            update_mask=field_mask_pb2.FieldMask(paths=field_paths))
+        logging.info('Entry updated: %s, fields: %s', entry.name, field_paths)
+        return updated_entry
+
+    def delete_entry(self, name):
+        """Deletes a Data Catalog Entry.
+
+        :param name: The Entry name.
+        :return: True if the Entry was deleted, False otherwise.
+        """
+        try:
+            self.__datacatalog.delete_entry(name=name)
+            logging.info('Entry deleted: %s', name)
+            return True
+        except exceptions.GoogleAPICallError as e:
+            logging.info(
+                'An exception ocurred while attempting to'
+                ' delete Entry: %s', name)
+            logging.debug(str(e))
+            return False
@@ -0,0 +1,227 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+
+
+class SyncEventQueue:
+    """Bounded in-process queue that processes sync events in background
+    worker threads.
+
+    Every event is written to the events directory before put() returns
+    and its file is only removed after the event is processed, so pending
+    events are recovered on restart as long as the directory is backed by
+    persistent storage. Events that do not fit in memory are kept on disk
+    only and moved to the queue as soon as there is room for them.
+
+    Events the handler fails to process are retried with an exponential
+    backoff. Only event files that cannot be parsed are given up on, and
+    they are moved to the dead letter directory.
+    """
+    __DEFAULT_MAX_SIZE = 100
+    __DEFAULT_WORKERS_COUNT = 1
+    __EVENTS_DIR_NAME = 'hive2datacatalog-sync-events'
+    __EVENT_FILE_SUFFIX = '.json'
+    __DEAD_LETTER_DIR_NAME = 'dead-letter'
+    __STOP_CHECK_INTERVAL_SECONDS = 1
+    __RETRY_MIN_DELAY_SECONDS = 1
+    __RETRY_MAX_DELAY_SECONDS = 300
+
+    def __init__(self,
+                 handler,
+                 max_size=None,
+                 workers_count=None,
+                 events_dir=None):
+        self.__handler = handler
+        self.__queue = queue.Queue(maxsize=max_size or self.__DEFAULT_MAX_SIZE)
+        self.__workers_count = workers_count or self.__DEFAULT_WORKERS_COUNT
+        self.__events_dir = events_dir or os.path.join(tempfile.gettempdir(),
+                                                       self.__EVENTS_DIR_NAME)
+        # Guards the on-disk only events and the metrics counters, which
+        # are shared by the request handler and the worker threads.
+        self.__lock = threading.Lock()
+        # Events left by a previous process are recovered first.
+        os.makedirs(self.__events_dir, exist_ok=True)
+        self.__disk_only_files = sorted(
+            file_name for file_name in os.listdir(self.__events_dir)
+            if file_name.endswith(self.__EVENT_FILE_SUFFIX))
+        self.__workers = []
+        self.__stopping = threading.Event()
+        self.__processed_events = 0
+        self.__failed_events = 0
+        self.__dead_letter_events = 0
+        self.__processing_lag = 0.0
+
+    def start(self):
+        if self.__disk_only_files:
+            logging.info('%s pending sync events recovered',
+                         len(self.__disk_only_files))
+        self.__load_disk_only_events()
+
+        for _ in range(self.__workers_count):
+            worker = threading.Thread(target=self.__process_events,
+                                      daemon=True)
+            worker.start()
+            self.__workers.append(worker)
+
+    def put(self, sync_event):
+        enqueue_time = time.time()
+        with self.__lock:
+            file_name = self.__write_event(enqueue_time, sync_event)
+            # Once the queue fills up, new events stay on disk as well,
+            # so they are processed in the order they were received.
+            if not self.__disk_only_files:
+                try:
+                    self.__queue.put_nowait(
+                        (enqueue_time, sync_event, file_name))
+                    return
+                except queue.Full:
+                    logging.info(
+                        'Sync event queue is full, keeping events'
+                        ' in %s', self.__events_dir)
+            self.__disk_only_files.append(file_name)
+
+    def join(self):
+        """Blocks until every queued and on-disk event is processed."""
+        # Workers move on-disk events to the queue before marking the
+        # current one as done, so the queue is only drained after the
+        # on-disk events are processed.
+        self.__queue.join()
+
+    def stop(self, timeout=None):
+        """Stops the workers once their current events are processed.
+
+        Events that were not processed yet are kept in the events
+        directory, so they are recovered by the next start.
+
+        :param timeout: max seconds to wait for the current events.
+        """
+        self.__stopping.set()
+        deadline = time.time() + timeout if timeout is not None else None
+        for worker in self.__workers:
+            worker.join(
+                None if deadline is None else max(0, deadline - time.time()))
+        logging.info('Sync event queue stopped, %s events pending',
+                     self.get_metrics()['queue_depth'])
+
+    def get_metrics(self):
+        with self.__lock:
+            disk_only_events = len(self.__disk_only_files)
+            return {
+                'queue_depth': self.__queue.qsize() + disk_only_events,
+                'disk_only_events': disk_only_events,
+                'processed_events': self.__processed_events,
+                'failed_events': self.__failed_events,
+                'dead_letter_events': self.__dead_letter_events,
+                'processing_lag_seconds': self.__processing_lag
+            }
+
+    def __process_events(self):
+        while not self.__stopping.is_set():
+            try:
+                enqueue_time, sync_event, file_name = self.__queue.get(
+                    timeout=self.__STOP_CHECK_INTERVAL_SECONDS)
+            except queue.Empty:
+                continue
+
+            processing_lag = time.time() - enqueue_time
+            processed = self.__process_event(sync_event)
+            # The event file is kept when the worker stops before the event
+            # is processed, so the event is recovered by the next start.
+            if processed:
+                self.__remove_event_file(file_name)
+            with self.__lock:
+                self.__processing_lag = processing_lag
+                if processed:
+                    self.__processed_events += 1
+            self.__load_disk_only_events()
+            self.__queue.task_done()
+            logging.info('Sync event queue metrics: %s', self.get_metrics())
+
+    def __process_event(self, sync_event):
+        retry_delay = self.__RETRY_MIN_DELAY_SECONDS
+        while True:
+            try:
+                self.__handler(sync_event)
+                return True
+            except:  # noqa: E722
+                logging.exception(
+                    'Error processing sync event, retrying in %s seconds',
+                    retry_delay)
+                with self.__lock:
+                    self.__failed_events += 1
+            # The event is retried until it is processed, so the ones
+            # received after it are not processed out of order.
+            if self.__stopping.wait(retry_delay):
+                return False
+            retry_delay = min(retry_delay * 2, self.__RETRY_MAX_DELAY_SECONDS)
+
+    def __write_event(self, enqueue_time, sync_event):
+        file_name = '{:020d}-{}{}'.format(int(enqueue_time * 1000000),
+                                          uuid.uuid4().hex[:8],
+                                          self.__EVENT_FILE_SUFFIX)
+        with open(os.path.join(self.__events_dir, file_name), 'w') as file:
+            json.dump({
+                'enqueue_time': enqueue_time,
+                'sync_event': sync_event
+            }, file)
+            file.flush()
+            os.fsync(file.fileno())
+        return file_name
+
+    def __remove_event_file(self, file_name):
+        file_path = os.path.join(self.__events_dir, file_name)
+        try:
+            os.remove(file_path)
+        except OSError:
+            logging.exception('Error removing sync event: %s', file_path)
+
+    def __load_disk_only_events(self):
+        with self.__lock:
+            while self.__disk_only_files and not self.__queue.full():
+                file_name = self.__disk_only_files.pop(0)
+                file_path = os.path.join(self.__events_dir, file_name)
+                try:
+                    with open(file_path) as file:
+                        event_item = json.load(file)
+                    self.__queue.put_nowait(
+                        (event_item['enqueue_time'], event_item['sync_event'],
+                         file_name))
+                except OSError:
+                    logging.exception('Error loading sync event: %s',
+                                      file_path)
+                except (KeyError, TypeError, ValueError):
+                    self.__move_to_dead_letter_dir(file_name)
+
+    def __move_to_dead_letter_dir(self, file_name):
+        dead_letter_dir = os.path.join(self.__events_dir,
+                                       self.__DEAD_LETTER_DIR_NAME)
+        logging.exception('Malformed sync event moved to %s: %s',
+                          dead_letter_dir, file_name)
+        try:
+            os.makedirs(dead_letter_dir, exist_ok=True)
+            os.replace(os.path.join(self.__events_dir, file_name),
+                       os.path.join(dead_letter_dir, file_name))
+        except OSError:
+            logging.exception('Error moving sync event: %s', file_name)
+        self.__dead_letter_events += 1
@@ -0,0 +1,95 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from google.cloud import datacatalog
+
+from google.datacatalog_connectors.hive.prepare import \
+    datacatalog_entry_differ
+
+
+class DataCatalogEntryDifferTestCase(unittest.TestCase):
+    __ENTRY_NAME = 'projects/test_project/locations/location_id/' \
+                   'entryGroups/hive/entries/default__company_funds'
+
+    def test_make_update_mask_unchanged_entry_should_return_empty_mask(self):
+        old_entry = self.__make_table_entry()
+        new_entry = self.__make_table_entry()
+
+        update_mask = datacatalog_entry_differ.DataCatalogEntryDiffer.\
+            make_update_mask(old_entry, new_entry)
+
+        self.assertEqual([], update_mask)
+
+    def test_make_update_mask_added_column_should_return_schema(self):
+        old_entry = self.__make_table_entry()
+        new_entry = self.__make_table_entry(
+            columns=[('code', 'int'), ('desc', 'string'), ('addr', 'string')])
+
+        update_mask = datacatalog_entry_differ.DataCatalogEntryDiffer.\
+            make_update_mask(old_entry, new_entry)
+
+        self.assertEqual(['schema'], update_mask)
+
+    def test_make_update_mask_retyped_column_should_return_schema(self):
+        old_entry = self.__make_table_entry()
+        new_entry = self.__make_table_entry(
+            columns=[('code', 'bigint'), ('desc', 'string')])
+
+        update_mask = datacatalog_entry_differ.DataCatalogEntryDiffer.\
+            make_update_mask(old_entry, new_entry)
+
+        self.assertEqual(['schema'], update_mask)
+
+    def test_make_update_mask_changed_location_should_return_linked_resource(
+            self):
+        old_entry = self.__make_table_entry()
+        new_entry = self.__make_table_entry(
+            linked_resource='//localhost//hdfs://namenode:8020/new_location')
+
+        update_mask = datacatalog_entry_differ.DataCatalogEntryDiffer.\
+            make_update_mask(old_entry, new_entry)
+
+        self.assertEqual(['linked_resource'], update_mask)
+
+    def test_make_update_mask_renamed_entry_should_return_none(self):
+        old_entry = self.__make_table_entry()
+        new_entry = self.__make_table_entry()
+        new_entry.name = '{}_renamed'.format(self.__ENTRY_NAME)
+
+        update_mask = datacatalog_entry_differ.DataCatalogEntryDiffer.\
+            make_update_mask(old_entry, new_entry)
+
+        self.assertIsNone(update_mask)
+
+    @classmethod
+    def __make_table_entry(cls,
+                           columns=None,
+                           linked_resource='//localhost//hdfs://namenode:8020'
+                           '/user/hive/warehouse/company_funds'):
+        if columns is None:
+            columns = [('code', 'int'), ('desc', 'string')]
+
+        entry = datacatalog.Entry()
+        entry.name = cls.__ENTRY_NAME
+        entry.display_name = 'company_funds'
+        entry.linked_resource = linked_resource
+        entry.schema.columns.extend([
+            datacatalog.ColumnSchema(column=name, type=column_type)
+            for name, column_type in columns
+        ])
+        return entry
@@ -217,6 +217,34 @@ class DataCatalogEntryFactoryTestCase(unittest.TestCase):
         self.assertEqual('2019-09-03 13:57:58+00:00',
                          str(entry.source_system_timestamps.update_time))
 
+    def test_make_entry_id_prefix_for_tables_should_match_table_entry_id(self):
+        databases = convert_json_to_metadata_object(
+            retrieve_json_file('databases_with_one_table.json'))['databases']
+
+        factory = datacatalog_entry_factory.DataCatalogEntryFactory(
+            self.__PROJECT_ID, self.__LOCATION_ID, self.__METADATA_SERVER_HOST,
+            self.__ENTRY_GROUP_ID)
+
+        database_name = 'my::::????)()()____invalid_huge_' \
+                        'database_name_!!!!!!_@@@@@@_with' \
+                        '_chars_not_supported_by_dc_and_a' \
+                        'length_that_is_too_long_and_needs' \
+                        '_to_be_truncated'
+        databases[0].name = database_name
+
+        database_entry_id, _ = factory.make_entries_for_database(databases[0])
+        table_entry_id, _ = factory.make_entry_for_table(
+            databases[0].tables[0], database_name)
+
+        prefix = datacatalog_entry_factory.DataCatalogEntryFactory.\
+            make_entry_id_prefix_for_tables(database_entry_id)
+
+        self.assertTrue(table_entry_id.startswith(prefix))
+        self.assertEqual(
+            'default__',
+            datacatalog_entry_factory.DataCatalogEntryFactory.
+            make_entry_id_prefix_for_tables('default'))
+
 
 def retrieve_json_file(name):
     resolved_name = os.path.join(os.path.dirname(os.path.abspath(__file__)),
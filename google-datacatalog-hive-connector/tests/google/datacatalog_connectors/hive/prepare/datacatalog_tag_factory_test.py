@@ -0,0 +1,67 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from google.cloud import datacatalog
+
+from google.datacatalog_connectors.hive.prepare import \
+    datacatalog_tag_factory, datacatalog_tag_template_factory
+
+
+class DataCatalogTagFactoryTestCase(unittest.TestCase):
+    __PROJECT_ID = 'test_project'
+    __LOCATION_ID = 'location_id'
+
+    def setUp(self):
+        _, self.__tag_template = datacatalog_tag_template_factory.\
+            DataCatalogTagTemplateFactory(
+                self.__PROJECT_ID, self.__LOCATION_ID).\
+            make_tag_template_for_partitions()
+
+    def test_make_tag_for_partitions_should_set_fields(self):
+        tag = datacatalog_tag_factory.DataCatalogTagFactory.\
+            make_tag_for_partitions(self.__tag_template, {
+                'partition_count': 3,
+                'latest_partition_create_time': 1575043300
+            })
+
+        self.assertEqual(
+            'projects/test_project/locations/location_id/'
+            'tagTemplates/hive_table_partitions', tag.template)
+        self.assertEqual(3, tag.fields['partition_count'].double_value)
+        self.assertEqual(
+            1575043300, tag.fields['latest_partition_create_time'].
+            timestamp_value.timestamp())
+
+    def test_make_tag_for_partitions_no_partitions_should_skip_create_time(
+            self):
+        tag = datacatalog_tag_factory.DataCatalogTagFactory.\
+            make_tag_for_partitions(self.__tag_template, {
+                'partition_count': 0,
+                'latest_partition_create_time': 0
+            })
+
+        self.assertEqual(0, tag.fields['partition_count'].double_value)
+        self.assertNotIn('latest_partition_create_time', tag.fields)
+
+    def test_make_tag_template_for_partitions_should_set_fields(self):
+        self.assertEqual(
+            datacatalog.FieldType.PrimitiveType.DOUBLE,
+            self.__tag_template.fields['partition_count'].type.primitive_type)
+        self.assertEqual(
+            datacatalog.FieldType.PrimitiveType.TIMESTAMP, self.__tag_template.
+            fields['latest_partition_create_time'].type.primitive_type)
@@ -91,6 +91,24 @@ class MetadataScraperTestCase(unittest.TestCase):
         self.assertEqual('string', column_desc.type)
         self.assertEqual(None, column_desc.comment)
 
+    def test_scrape_update_table_message_metadata_should_return_old_objects(
+            self):  # noqa
+        databases_metadata =\
+            scrape.MetadataSyncEventScraper.get_database_metadata(
+                retrieve_json_file('hooks/message_update_table.json'))
+
+        old_database_metadata = databases_metadata['old_databases'][0]
+
+        self.assertEqual('default', old_database_metadata.name)
+        old_table = old_database_metadata.tables[0]
+        self.assertEqual('company_funds', old_table.name)
+        self.assertEqual([], old_table.table_params)
+        old_columns = old_table.table_storages[0].columns
+        self.assertEqual(2, len(old_columns))
+
+        new_table = databases_metadata['databases'][0].tables[0]
+        self.assertEqual(3, len(new_table.table_storages[0].columns))
+
     def test_scrape_drop_table_message_metadata_should_return_objects(self):
         databases_metadata =\
             scrape.MetadataSyncEventScraper.get_database_metadata(
@@ -144,6 +162,30 @@ class MetadataScraperTestCase(unittest.TestCase):
         self.assertEqual('hdfs://namenode:8020/user/hive/warehouse/hr.db',
                          database_metadata.uri)
 
+    def test_scrape_add_partition_message_metadata_should_return_stats(self):
+        databases_metadata =\
+            scrape.MetadataSyncEventScraper.get_database_metadata(
+                retrieve_json_file('hooks/message_add_partition.json'))
+
+        self.assertEqual('company_funds',
+                         databases_metadata['databases'][0].tables[0].name)
+        self.assertEqual([{
+            'database_name': 'default',
+            'table_name': 'company_funds',
+            'partition_count': 3,
+            'latest_partition_create_time': 1575043300
+        }], databases_metadata['partitions_stats'])
+
+    def test_scrape_drop_partition_message_metadata_should_return_stats(self):
+        databases_metadata =\
+            scrape.MetadataSyncEventScraper.get_database_metadata(
+                retrieve_json_file('hooks/message_drop_partition.json'))
+
+        partition_stats = databases_metadata['partitions_stats'][0]
+        self.assertEqual(4, partition_stats['partition_count'])
+        self.assertEqual(1575043200,
+                         partition_stats['latest_partition_create_time'])
+
 
 def retrieve_json_file(name):
     resolved_name = os.path.join(os.path.dirname(os.path.abspath(__file__)),
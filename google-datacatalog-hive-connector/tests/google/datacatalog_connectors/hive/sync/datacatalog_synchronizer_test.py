@@ -19,6 +19,10 @@ import os
 import unittest
 from unittest.mock import patch
 
+from google.api_core import exceptions
+from google.cloud import datacatalog
+from google.datacatalog_connectors.commons import prepare
+
 from google.datacatalog_connectors.hive.sync import datacatalog_synchronizer
 
 
@@ -137,6 +141,8 @@ class DatacatalogSynchronizerTestCase(unittest.TestCase):
         self.assertEqual(process_metadata_payload_bytes_metric.call_count, 1)
         self.assertEqual(process_elapsed_time_metric.call_count, 1)
 
+    @patch('google.datacatalog_connectors.hive.sync.'
+           'datacatalog_synchronizer.datacatalog.DataCatalogClient')
     @patch('google.datacatalog_connectors.hive.scrape.'
            'MetadataSyncEventScraper.get_database_metadata')
     @patch('google.datacatalog_connectors.hive.'
@@ -164,8 +170,8 @@ class DatacatalogSynchronizerTestCase(unittest.TestCase):
             self, process_entries_length_metric,
             process_metadata_payload_bytes_metric, process_elapsed_time_metric,
             delete_metadata, delete_obsolete_metadata, ingest_metadata,
-            make_entries_from_database_metadata,
-            get_database_metadata):  # noqa
+            make_entries_from_database_metadata, get_database_metadata,
+            datacatalog_client):  # noqa
 
         make_entries_from_database_metadata.return_value = [({}, [])]
 
@@ -176,7 +182,8 @@ class DatacatalogSynchronizerTestCase(unittest.TestCase):
                 '/hooks/message_update_table.json'))
         synchronizer.run()
         self.assertEqual(1, get_database_metadata.call_count)
-        self.assertEqual(1, make_entries_from_database_metadata.call_count)
+        # Both the new and the old table states are prepared.
+        self.assertEqual(2, make_entries_from_database_metadata.call_count)
         self.assertEqual(1, ingest_metadata.call_count)
         self.assertEqual(0, delete_metadata.call_count)
         self.assertEqual(0, delete_obsolete_metadata.call_count)
@@ -184,6 +191,135 @@ class DatacatalogSynchronizerTestCase(unittest.TestCase):
         self.assertEqual(process_metadata_payload_bytes_metric.call_count, 1)
         self.assertEqual(process_elapsed_time_metric.call_count, 1)
 
+    @patch('google.datacatalog_connectors.hive.sync.'
+           'datacatalog_synchronizer.datacatalog.DataCatalogClient')
+    @patch('google.datacatalog_connectors.hive.'
+           'prepare.assembled_entry_factory.'
+           'AssembledEntryFactory.make_entries_from_database_metadata')
+    @patch('google.datacatalog_connectors.commons.ingest.'
+           'datacatalog_metadata_ingestor.'
+           'DataCatalogMetadataIngestor.ingest_metadata')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_elapsed_time_metric')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_metadata_payload_bytes_metric')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_entries_length_metric')
+    def test_synchronize_metadata_with_update_table_sync_event_should_update_changed_fields_only(  # noqa
+            self, process_entries_length_metric,
+            process_metadata_payload_bytes_metric, process_elapsed_time_metric,
+            ingest_metadata, make_entries_from_database_metadata,
+            datacatalog_client):  # noqa
+
+        new_table_entry = make_table_entry(['code', 'desc', 'addr'])
+        old_table_entry = make_table_entry(['code', 'desc'])
+        make_entries_from_database_metadata.side_effect = [[
+            ({}, [prepare.AssembledEntryData('table', new_table_entry)])
+        ], [({}, [prepare.AssembledEntryData('table', old_table_entry)])]]
+
+        synchronizer = datacatalog_synchronizer.DataCatalogSynchronizer(
+            project_id=DatacatalogSynchronizerTestCase.__PROJECT_ID,
+            location_id=DatacatalogSynchronizerTestCase.__LOCATION_ID,
+            metadata_sync_event=retrieve_json_file(
+                '/hooks/message_update_table.json'))
+        synchronizer.run()
+
+        update_entry = datacatalog_client.return_value.update_entry
+        self.assertEqual(1, update_entry.call_count)
+        self.assertEqual(['schema'],
+                         update_entry.call_args[1]['update_mask'].paths)
+        # Only the database Entry goes through the regular upsert.
+        ingest_metadata.assert_called_once_with([{}])
+
+    @patch('google.datacatalog_connectors.hive.sync.'
+           'datacatalog_synchronizer.datacatalog.DataCatalogClient')
+    @patch('google.datacatalog_connectors.hive.'
+           'prepare.assembled_entry_factory.'
+           'AssembledEntryFactory.make_entries_from_database_metadata')
+    @patch('google.datacatalog_connectors.commons.ingest.'
+           'datacatalog_metadata_ingestor.'
+           'DataCatalogMetadataIngestor.ingest_metadata')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_elapsed_time_metric')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_metadata_payload_bytes_metric')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_entries_length_metric')
+    def test_synchronize_metadata_with_update_table_sync_event_unchanged_table_should_upsert(  # noqa
+            self, process_entries_length_metric,
+            process_metadata_payload_bytes_metric, process_elapsed_time_metric,
+            ingest_metadata, make_entries_from_database_metadata,
+            datacatalog_client):  # noqa
+
+        # The table is unchanged in the event, but it may be missing
+        # or stale in Data Catalog.
+        new_table_entry = prepare.AssembledEntryData(
+            'table', make_table_entry(['code', 'desc']))
+        old_table_entry = prepare.AssembledEntryData(
+            'table', make_table_entry(['code', 'desc']))
+        make_entries_from_database_metadata.side_effect = [[
+            ({}, [new_table_entry])
+        ], [({}, [old_table_entry])]]
+
+        synchronizer = datacatalog_synchronizer.DataCatalogSynchronizer(
+            project_id=DatacatalogSynchronizerTestCase.__PROJECT_ID,
+            location_id=DatacatalogSynchronizerTestCase.__LOCATION_ID,
+            metadata_sync_event=retrieve_json_file(
+                '/hooks/message_update_table.json'))
+        synchronizer.run()
+
+        self.assertEqual(
+            0, datacatalog_client.return_value.update_entry.call_count)
+        ingest_metadata.assert_called_once_with([{}, new_table_entry])
+
+    @patch('google.datacatalog_connectors.hive.sync.'
+           'datacatalog_synchronizer.datacatalog.DataCatalogClient')
+    @patch('google.datacatalog_connectors.hive.'
+           'prepare.assembled_entry_factory.'
+           'AssembledEntryFactory.make_entries_from_database_metadata')
+    @patch('google.datacatalog_connectors.commons.ingest.'
+           'datacatalog_metadata_ingestor.'
+           'DataCatalogMetadataIngestor.ingest_metadata')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_elapsed_time_metric')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_metadata_payload_bytes_metric')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_entries_length_metric')
+    def test_synchronize_metadata_with_update_table_sync_event_update_error_should_upsert(  # noqa
+            self, process_entries_length_metric,
+            process_metadata_payload_bytes_metric, process_elapsed_time_metric,
+            ingest_metadata, make_entries_from_database_metadata,
+            datacatalog_client):  # noqa
+
+        new_table_entry = prepare.AssembledEntryData(
+            'table', make_table_entry(['code', 'desc', 'addr']))
+        old_table_entry = prepare.AssembledEntryData(
+            'table', make_table_entry(['code', 'desc']))
+        make_entries_from_database_metadata.side_effect = [[
+            ({}, [new_table_entry])
+        ], [({}, [old_table_entry])]]
+        datacatalog_client.return_value.update_entry.side_effect = \
+            exceptions.PermissionDenied('Entry not found')
+
+        synchronizer = datacatalog_synchronizer.DataCatalogSynchronizer(
+            project_id=DatacatalogSynchronizerTestCase.__PROJECT_ID,
+            location_id=DatacatalogSynchronizerTestCase.__LOCATION_ID,
+            metadata_sync_event=retrieve_json_file(
+                '/hooks/message_update_table.json'))
+        synchronizer.run()
+
+        ingest_metadata.assert_called_once_with([{}, new_table_entry])
+
     @patch('google.datacatalog_connectors.hive.scrape.'
            'MetadataSyncEventScraper.get_database_metadata')
     @patch('google.datacatalog_connectors.hive.'
@@ -231,6 +367,93 @@ class DatacatalogSynchronizerTestCase(unittest.TestCase):
         self.assertEqual(process_metadata_payload_bytes_metric.call_count, 1)
         self.assertEqual(process_elapsed_time_metric.call_count, 1)
 
+    @patch('google.datacatalog_connectors.hive.sync.hive_datacatalog_facade.'
+           'HiveDataCatalogFacade.__init__', lambda self, *args: None)
+    @patch('google.datacatalog_connectors.hive.sync.hive_datacatalog_facade.'
+           'HiveDataCatalogFacade.delete_entry')
+    @patch('google.datacatalog_connectors.commons.datacatalog_facade.'
+           'DataCatalogFacade.get_entry')
+    @patch('google.datacatalog_connectors.commons.datacatalog_facade.'
+           'DataCatalogFacade.search_catalog')
+    @patch('google.datacatalog_connectors.hive.'
+           'prepare.assembled_entry_factory.'
+           'AssembledEntryFactory.make_entries_from_database_metadata')
+    @patch('google.datacatalog_connectors.commons.cleanup.'
+           'datacatalog_metadata_cleaner.DataCatalogMetadataCleaner.'
+           'delete_metadata')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_elapsed_time_metric')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_metadata_payload_bytes_metric')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_entries_length_metric')
+    def test_synchronize_metadata_with_cascade_drop_database_should_delete_tables(  # noqa
+            self, process_entries_length_metric,
+            process_metadata_payload_bytes_metric, process_elapsed_time_metric,
+            delete_metadata, make_entries_from_database_metadata,
+            search_catalog, get_entry, delete_entry):  # noqa
+
+        warehouse = '//localhost//hdfs://namenode:8020/user/hive/warehouse/'
+        database_entry = datacatalog.Entry()
+        database_entry.linked_resource = '{}hr.db'.format(warehouse)
+        make_entries_from_database_metadata.return_value = [
+            (prepare.AssembledEntryData('hr', database_entry), [])
+        ]
+        entries_path = 'projects/test_project/locations/location_id/' \
+                       'entryGroups/hive/entries/'
+        tables_display_name = {
+            'hr__employees': 'employees',
+            'hr__salaries': 'salaries',
+            'hr__payroll_export': 'payroll_export',
+            # Tables of the hr_ and hr__archive databases share the
+            # hr__ Entry ID prefix.
+            'hr___archive': 'archive',
+            'hr__archive__employees': 'employees',
+            'default__company_funds': 'company_funds'
+        }
+        search_catalog.return_value = [
+            make_search_result('{}hr__employees'.format(entries_path),
+                               '{}hr.db/employees'.format(warehouse)),
+            make_search_result('{}hr__salaries'.format(entries_path),
+                               '{}hr.db/salaries'.format(warehouse)),
+            # External table stored outside the database location.
+            make_search_result('{}hr__payroll_export'.format(entries_path),
+                               '//localhost//gs://exports/payroll'),
+            make_search_result('{}hr___archive'.format(entries_path),
+                               '{}hr_.db/archive'.format(warehouse)),
+            make_search_result('{}hr__archive__employees'.format(entries_path),
+                               '{}hr.db/archive/employees'.format(warehouse)),
+            make_search_result('{}default__company_funds'.format(entries_path),
+                               '{}company_funds'.format(warehouse))
+        ]
+        get_entry.side_effect = lambda name: datacatalog.Entry(
+            name=name, display_name=tables_display_name[name.split('/')[-1]])
+        delete_entry.side_effect = [True, True, False]
+
+        synchronizer = datacatalog_synchronizer.DataCatalogSynchronizer(
+            project_id=DatacatalogSynchronizerTestCase.__PROJECT_ID,
+            location_id=DatacatalogSynchronizerTestCase.__LOCATION_ID,
+            metadata_sync_event=retrieve_json_file(
+                '/hooks/message_drop_database.json'),
+            cascade_drop_database=True)
+
+        with self.assertLogs(level='INFO') as logs:
+            synchronizer.run()
+
+        self.assertEqual(1, search_catalog.call_count)
+        deleted_entries = sorted(
+            call[0][0] for call in delete_entry.call_args_list)
+        self.assertEqual([
+            '{}hr__employees'.format(entries_path),
+            '{}hr__payroll_export'.format(entries_path),
+            '{}hr__salaries'.format(entries_path)
+        ], deleted_entries)
+        self.assertIn('INFO:root:\nTables deleted: 2', logs.output)
+        self.assertEqual(1, delete_metadata.call_count)
+
     @patch('google.datacatalog_connectors.hive.scrape.'
            'MetadataSyncEventScraper.get_database_metadata')
     @patch('google.datacatalog_connectors.hive.'
@@ -278,6 +501,69 @@ class DatacatalogSynchronizerTestCase(unittest.TestCase):
         self.assertEqual(process_metadata_payload_bytes_metric.call_count, 1)
         self.assertEqual(process_elapsed_time_metric.call_count, 1)
 
+    @patch('google.datacatalog_connectors.commons.datacatalog_facade.'
+           'DataCatalogFacade.__init__', lambda self, *args: None)
+    @patch('google.datacatalog_connectors.commons.datacatalog_facade.'
+           'DataCatalogFacade.create_tag_template')
+    @patch('google.datacatalog_connectors.commons.datacatalog_facade.'
+           'DataCatalogFacade.list_tags')
+    @patch('google.datacatalog_connectors.commons.datacatalog_facade.'
+           'DataCatalogFacade.create_tag')
+    @patch('google.datacatalog_connectors.commons.datacatalog_facade.'
+           'DataCatalogFacade.update_tag')
+    @patch('google.datacatalog_connectors.hive.'
+           'prepare.assembled_entry_factory.'
+           'AssembledEntryFactory.make_entries_from_database_metadata')
+    @patch('google.datacatalog_connectors.commons.monitoring.'
+           'metrics_processor.MetricsProcessor.'
+           'process_elapsed_time_metric')
+    def test_synchronize_metadata_with_drop_partition_sync_event_should_update_tag(  # noqa
+            self, process_elapsed_time_metric,
+            make_entries_from_database_metadata, update_tag, create_tag,
+            list_tags, create_tag_template):  # noqa
+
+        current_tag = datacatalog.Tag()
+        current_tag.name = 'projects/test_project/locations/location_id/' \
+                           'entryGroups/hive/entries/default__company_funds' \
+                           '/tags/partitions'
+        current_tag.template = 'projects/test_project/locations/' \
+                               'location_id/tagTemplates/hive_table_partitions'
+        current_tag.fields['partition_count'] = datacatalog.TagField(
+            double_value=5)
+        current_tag.fields['latest_partition_create_time'] = \
+            datacatalog.TagField(timestamp_value={'seconds': 1575043300})
+        list_tags.return_value = [current_tag]
+
+        synchronizer = datacatalog_synchronizer.DataCatalogSynchronizer(
+            project_id=DatacatalogSynchronizerTestCase.__PROJECT_ID,
+            location_id=DatacatalogSynchronizerTestCase.__LOCATION_ID,
+            metadata_sync_event=retrieve_json_file(
+                '/hooks/message_drop_partition.json'))
+        synchronizer.run()
+
+        self.assertEqual(0, make_entries_from_database_metadata.call_count)
+        self.assertEqual(1, create_tag_template.call_count)
+        self.assertEqual(
+            'projects/test_project/locations/location_id/'
+            'entryGroups/hive/entries/default__company_funds',
+            list_tags.call_args[0][0])
+        self.assertEqual(0, create_tag.call_count)
+        updated_tag = update_tag.call_args[0][0]
+        self.assertEqual(current_tag.name, updated_tag.name)
+        self.assertEqual(4, updated_tag.fields['partition_count'].double_value)
+        # The dropped partitions may lower the latest create time.
+        self.assertEqual(
+            1575043200, updated_tag.fields['latest_partition_create_time'].
+            timestamp_value.timestamp())
+        self.assertEqual(process_elapsed_time_metric.call_count, 1)
+
+
+def make_search_result(relative_resource_name, linked_resource):
+    search_result = datacatalog.SearchCatalogResult()
+    search_result.relative_resource_name = relative_resource_name
+    search_result.linked_resource = linked_resource
+    return search_result
+
 
 def retrieve_json_file(name):
     resolved_name = os.path.join(os.path.dirname(os.path.abspath(__file__)),
@@ -285,3 +571,14 @@ def retrieve_json_file(name):
 
     with open(resolved_name) as json_file:
         return json.load(json_file)
+
+
+def make_table_entry(column_names):
+    entry = datacatalog.Entry()
+    entry.name = 'projects/test_project/locations/location_id/' \
+                 'entryGroups/hive/entries/default__company_funds'
+    entry.schema.columns.extend([
+        datacatalog.ColumnSchema(column=name, type='string')
+        for name in column_names
+    ])
+    return entry
@@ -0,0 +1,59 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions
+from google.cloud import datacatalog
+
+from google.datacatalog_connectors.hive.sync import hive_datacatalog_facade
+
+
+@mock.patch('google.cloud.datacatalog.DataCatalogClient')
+class HiveDataCatalogFacadeTestCase(unittest.TestCase):
+
+    __ENTRY_NAME = 'projects/test_project/locations/location_id/' \
+                   'entryGroups/hive/entries/hr__employees'
+
+    def test_update_entry_fields_should_send_field_mask(
+            self, datacatalog_client):
+        facade = hive_datacatalog_facade.HiveDataCatalogFacade('test_project')
+        entry = datacatalog.Entry()
+        entry.name = self.__ENTRY_NAME
+
+        facade.update_entry_fields(entry, ['schema', 'linked_resource'])
+
+        update_entry = datacatalog_client.return_value.update_entry
+        self.assertEqual(entry, update_entry.call_args[1]['entry'])
+        self.assertEqual(['schema', 'linked_resource'],
+                         update_entry.call_args[1]['update_mask'].paths)
+
+    def test_delete_entry_should_return_true_on_success(
+            self, datacatalog_client):
+        facade = hive_datacatalog_facade.HiveDataCatalogFacade('test_project')
+
+        self.assertTrue(facade.delete_entry(self.__ENTRY_NAME))
+        datacatalog_client.return_value.delete_entry.assert_called_once_with(
+            name=self.__ENTRY_NAME)
+
+    def test_delete_entry_should_return_false_on_error(self,
+                                                       datacatalog_client):
+        datacatalog_client.return_value.delete_entry.side_effect = \
+            exceptions.PermissionDenied('Entry not found')
+        facade = hive_datacatalog_facade.HiveDataCatalogFacade('test_project')
+
+        self.assertFalse(facade.delete_entry(self.__ENTRY_NAME))
@@ -0,0 +1,201 @@
+#!/usr/bin/python
+#
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from google.datacatalog_connectors.hive.sync import sync_event_queue
+
+
+class SyncEventQueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__events_dir = tempfile.TemporaryDirectory()
+        self.__processed_events = []
+
+    def tearDown(self):
+        self.__events_dir.cleanup()
+
+    def test_put_should_process_events_in_background(self):
+        event_queue = sync_event_queue.SyncEventQueue(
+            self.__processed_events.append, events_dir=self.__events_dir.name)
+        event_queue.start()
+
+        event_queue.put({'event': 'CREATE_TABLE'})
+        event_queue.put({'event': 'ALTER_TABLE'})
+        event_queue.join()
+
+        self.assertEqual([{
+            'event': 'CREATE_TABLE'
+        }, {
+            'event': 'ALTER_TABLE'
+        }], self.__processed_events)
+        metrics = event_queue.get_metrics()
+        self.assertEqual(0, metrics['queue_depth'])
+        self.assertEqual(2, metrics['processed_events'])
+
+    def test_put_should_persist_events_until_processed(self):
+        event_queue = sync_event_queue.SyncEventQueue(
+            self.__processed_events.append, events_dir=self.__events_dir.name)
+
+        # Workers are not started yet, so the event is not processed.
+        event_queue.put({'event': 'CREATE_TABLE'})
+
+        self.assertEqual(1, len(os.listdir(self.__events_dir.name)))
+
+        event_queue.start()
+        event_queue.join()
+
+        self.assertEqual([{'event': 'CREATE_TABLE'}], self.__processed_events)
+        self.assertEqual([], os.listdir(self.__events_dir.name))
+
+    def test_put_full_queue_should_keep_events_on_disk_and_keep_order(self):
+        release_worker = threading.Event()
+
+        def handler(sync_event):
+            release_worker.wait()
+            self.__processed_events.append(sync_event)
+
+        event_queue = sync_event_queue.SyncEventQueue(
+            handler, max_size=1, events_dir=self.__events_dir.name)
+        event_queue.start()
+
+        for index in range(5):
+            event_queue.put({'event': 'ALTER_TABLE', 'index': index})
+
+        self.assertEqual(5, len(os.listdir(self.__events_dir.name)))
+        self.assertLessEqual(4, event_queue.get_metrics()['queue_depth'])
+
+        release_worker.set()
+        event_queue.join()
+
+        self.assertEqual([0, 1, 2, 3, 4],
+                         [event['index'] for event in self.__processed_events])
+        self.assertEqual([], os.listdir(self.__events_dir.name))
+
+    def test_start_should_recover_events_left_by_previous_process(self):
+        previous_queue = sync_event_queue.SyncEventQueue(
+            self.__processed_events.append,
+            max_size=1,
+            events_dir=self.__events_dir.name)
+        previous_queue.put({'event': 'CREATE_DATABASE'})
+        previous_queue.put({'event': 'DROP_DATABASE'})
+
+        event_queue = sync_event_queue.SyncEventQueue(
+            self.__processed_events.append, events_dir=self.__events_dir.name)
+        event_queue.start()
+        event_queue.join()
+
+        self.assertEqual([{
+            'event': 'CREATE_DATABASE'
+        }, {
+            'event': 'DROP_DATABASE'
+        }], self.__processed_events)
+
+    def test_stop_should_keep_pending_events_on_disk(self):
+        worker_busy = threading.Event()
+        release_worker = threading.Event()
+
+        def handler(sync_event):
+            worker_busy.set()
+            release_worker.wait()
+            self.__processed_events.append(sync_event)
+
+        event_queue = sync_event_queue.SyncEventQueue(
+            handler, events_dir=self.__events_dir.name)
+        event_queue.start()
+
+        event_queue.put({'event': 'CREATE_TABLE'})
+        event_queue.put({'event': 'DROP_TABLE'})
+        worker_busy.wait()
+
+        # The worker is released once stop() is waiting for it.
+        threading.Timer(0.1, release_worker.set).start()
+        event_queue.stop(timeout=5)
+
+        self.assertEqual([{'event': 'CREATE_TABLE'}], self.__processed_events)
+        self.assertEqual(1, len(os.listdir(self.__events_dir.name)))
+
+    @mock.patch.object(sync_event_queue.SyncEventQueue,
+                       '_SyncEventQueue__RETRY_MIN_DELAY_SECONDS', 0.01)
+    def test_handler_error_should_retry_event(self):
+        failed_events = []
+
+        def handler(sync_event):
+            if not failed_events:
+                failed_events.append(sync_event)
+                raise Exception('Error')
+            self.__processed_events.append(sync_event)
+
+        event_queue = sync_event_queue.SyncEventQueue(
+            handler, events_dir=self.__events_dir.name)
+        event_queue.start()
+
+        event_queue.put({'event': 'DROP_TABLE'})
+        event_queue.put({'event': 'CREATE_TABLE'})
+        event_queue.join()
+
+        self.assertEqual([{
+            'event': 'DROP_TABLE'
+        }, {
+            'event': 'CREATE_TABLE'
+        }], self.__processed_events)
+        self.assertEqual([], os.listdir(self.__events_dir.name))
+        metrics = event_queue.get_metrics()
+        self.assertEqual(2, metrics['processed_events'])
+        self.assertEqual(1, metrics['failed_events'])
+
+    def test_stop_should_keep_event_being_retried_on_disk(self):
+        handler_called = threading.Event()
+
+        def handler(sync_event):
+            handler_called.set()
+            raise Exception('Error')
+
+        event_queue = sync_event_queue.SyncEventQueue(
+            handler, events_dir=self.__events_dir.name)
+        event_queue.start()
+
+        event_queue.put({'event': 'DROP_TABLE'})
+        handler_called.wait()
+        event_queue.stop(timeout=5)
+
+        self.assertEqual(1, len(os.listdir(self.__events_dir.name)))
+        self.assertEqual(0, event_queue.get_metrics()['processed_events'])
+
+    def test_start_should_move_malformed_events_to_dead_letter_dir(self):
+        with open(os.path.join(self.__events_dir.name, '0-malformed.json'),
+                  'w') as file:
+            file.write('{"enqueue_time": ')
+        previous_queue = sync_event_queue.SyncEventQueue(
+            self.__processed_events.append, events_dir=self.__events_dir.name)
+        previous_queue.put({'event': 'CREATE_TABLE'})
+
+        event_queue = sync_event_queue.SyncEventQueue(
+            self.__processed_events.append, events_dir=self.__events_dir.name)
+        event_queue.start()
+        event_queue.join()
+
+        self.assertEqual([{'event': 'CREATE_TABLE'}], self.__processed_events)
+        self.assertEqual(['dead-letter'], os.listdir(self.__events_dir.name))
+        self.assertEqual(['0-malformed.json'],
+                         os.listdir(
+                             os.path.join(self.__events_dir.name,
+                                          'dead-letter')))
+        self.assertEqual(1, event_queue.get_metrics()['dead_letter_events'])
@@ -19,23 +19,31 @@ package com.google.datacatalog_connectors.hive.metastore;
 
 import com.google.datacatalog_connectors.hive.metastore.domain.CreateDatabaseEventRequest;
 import com.google.datacatalog_connectors.hive.metastore.domain.DropDatabaseEventRequest;
-import com.google.datacatalog_connectors.hive.metastore.gateways.PubSubWrapper;
+import com.google.datacatalog_connectors.hive.metastore.gateways.PubSubBatchPublisher;
 import com.google.datacatalog_connectors.hive.metastore.domain.AlterTableEventRequest;
 import com.google.datacatalog_connectors.hive.metastore.domain.CreateTableEventRequest;
 import com.google.datacatalog_connectors.hive.metastore.domain.DatabaseMetadata;
 import com.google.datacatalog_connectors.hive.metastore.domain.DropTableEventRequest;
+import com.google.datacatalog_connectors.hive.metastore.domain.MetadataEvent;
+import com.google.datacatalog_connectors.hive.metastore.domain.PartitionEventRequest;
 import com.google.datacatalog_connectors.hive.metastore.domain.TableMetadata;
 import org.apache.hadoop.conf.Configuration;
+import org.apache.hadoop.hive.metastore.HiveMetaStore;
 import org.apache.hadoop.hive.metastore.MetaStoreEventListener;
 import org.apache.hadoop.hive.metastore.api.Database;
 import org.apache.hadoop.hive.metastore.api.MetaException;
+import org.apache.hadoop.hive.metastore.api.Partition;
 import org.apache.hadoop.hive.metastore.api.Table;
 import org.apache.hadoop.hive.metastore.events.*;
+import org.apache.thrift.TException;
 import org.codehaus.jackson.map.ObjectMapper;
 import org.slf4j.Logger;
 import org.slf4j.LoggerFactory;
 
-import java.util.List;
+import java.util.Collections;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.Map;
 
 public class HiveMetastoreListener extends MetaStoreEventListener {
   private static final Logger LOGGER = LoggerFactory.getLogger(HiveMetastoreListener.class);
@@ -50,6 +58,25 @@ public class HiveMetastoreListener extends MetaStoreEventListener {
   // instead of relying on the OS hostname
   private static final String HOST_NAME = System.getenv("METASTORE_HOST_NAME");
 
+  // ObjectMapper is thread-safe once configured, so it is shared by all events
+  private static final ObjectMapper OBJECT_MAPPER = new ObjectMapper();
+
+  // Partition reads are not limited, so the statistics cover the whole table
+  private static final short ALL_PARTITIONS = -1;
+
+  private static final int LATEST_PARTITION_CREATE_TIMES_MAX_SIZE = 10000;
+
+  // Latest partition create time of the tables whose partitions changed, by
+  // "db.table", so dropping partitions only reads the remaining ones when the
+  // latest of them is dropped
+  private final Map<String, Integer> latestPartitionCreateTimes =
+      Collections.synchronizedMap(new LinkedHashMap<String, Integer>(16, 0.75f, true) {
+        @Override
+        protected boolean removeEldestEntry(Map.Entry<String, Integer> eldest) {
+          return size() > LATEST_PARTITION_CREATE_TIMES_MAX_SIZE;
+        }
+      });
+
   public HiveMetastoreListener(Configuration config) {
     super(config);
     LOGGER.info("[Thread: " + Thread.currentThread().getName() + "] | [version: 0.3.1] | " +
@@ -104,6 +131,7 @@ public class HiveMetastoreListener extends MetaStoreEventListener {
     super.onDropTable(event);
 
     Table table = event.getTable();
+    latestPartitionCreateTimes.remove(getTableKey(table));
 
     TableMetadata tableMetadata = HiveMetadataBuilder.getTableMetadata(table);
 
@@ -125,19 +153,93 @@ public class HiveMetastoreListener extends MetaStoreEventListener {
     sendToPubSub(request);
   }
 
-  private void sendToPubSub(Object request) {
+  @Override
+  public void onAddPartition(AddPartitionEvent event) throws MetaException {
+    super.onAddPartition(event);
+
+    Table table = event.getTable();
+    String tableKey = getTableKey(table);
     try {
+      int partitionCount = countPartitions(event.getHandler(), table);
+      // Added partitions are created by this event, so they hold the table
+      // latest create time.
+      int latestPartitionCreateTime = getLatestPartitionCreateTime(
+          event.getPartitionIterator());
+      latestPartitionCreateTimes.put(tableKey, latestPartitionCreateTime);
+
+      sendToPubSub(new PartitionEventRequest(MetadataEvent.ADD_PARTITION, table.getDbName(),
+          table.getTableName(), partitionCount, latestPartitionCreateTime, HOST_NAME));
+    } catch (TException e) {
+      logPartitionsReadError(table, e);
+    }
+  }
 
-      PubSubWrapper pubsub = new PubSubWrapper(PROJECT_ID);
-      ObjectMapper objMapper = new ObjectMapper();
+  @Override
+  public void onDropPartition(DropPartitionEvent event) throws MetaException {
+    super.onDropPartition(event);
 
-      String message = objMapper.writeValueAsString(request);
-      List<String> messageIds = pubsub.publishMessage(TOPIC_ID,
-          message);
-      if (messageIds != null) {
-        for (String messageId : messageIds) {
-          LOGGER.info("Published with a message id: " + messageId);
-        }
+    Table table = event.getTable();
+    String tableKey = getTableKey(table);
+    try {
+      int partitionCount = countPartitions(event.getHandler(), table);
+      Integer knownLatestPartitionCreateTime = latestPartitionCreateTimes.get(tableKey);
+      int latestPartitionCreateTime;
+      if (partitionCount == 0) {
+        latestPartitionCreateTime = 0;
+      } else if (knownLatestPartitionCreateTime != null && getLatestPartitionCreateTime(
+          event.getPartitionIterator()) < knownLatestPartitionCreateTime) {
+        latestPartitionCreateTime = knownLatestPartitionCreateTime;
+      } else {
+        // The latest partition was dropped, or it is not known yet, so the
+        // remaining partitions are read to find it.
+        latestPartitionCreateTime = getLatestPartitionCreateTime(event.getHandler()
+            .get_partitions(table.getDbName(), table.getTableName(), ALL_PARTITIONS)
+            .iterator());
+      }
+      latestPartitionCreateTimes.put(tableKey, latestPartitionCreateTime);
+
+      sendToPubSub(new PartitionEventRequest(MetadataEvent.DROP_PARTITION, table.getDbName(),
+          table.getTableName(), partitionCount, latestPartitionCreateTime, HOST_NAME));
+    } catch (TException e) {
+      logPartitionsReadError(table, e);
+    }
+  }
+
+  private int countPartitions(HiveMetaStore.HMSHandler handler, Table table)
+      throws TException {
+    // Only the partition names are read, instead of the whole partitions.
+    return handler.get_partition_names(table.getDbName(), table.getTableName(),
+        ALL_PARTITIONS).size();
+  }
+
+  private int getLatestPartitionCreateTime(Iterator<Partition> partitions) {
+    int latestPartitionCreateTime = 0;
+    while (partitions.hasNext()) {
+      latestPartitionCreateTime = Math.max(latestPartitionCreateTime,
+          partitions.next().getCreateTime());
+    }
+    return latestPartitionCreateTime;
+  }
+
+  private String getTableKey(Table table) {
+    return table.getDbName() + "." + table.getTableName();
+  }
+
+  private void logPartitionsReadError(Table table, TException e) {
+    // The partition statistics are refreshed by the next partition event, so
+    // the DDL operation is not failed because of them.
+    LOGGER.error("Exception reading the partitions of " + table.getDbName() + "." +
+        table.getTableName() + ": ", e);
+  }
+
+  void sendToPubSub(Object request) {
+    try {
+      String message = OBJECT_MAPPER.writeValueAsString(request);
+      // Publishing happens in the background, so DDL operations don't wait
+      // for the Pub/Sub round trip, only for buffer room when it is full.
+      if (!PubSubBatchPublisher.getInstance(PROJECT_ID, TOPIC_ID).publish(message)) {
+        LOGGER.error("Metadata event not published, a full sync is required to recover it: " +
+            request.getClass().getSimpleName());
       }
     } catch (Exception e) {
       LOGGER.error("Exception Publishing to Pub/Sub: ", e);
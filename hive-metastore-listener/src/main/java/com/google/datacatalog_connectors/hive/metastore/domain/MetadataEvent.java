@@ -17,5 +17,6 @@
 package com.google.datacatalog_connectors.hive.metastore.domain;
 
 public enum MetadataEvent {
-    ALTER_TABLE, CREATE_TABLE, CREATE_DATABASE, DROP_TABLE, DROP_DATABASE
+    ALTER_TABLE, CREATE_TABLE, CREATE_DATABASE, DROP_TABLE, DROP_DATABASE, ADD_PARTITION,
+    DROP_PARTITION
 }
@@ -0,0 +1,88 @@
+/*
+ * Copyright 2020 Google LLC
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+package com.google.datacatalog_connectors.hive.metastore.domain;
+
+/**
+ * Partition statistics of a table after partitions are added to or dropped
+ * from it by a single Metastore event, so one message is sent per event
+ * instead of one message per partition. The statistics are table totals,
+ * so the message can be applied more than once.
+ */
+public class PartitionEventRequest {
+
+    public PartitionEventRequest(MetadataEvent event, String dbName, String tableName,
+                                 int partitionCount, int latestPartitionCreateTime,
+                                 String hostName) {
+        this.event = event;
+        this.dbName = dbName;
+        this.tableName = tableName;
+        this.partitionCount = partitionCount;
+        this.latestPartitionCreateTime = latestPartitionCreateTime;
+        this.hostName = hostName;
+    }
+
+    private MetadataEvent event;
+    private String dbName;
+    private String tableName;
+    private int partitionCount;
+    private int latestPartitionCreateTime;
+    private String hostName;
+
+    public MetadataEvent getEvent() {
+        return event;
+    }
+
+    public String getDbName() {
+        return dbName;
+    }
+
+    public void setDbName(String dbName) {
+        this.dbName = dbName;
+    }
+
+    public String getTableName() {
+        return tableName;
+    }
+
+    public void setTableName(String tableName) {
+        this.tableName = tableName;
+    }
+
+    public int getPartitionCount() {
+        return partitionCount;
+    }
+
+    public void setPartitionCount(int partitionCount) {
+        this.partitionCount = partitionCount;
+    }
+
+    public int getLatestPartitionCreateTime() {
+        return latestPartitionCreateTime;
+    }
+
+    public void setLatestPartitionCreateTime(int latestPartitionCreateTime) {
+        this.latestPartitionCreateTime = latestPartitionCreateTime;
+    }
+
+    public void setHostName(String hostName) {
+        this.hostName = hostName;
+    }
+
+    public String getHostName() {
+        return hostName;
+    }
+}
@@ -0,0 +1,224 @@
+/*
+ * Copyright 2020 Google LLC
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+package com.google.datacatalog_connectors.hive.metastore.gateways;
+
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.LinkedBlockingQueue;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * Publishes messages to a single Pub/Sub topic from a background thread, so
+ * callers only pay for adding the message to a bounded in-memory buffer.
+ *
+ * Messages are grouped in batches that are sent when the max messages count,
+ * the max bytes or the max latency threshold is reached. The underlying
+ * {@link PubSubWrapper}, with its HTTP transport and credentials, is created
+ * once and reused for every batch.
+ *
+ * Messages are dropped when the buffer stays full for the offer timeout, when a
+ * batch fails after its retries, or when the buffer is not drained before the
+ * shutdown timeout. Dropped messages are counted, so the metadata they carried
+ * must be recovered by a full sync.
+ */
+public class PubSubBatchPublisher {
+    private static final Logger log = LoggerFactory.getLogger(PubSubBatchPublisher.class);
+
+    private static final int DEFAULT_BATCH_MAX_MESSAGES = 100;
+    // Pub/Sub accepts up to 10MB per publish request.
+    private static final long DEFAULT_BATCH_MAX_BYTES = 1024L * 1024L;
+    private static final long DEFAULT_BATCH_MAX_LATENCY_MS = 100L;
+    private static final int DEFAULT_BUFFER_MAX_MESSAGES = 10000;
+    private static final long DEFAULT_BUFFER_OFFER_TIMEOUT_MS = 1000L;
+    private static final long DEFAULT_SHUTDOWN_TIMEOUT_MS = 10000L;
+    private static final int PUBLISH_MAX_ATTEMPTS = 3;
+    private static final long PUBLISH_RETRY_DELAY_MS = 1000L;
+
+    private static PubSubBatchPublisher instance;
+
+    private final PubSubWrapper pubsub;
+    private final String topicName;
+    private final int batchMaxMessages;
+    private final long batchMaxBytes;
+    private final long batchMaxLatencyMs;
+    private final long bufferOfferTimeoutMs;
+    private final long shutdownTimeoutMs;
+    private final BlockingQueue<String> buffer;
+    private final AtomicLong droppedMessagesCount = new AtomicLong();
+    private final Thread publisherThread;
+    private volatile boolean running = true;
+
+    PubSubBatchPublisher(String project, String topicName, int batchMaxMessages,
+                         long batchMaxBytes, long batchMaxLatencyMs, int bufferMaxMessages,
+                         long bufferOfferTimeoutMs, long shutdownTimeoutMs) {
+        this.pubsub = new PubSubWrapper(project);
+        this.topicName = topicName;
+        this.batchMaxMessages = batchMaxMessages;
+        this.batchMaxBytes = batchMaxBytes;
+        this.batchMaxLatencyMs = batchMaxLatencyMs;
+        this.bufferOfferTimeoutMs = bufferOfferTimeoutMs;
+        this.shutdownTimeoutMs = shutdownTimeoutMs;
+        this.buffer = new LinkedBlockingQueue<>(bufferMaxMessages);
+
+        this.publisherThread = new Thread(this::publishLoop, "pubsub-batch-publisher");
+        this.publisherThread.setDaemon(true);
+        this.publisherThread.start();
+
+        Runtime.getRuntime().addShutdownHook(new Thread(this::shutdown));
+    }
+
+    /**
+     * Returns the publisher shared by the whole Metastore process. Batching thresholds
+     * can be customized through the PUBSUB_BATCH_MAX_MESSAGES, PUBSUB_BATCH_MAX_BYTES,
+     * PUBSUB_BATCH_MAX_LATENCY_MS, PUBSUB_BUFFER_MAX_MESSAGES,
+     * PUBSUB_BUFFER_OFFER_TIMEOUT_MS and PUBSUB_SHUTDOWN_TIMEOUT_MS env variables.
+     */
+    public static synchronized PubSubBatchPublisher getInstance(String project, String topicName) {
+        if (instance == null) {
+            instance = new PubSubBatchPublisher(project, topicName,
+                getIntEnv("PUBSUB_BATCH_MAX_MESSAGES", DEFAULT_BATCH_MAX_MESSAGES),
+                getLongEnv("PUBSUB_BATCH_MAX_BYTES", DEFAULT_BATCH_MAX_BYTES),
+                getLongEnv("PUBSUB_BATCH_MAX_LATENCY_MS", DEFAULT_BATCH_MAX_LATENCY_MS),
+                getIntEnv("PUBSUB_BUFFER_MAX_MESSAGES", DEFAULT_BUFFER_MAX_MESSAGES),
+                getLongEnv("PUBSUB_BUFFER_OFFER_TIMEOUT_MS", DEFAULT_BUFFER_OFFER_TIMEOUT_MS),
+                getLongEnv("PUBSUB_SHUTDOWN_TIMEOUT_MS", DEFAULT_SHUTDOWN_TIMEOUT_MS));
+        }
+        return instance;
+    }
+
+    /**
+     * Adds the message to the publish buffer. Blocks the caller up to the offer timeout
+     * if the buffer is full, as backpressure, and returns false if the message was
+     * dropped because it could not be buffered.
+     */
+    public boolean publish(String message) {
+        try {
+            if (buffer.offer(message, bufferOfferTimeoutMs, TimeUnit.MILLISECONDS)) {
+                return true;
+            }
+            log.error("Pub/Sub publish buffer is full, message dropped: " + message);
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            log.error("Interrupted while buffering, message dropped: " + message);
+        }
+        countDroppedMessages(1);
+        return false;
+    }
+
+    /**
+     * Returns how many messages were dropped since the Metastore process started.
+     */
+    public long getDroppedMessagesCount() {
+        return droppedMessagesCount.get();
+    }
+
+    private void publishLoop() {
+        while (running || !buffer.isEmpty()) {
+            try {
+                List<String> batch = nextBatch();
+                if (!batch.isEmpty()) {
+                    publishBatch(batch);
+                }
+            } catch (InterruptedException e) {
+                // Shutdown requested, remaining messages are flushed on the next iterations.
+                running = false;
+            } catch (Exception e) {
+                log.error("Exception Publishing to Pub/Sub: ", e);
+            }
+        }
+    }
+
+    private List<String> nextBatch() throws InterruptedException {
+        List<String> batch = new ArrayList<>();
+        String message = buffer.poll(batchMaxLatencyMs, TimeUnit.MILLISECONDS);
+        if (message == null) {
+            return batch;
+        }
+
+        long deadline = System.currentTimeMillis() + batchMaxLatencyMs;
+        long batchBytes = 0;
+        while (message != null) {
+            batch.add(message);
+            batchBytes += message.getBytes(StandardCharsets.UTF_8).length;
+            if (batch.size() >= batchMaxMessages || batchBytes >= batchMaxBytes) {
+                break;
+            }
+            long remaining = deadline - System.currentTimeMillis();
+            message = remaining > 0 ? buffer.poll(remaining, TimeUnit.MILLISECONDS)
+                : buffer.poll();
+        }
+        return batch;
+    }
+
+    private void publishBatch(List<String> batch) throws InterruptedException {
+        for (int attempt = 1; attempt <= PUBLISH_MAX_ATTEMPTS; attempt++) {
+            try {
+                List<String> messageIds = pubsub.publishMessages(topicName, batch);
+                if (messageIds != null) {
+                    for (String messageId : messageIds) {
+                        log.info("Published with a message id: " + messageId);
+                    }
+                }
+                return;
+            } catch (Exception e) {
+                log.warn("Exception Publishing to Pub/Sub, attempt " + attempt + ": ", e);
+                if (attempt < PUBLISH_MAX_ATTEMPTS) {
+                    Thread.sleep(PUBLISH_RETRY_DELAY_MS * attempt);
+                }
+            }
+        }
+        log.error("Pub/Sub batch dropped after " + PUBLISH_MAX_ATTEMPTS + " attempts: " + batch);
+        countDroppedMessages(batch.size());
+    }
+
+    private void shutdown() {
+        running = false;
+        try {
+            publisherThread.join(shutdownTimeoutMs);
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+        }
+        int pendingMessagesCount = buffer.size();
+        if (pendingMessagesCount > 0) {
+            log.error("Pub/Sub publisher stopped before draining its buffer, " +
+                pendingMessagesCount + " messages dropped");
+            countDroppedMessages(pendingMessagesCount);
+        }
+    }
+
+    private void countDroppedMessages(int messagesCount) {
+        long totalCount = droppedMessagesCount.addAndGet(messagesCount);
+        log.error("Pub/Sub messages dropped so far: " + totalCount +
+            ", run a full sync to recover their metadata");
+    }
+
+    private static int getIntEnv(String name, int defaultValue) {
+        String value = System.getenv(name);
+        return value != null ? Integer.parseInt(value) : defaultValue;
+    }
+
+    private static long getLongEnv(String name, long defaultValue) {
+        String value = System.getenv(name);
+        return value != null ? Long.parseLong(value) : defaultValue;
+    }
+}
@@ -31,6 +31,7 @@ import org.slf4j.Logger;
 import org.slf4j.LoggerFactory;
 
 import java.io.IOException;
+import java.util.Collections;
 import java.util.List;
 
 public class PubSubWrapper {
@@ -67,8 +68,14 @@ public class PubSubWrapper {
     }
 
     public List<String> publishMessage(String topicName, String data) throws IOException {
+        return publishMessages(topicName, Collections.singletonList(data));
+    }
+
+    public List<String> publishMessages(String topicName, List<String> data) throws IOException {
         List<PubsubMessage> messages = Lists.newArrayList();
-        messages.add(new PubsubMessage().encodeData(data.getBytes("UTF-8")));
+        for (String item : data) {
+            messages.add(new PubsubMessage().encodeData(item.getBytes("UTF-8")));
+        }
         PublishRequest publishRequest = new PublishRequest().setMessages(messages);
         PublishResponse publishResponse = pubsub.projects().topics()
                 .publish(getTopic(topicName), publishRequest)
@@ -0,0 +1,173 @@
+/*
+ * Copyright 2020 Google LLC
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+package com.google.datacatalog_connectors.hive.metastore;
+
+import static org.junit.Assert.assertEquals;
+import static org.mockito.ArgumentMatchers.anyShort;
+import static org.mockito.ArgumentMatchers.anyString;
+import static org.mockito.Mockito.mock;
+import static org.mockito.Mockito.never;
+import static org.mockito.Mockito.verify;
+import static org.mockito.Mockito.when;
+
+import com.google.datacatalog_connectors.hive.metastore.domain.MetadataEvent;
+import com.google.datacatalog_connectors.hive.metastore.domain.PartitionEventRequest;
+import org.apache.hadoop.conf.Configuration;
+import org.apache.hadoop.hive.metastore.HiveMetaStore;
+import org.apache.hadoop.hive.metastore.api.MetaException;
+import org.apache.hadoop.hive.metastore.api.Partition;
+import org.apache.hadoop.hive.metastore.api.Table;
+import org.apache.hadoop.hive.metastore.events.AddPartitionEvent;
+import org.apache.hadoop.hive.metastore.events.DropPartitionEvent;
+import org.apache.thrift.TException;
+import org.junit.Before;
+import org.junit.Test;
+
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+
+public class HiveMetastoreListenerTest {
+
+  private static final String DB_NAME = "sales";
+
+  private static final String TABLE_NAME = "orders";
+
+  private final List<Object> sentRequests = new ArrayList<>();
+
+  private HiveMetaStore.HMSHandler handler;
+
+  private HiveMetastoreListener listener;
+
+  @Before
+  public void setUp() {
+    handler = mock(HiveMetaStore.HMSHandler.class);
+    listener = new HiveMetastoreListener(new Configuration()) {
+      @Override
+      void sendToPubSub(Object request) {
+        sentRequests.add(request);
+      }
+    };
+  }
+
+  @Test
+  public void onAddPartitionShouldCountPartitionNames() throws TException {
+    setPartitionNames("dt=1", "dt=2", "dt=3");
+
+    listener.onAddPartition(makeAddPartitionEvent(300));
+
+    assertPartitionEventRequest(MetadataEvent.ADD_PARTITION, 3, 300);
+    verify(handler, never()).get_partitions(anyString(), anyString(), anyShort());
+  }
+
+  @Test
+  public void onDropPartitionOlderThanLatestShouldNotReadPartitions() throws TException {
+    setPartitionNames("dt=1", "dt=2", "dt=3");
+    listener.onAddPartition(makeAddPartitionEvent(300));
+    setPartitionNames("dt=2", "dt=3");
+
+    listener.onDropPartition(makeDropPartitionEvent(100));
+
+    assertPartitionEventRequest(MetadataEvent.DROP_PARTITION, 2, 300);
+    verify(handler, never()).get_partitions(anyString(), anyString(), anyShort());
+  }
+
+  @Test
+  public void onDropPartitionLatestShouldReadRemainingPartitions() throws TException {
+    setPartitionNames("dt=1", "dt=2", "dt=3");
+    listener.onAddPartition(makeAddPartitionEvent(300));
+    setPartitionNames("dt=1", "dt=2");
+    when(handler.get_partitions(DB_NAME, TABLE_NAME, (short) -1))
+        .thenReturn(Arrays.asList(makePartition(100), makePartition(200)));
+
+    listener.onDropPartition(makeDropPartitionEvent(300));
+
+    assertPartitionEventRequest(MetadataEvent.DROP_PARTITION, 2, 200);
+  }
+
+  @Test
+  public void onDropPartitionUnknownTableShouldReadRemainingPartitions() throws TException {
+    setPartitionNames("dt=2");
+    when(handler.get_partitions(DB_NAME, TABLE_NAME, (short) -1))
+        .thenReturn(Arrays.asList(makePartition(200)));
+
+    listener.onDropPartition(makeDropPartitionEvent(100));
+
+    assertPartitionEventRequest(MetadataEvent.DROP_PARTITION, 1, 200);
+  }
+
+  @Test
+  public void onDropPartitionReadErrorShouldNotFailEvent() throws TException {
+    when(handler.get_partition_names(DB_NAME, TABLE_NAME, (short) -1))
+        .thenThrow(new MetaException("Error"));
+
+    listener.onDropPartition(makeDropPartitionEvent(100));
+
+    assertEquals(0, sentRequests.size());
+  }
+
+  private void setPartitionNames(String... partitionNames) throws TException {
+    when(handler.get_partition_names(DB_NAME, TABLE_NAME, (short) -1))
+        .thenReturn(Arrays.asList(partitionNames));
+  }
+
+  private AddPartitionEvent makeAddPartitionEvent(int createTime) {
+    AddPartitionEvent event = mock(AddPartitionEvent.class);
+    Table table = makeTable();
+    when(event.getTable()).thenReturn(table);
+    when(event.getHandler()).thenReturn(handler);
+    when(event.getPartitionIterator())
+        .thenReturn(Arrays.asList(makePartition(createTime)).iterator());
+    return event;
+  }
+
+  private DropPartitionEvent makeDropPartitionEvent(int createTime) {
+    DropPartitionEvent event = mock(DropPartitionEvent.class);
+    Table table = makeTable();
+    when(event.getTable()).thenReturn(table);
+    when(event.getHandler()).thenReturn(handler);
+    when(event.getPartitionIterator())
+        .thenReturn(Arrays.asList(makePartition(createTime)).iterator());
+    return event;
+  }
+
+  private Table makeTable() {
+    Table table = new Table();
+    table.setDbName(DB_NAME);
+    table.setTableName(TABLE_NAME);
+    return table;
+  }
+
+  private Partition makePartition(int createTime) {
+    Partition partition = new Partition();
+    partition.setDbName(DB_NAME);
+    partition.setTableName(TABLE_NAME);
+    partition.setCreateTime(createTime);
+    return partition;
+  }
+
+  private void assertPartitionEventRequest(MetadataEvent event, int partitionCount,
+                                           int latestPartitionCreateTime) {
+    PartitionEventRequest request =
+        (PartitionEventRequest) sentRequests.get(sentRequests.size() - 1);
+    assertEquals(event, request.getEvent());
+    assertEquals(DB_NAME, request.getDbName());
+    assertEquals(TABLE_NAME, request.getTableName());
+    assertEquals(partitionCount, request.getPartitionCount());
+    assertEquals(latestPartitionCreateTime, request.getLatestPartitionCreateTime());
+  }
+}